@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 __title__   = "Export schedule"
-__doc__     = """Version = 1.0
-Date     = 27.10.2025
+__doc__     = """Version = 1.6
+Date     = 19.10.2026
 ________________________________________________________________
 Description:
 
@@ -12,8 +12,12 @@ de facilitar su edición de texto en parámetros de tipo que posteriormente podr
 ________________________________________________________________
 How-To:
 
-EN - Select the schedule to be exported and choose the Excel file where it will be saved.
-ES - Seleccionar la tabla de planificación a exportar y seleccionar el archivo de Excel en el que hacerlo.
+EN - Select the schedules to be exported (or export all of them) and choose the Excel file where they will be saved.
+Each schedule is written to its own worksheet.
+Choosing a .csv or .tsv file writes one delimited file per schedule instead (faster, for scripted edits).
+ES - Seleccionar las tablas de planificación a exportar (o exportarlas todas) y seleccionar el archivo de Excel en el que hacerlo.
+Cada tabla se escribe en su propia hoja.
+Si se elige un archivo .csv o .tsv, se escribe un archivo de texto delimitado por tabla (más rápido, para ediciones automatizadas).
 ________________________________________________________________
 TODO:
 
@@ -22,6 +26,12 @@ ________________________________________________________________
 Last Updates:
 
 - [27.10.2025] v1.0 Tool complete.
+- [19.10.2026] v1.1 Export of several (or all) schedules to one workbook, one worksheet per schedule.
+- [19.10.2026] v1.2 Versioned import code with type ids and checksum in a hidden worksheet.
+- [19.10.2026] v1.3 Schedule catalog cached per document: only changed schedules are scanned on startup.
+- [19.10.2026] v1.4 Export to CSV / TSV files with the import code in their header lines.
+- [19.10.2026] v1.5 xlsxwriter is only loaded when exporting to Excel; file dialog from pyRevit (no rpw).
+- [19.10.2026] v1.6 Stage timings and API counts on Shift+Click (jfs.profiling).
 ________________________________________________________________
 Author: Javier Fidalgo Saeta"""
 
@@ -30,15 +40,15 @@ Author: Javier Fidalgo Saeta"""
 
 # IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS
 
-from pyrevit import forms
-
-from rpw.ui.forms import *
-import xlsxwriter
+from pyrevit import forms, script
 
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI.Selection import *
 
 import os
+import sys
+
+from jfs import catalog, delimited, importcode, profiling, schedules
 
 #.NET Imports
 import clr
@@ -55,35 +65,22 @@ active_view = doc.ActiveView
 
 selection = uidoc.Selection         #type: Selection
 
+# Stage timings and API counts: Shift+Click the button (see jfs.profiling)
+prof = profiling.start(__title__, __shiftclick__)
 
-# MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN
-
-
-# 1️⃣ SELECT VIEW SCHEDULE WITH 'FAMILY AND TYPE' FIELD AND SELECT EXCEL FILE
 
-# All ViewSchedules in the document
-all_vs = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Schedules).WhereElementIsNotElementType().ToElements()
-
-viewSchedules = []              # Schedules to choose from
-viewSchedules_name = []         # Names of schedules to choose from
+# MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN
 
-for vs in all_vs:
-    for i in range(vs.Definition.GetFieldCount()):
-        try:                                        # Try block because not all parameters have .GetSchedulableField()
-            field = vs.Definition.GetField(i)
-            if not field.IsHidden:
-                schedField = field.GetSchedulableField()
-                if schedField:
-                    # Check if the parameter ID corresponds to 'Family and Type'
-                    if schedField.ParameterId == ElementId(BuiltInParameter.ELEM_FAMILY_AND_TYPE_PARAM):
-                        viewSchedules.append(vs)
-                        viewSchedules_name.append(vs.Name)
-                        break
 
-        except Exception as ex:
-            # Simply ignore this field
-            pass
+# 1️⃣ SELECT VIEW SCHEDULES WITH 'FAMILY AND TYPE' FIELD AND SELECT EXCEL FILE
+prof.section("1️⃣ SELECT VIEW SCHEDULES WITH 'FAMILY AND TYPE' FIELD AND SELECT EXCEL FILE")
 
+# Schedules with the 'Family and Type' field visible. The fields of each schedule are cached
+# per document: only schedules created or modified since the last run are scanned again.
+doc_key = doc.PathName or doc.Title
+schedule_catalog = catalog.ScheduleCatalog(script.get_data_file(catalog.file_id(doc_key), "json"), doc_key)
+viewSchedules = schedules.fyt_schedules(doc, schedule_catalog)
+schedule_catalog.save()
 
 if not viewSchedules:
     forms.alert("EN - No schedules found with the 'Family and Type' field visible "
@@ -92,70 +89,85 @@ if not viewSchedules:
                 "(imprescindible para el funcionamiento de la herramienta)."
                 , exitscript=True)
 
-res = forms.SelectFromList.show(viewSchedules_name,title="Schedules with 'Family and Type' field added and visible",
-                                button_name='Select Schedule')
+mode = forms.alert("{} schedules found with the 'Family and Type' field visible.\n\n"
+                   "Export selected schedules or all of them? Each schedule is written to its own worksheet."
+                   .format(len(viewSchedules)),
+                   options=["Select schedules", "All schedules", "Cancel"])
+
+if mode == "All schedules":
+    vs_sel = viewSchedules
+
+elif mode == "Select schedules":
+    viewSchedules_name = [info.name for info in viewSchedules]
+    res = forms.SelectFromList.show(viewSchedules_name, title="Schedules with 'Family and Type' field added and visible",
+                                    button_name='Select Schedules', multiselect=True)
+    # Obtain the corresponding schedules
+    if not res:
+        forms.alert("No schedule was selected."
+                    , exitscript=True)
+    vs_sel = [info for info in viewSchedules if info.name in res]
 
-# Obtain the corresponding element
-if res:
-    index = viewSchedules_name.index(res)
-    vs_sel = viewSchedules[index]
 else:
-    forms.alert("No schedule was selected."
-                , exitscript=True)
+    sys.exit()
 
-file_path = select_file('Excel File (*.xlsx)|*.xlsx')
+file_path = forms.pick_file(files_filter='Excel File (*.xlsx)|*.xlsx|CSV / TSV File (*.csv;*.tsv)|*.csv;*.tsv')
 
 if not file_path:
-    forms.alert("No Excel file was selected."
+    forms.alert("No file was selected."
                 , exitscript=True)
 
 
-# 2️⃣ GET EXPORT DATA AND IMPORT CODE
+# 2️⃣ GET EXPORT DATA AND IMPORT CODE OF EACH SCHEDULE
+prof.section("2️⃣ GET EXPORT DATA AND IMPORT CODE OF EACH SCHEDULE")
 
-t = vs_sel
-table = t.GetTableData().GetSectionData(SectionType.Body)
+# Data to be exported: (worksheet name, rows) and the import code of each worksheet
+used_names = set([importcode.META_SHEET.lower()])
+sheets = []
+blocks = []
+for info in vs_sel:
+    xlsheetname = schedules.sheet_name(info.name, used_names)
+    rows, meta = schedules.export_sheet(doc, info, xlsheetname)
+    sheets.append((xlsheetname, rows))
+    blocks.append(meta)
 
-nRows = table.NumberOfRows
-nColumns = table.NumberOfColumns
-#Collect data
-dataListRow = []
-for row in range(nRows):
-    dataListColum = []
-    for column in range(nColumns):
-        dataListColum.append(TableView.GetCellText(t, SectionType.Body, row, column))
-    dataListRow.append(dataListColum)
 
-t_flds_code = []
-for i in range(t.Definition.GetFieldCount()):
-    if not t.Definition.GetField(i).IsHidden:
-        try:                                    # Try block because not all parameters have .GetSchedulableField() - e.g., calculated parameters
-            fld_code = t.Definition.GetField(i).GetSchedulableField().ParameterId.Value
-            t_flds_code.append(str(fld_code))
-        except Exception as ex:
-            fld_code = str(t.Definition.GetField(i).FieldType) + "-noedit"
-            t_flds_code.append(fld_code)
+# 3️⃣ CREATE EXCEL SHEETS (OR CSV / TSV FILES) AND OPEN
+prof.section("3️⃣ CREATE EXCEL SHEETS (OR CSV / TSV FILES) AND OPEN")
 
-# ADDING IMPORT CODE
-data = dataListRow
+if delimited.is_delimited(file_path):
+    # One file per schedule, with its import code in the first lines
+    try:
+        if len(sheets) == 1:
+            paths = [file_path]
+        else:
+            paths = [delimited.sibling_path(file_path, xlsheetname) for xlsheetname, _ in sheets]
+        for path, (xlsheetname, matrix), meta in zip(paths, sheets, blocks):
+            delimited.write_sheet(path, matrix, meta)
 
-sep = "_" # If changed, it must also be changed in the import tool
-code_imp = sep.join(t_flds_code)
-data.append([""])
-data.append(["Import Code (do not modify):"])
-data.append([code_imp])
+    except (IOError, OSError) as ex:
+        forms.alert("Something went wrong writing the file. Make sure it’s closed.\n\n{}".format(ex)
+                    , exitscript=True)
 
-# Data to be exported
-matrix = data
+    prof.finish()
+    forms.alert("{} schedules exported:\n\n{}".format(len(paths), "\n".join(paths))
+                , exitscript=True)
 
-# 3️⃣ CREATE EXCEL SHEET AND OPEN
+# xlsxwriter is only loaded here, on the Excel path
+import xlsxwriter
 
 try:
     xlwb = xlsxwriter.Workbook(file_path)
-    xlsheetname = "EXP FYT"
 
-    xlsheet = xlwb.add_worksheet(xlsheetname)
-    for idx, data in enumerate(matrix):
+    for xlsheetname, matrix in sheets:
+        xlsheet = xlwb.add_worksheet(xlsheetname)
+        for idx, data in enumerate(matrix):
+            xlsheet.write_row(idx, 0, data)
+
+    # Import code (schema version, field codes, storage types, type ids and checksum) in a hidden sheet
+    xlsheet = xlwb.add_worksheet(importcode.META_SHEET)
+    for idx, data in enumerate(importcode.encode(blocks)):
         xlsheet.write_row(idx, 0, data)
+    xlsheet.hide()
 
     xlwb.close()
 
@@ -164,4 +176,6 @@ try:
 
 except Exception as ex:
     forms.alert("Something went wrong with the Excel file. Make sure it’s closed."
-                , exitscript=True)
\ No newline at end of file
+                , exitscript=True)
+
+prof.finish()
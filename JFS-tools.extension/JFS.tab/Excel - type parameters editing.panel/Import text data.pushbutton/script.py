@@ -1,17 +1,27 @@
 # -*- coding: utf-8 -*-
 __title__   = "Import text data"
-__doc__     = """Version = 1.0
-Date     = 27.10.2025
+__doc__     = """Version = 1.12
+Date     = 19.10.2026
 ________________________________________________________________
 Description:
 
-EN - This tool imports modifications to Type parameter text values, made in an Excel file previously exported from a schedule.
-ES - Esta herramienta importa modificaciones en el texto de parámetros de tipo, realizadas en una exportación de tabla de planificación a un archivo Excel.
+EN - This tool imports modifications to Type parameter values (text, numbers with units, integers, Yes/No and elements by name),
+made in an Excel file previously exported from a schedule.
+ES - Esta herramienta importa modificaciones en los valores de parámetros de tipo (texto, números con unidades, enteros, Sí/No y elementos por nombre),
+realizadas en una exportación de tabla de planificación a un archivo Excel.
 ________________________________________________________________
 How-To:
 
-EN - Select the Excel file that was exported using the 'Export schedule' tool.
-ES - Seleccionar el archivo Excel en el que se ha realizado la exportación con la herramienta 'Exportar tabla'.
+EN - Select the Excel file that was exported using the 'Export schedule' tool. Every worksheet with an import code is imported.
+CSV / TSV files exported by the same tool (one schedule per file) can be imported too.
+Numbers are read in the document's display units. Cells that cannot be converted are skipped and listed at the end.
+Changes are saved every few rows: if the import is cancelled or fails, running it again on the same workbook resumes where it stopped
+(the rows saved are not compared with the model again), as long as the model still holds the last values saved (otherwise it starts over).
+ES - Seleccionar el archivo Excel en el que se ha realizado la exportación con la herramienta 'Exportar tabla'. Se importan todas las hojas con código de importación.
+También se pueden importar los archivos CSV / TSV exportados con la misma herramienta (una tabla por archivo).
+Los números se leen en las unidades de visualización del documento. Las celdas que no se pueden convertir se omiten y se listan al final.
+Los cambios se guardan cada pocas filas: si la importación se cancela o falla, al ejecutarla de nuevo con el mismo libro se reanuda donde se detuvo
+(las filas guardadas no se vuelven a comparar con el modelo), siempre que el modelo conserve los últimos valores guardados (si no, empieza de nuevo).
 ________________________________________________________________
 TODO:
 
@@ -20,6 +30,18 @@ ________________________________________________________________
 Last Updates:
 
 - [27.10.2025] v1.0 Tool complete.
+- [19.10.2026] v1.1 Typed import of Double, Integer, Yes/No and ElementId parameters.
+- [19.10.2026] v1.2 Import of every worksheet of the workbook in a single TransactionGroup.
+- [19.10.2026] v1.3 Streaming xlsx reader (jfs.xlsxreader) replaces xlrd.
+- [19.10.2026] v1.4 Versioned import code: rows are mapped to their type id, checked with a checksum.
+- [19.10.2026] v1.5 Chunked import with resume checkpoints.
+- [19.10.2026] v1.6 Import of CSV / TSV files with the import code in their header lines.
+- [19.10.2026] v1.7 Rows are applied through the schedule-free bulk edit engine (jfs.bulkedit).
+- [19.10.2026] v1.8 Reading, conversion and comparison of the rows run on worker threads.
+- [19.10.2026] v1.9 File dialog from pyRevit (no rpw) and no unused imports: faster startup.
+- [19.10.2026] v1.10 Stage timings and API counts on Shift+Click (jfs.profiling).
+- [19.10.2026] v1.11 Resume only if the model still holds the rows of the checkpoint (not undone or unsaved).
+- [19.10.2026] v1.12 A resumed import only plans the rows left; the checkpoint is confirmed with a sample of its last values.
 ________________________________________________________________
 Author: Javier Fidalgo Saeta"""
 
@@ -28,20 +50,19 @@ Author: Javier Fidalgo Saeta"""
 
 from Autodesk.Revit.DB import *
 
-from Autodesk.Revit.DB import StorageType
+import csv
+import sys
 
 import clr
 
 clr.AddReference('System')
 
 
-from rpw.ui.forms import *
-
-import xlrd
-
-from pyrevit import forms
+from pyrevit import forms, script
 from pyrevit.forms import ProgressBar
 
+from jfs import bulkedit, checkpoint, chunked, importcode, importplan, profiling, revitmodel, xlsxreader
+
 
 # VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES
 
@@ -49,110 +70,152 @@ app    = __revit__.Application
 uidoc  = __revit__.ActiveUIDocument
 doc    = __revit__.ActiveUIDocument.Document #type:Document
 
+# Stage timings and API counts: Shift+Click the button (see jfs.profiling)
+prof = profiling.start(__title__, __shiftclick__)
+
 active_view = doc.ActiveView
 
 
 # MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN
 
 
-# 1️⃣ READ EXCEL
+# 1️⃣ READ EXCEL (EVERY WORKSHEET WITH ITS OWN IMPORT CODE) OR CSV / TSV FILE
+prof.section("1️⃣ READ EXCEL (EVERY WORKSHEET WITH ITS OWN IMPORT CODE) OR CSV / TSV FILE")
 
-file_path = select_file('Excel File (*.xlsx)|*.xlsx')
+file_path = forms.pick_file(files_filter='Excel File (*.xlsx)|*.xlsx|CSV / TSV File (*.csv;*.tsv)|*.csv;*.tsv')
 
 if not file_path:
-    forms.alert("No Excel file was selected."
+    forms.alert("No file was selected."
                 , exitscript=True)
 
-workbook = xlrd.open_workbook(file_path)
-sheet = workbook.sheet_by_index(0)
+# Get ID of 'Family and Type'
+FYT_id = ElementId(BuiltInParameter.ELEM_FAMILY_AND_TYPE_PARAM).Value
 
-row_count = sheet.nrows
-col_count = sheet.ncols
+# Rows are streamed from the file, each worksheet on its own worker thread. The import code is read from
+# the hidden metadata sheet (type id of every row, checksum) or, in older exports, from the trailer below the data.
+try:
+    sheets, skipped = importplan.read_file(file_path, str(FYT_id))
 
-data_all = []
+except importcode.ImportCodeError as ex:
+    forms.alert("The import code of the file is not valid: {}.".format(ex)
+                , exitscript=True)
 
-for row in range(row_count):
-    data = [] # Create a list for each row
-    for col in range(col_count):
-        data.append(sheet.cell_value(row,col))
-    data_all.append(data)
+except (IOError, csv.Error, UnicodeError, xlsxreader.XlsxError) as ex:
+    forms.alert("The file could not be read. Make sure it's a valid .xlsx, .csv or .tsv file.\n\n{}".format(ex)
+                , exitscript=True)
 
-# Remove lines without useful data
-data = data_all[1:-3]
-# Get the import code list
-code_imp = data_all[-1][0].split("_")
+if not sheets:
+    forms.alert("No worksheet with a valid import code was found. Export the schedules with the 'Export schedule' tool."
+                , exitscript=True)
 
-# Get ID of 'Family and Type'
-FYT_id = ElementId(BuiltInParameter.ELEM_FAMILY_AND_TYPE_PARAM).Value
 
-# Get index of 'Family and Type' column
-col_FYT = code_imp.index(str(FYT_id))
-# Get list of parameters ...
-code_params = code_imp[:col_FYT] + code_imp[col_FYT+1:]
-# ... and their indices (columns) within the list
-col_params = range(len(code_imp))[:col_FYT] + range(len(code_imp))[col_FYT+1:]
+# 2️⃣ RESUME CHECKPOINT
+prof.section("2️⃣ RESUME CHECKPOINT")
+
+editor = bulkedit.BulkEditor(revitmodel.RevitModel(doc))
+
+# Rows already committed by a previous (cancelled or failed) import of this same workbook
+ckpt = checkpoint.Checkpoint(script.get_data_file("import_checkpoint", "json"),
+                             checkpoint.file_hash(file_path), doc.PathName or doc.Title)
 
+if ckpt.rows_done():
+    # Only the rows of the last values saved are compared with the model: if it doesn't hold them,
+    # the import was undone, not saved, or lost in a crash
+    sample_snapshot = editor.snapshot(importplan.sample_keys(sheets, ckpt.sample))
+    if not importplan.holds(sample_snapshot, sheets, ckpt.sample):
+        forms.alert("A previous import of this workbook stopped after {} rows, but the model no longer holds "
+                    "their changes (undone or not saved). The import starts over.".format(ckpt.rows_done()),
+                    exitscript=False)
+        ckpt.clear()
 
-# 2️⃣ APPLY CHANGES
+if ckpt.rows_done():
+    res = forms.alert("A previous import of this workbook stopped after {} rows.\n\n"
+                      "Resume from there (those rows are not compared with the model again) or start over "
+                      "(every row is compared and applied again)?".format(ckpt.rows_done()),
+                      options=["Resume", "Start over", "Cancel"])
+    if res == "Start over":
+        ckpt.clear()
+    elif res != "Resume":
+        sys.exit()
 
-t = Transaction(doc, __title__)
-t.Start()
 
-all_elems = FilteredElementCollector(doc).WhereElementIsNotElementType().ToElements()
+# 3️⃣ PLAN CHANGES
+prof.section("3️⃣ PLAN CHANGES")
 
-# Progress Bar setup ...
+# Only reading the current values of the types involved needs the Revit API. Converting every cell and
+# comparing it with those values runs on worker threads, leaving a short apply-list per row.
+# A resumed import starts at the first row not committed of every worksheet.
+starts = ckpt.starts()
+snapshot = editor.snapshot(importplan.wanted_keys(sheets, starts))
+plans, errors = importplan.plan_sheets(snapshot, sheets, starts=starts)   # Invalid cells are reported at the end
+
+
+# 4️⃣ APPLY CHANGES
+prof.section("4️⃣ APPLY CHANGES")
+
+# All worksheets are imported as a single undoable operation, committed every few rows
+tg = TransactionGroup(doc, __title__)
+tg.Start()
+
+max_value = sum(len(sh.body) for sh in sheets)  # Total number of rows
+done_before = 0                                 # Rows of the previous worksheets
+stopped = None                                  # Worksheet where the import stopped
+failure = None
 
-max_value = len(data)  # Total number of rows
 with ProgressBar(title='Importing data ... ({value} of {max_value})', cancellable=True) as pb:
-    for counter, row in enumerate(data):
-        # If the user cancels the progress bar
-        if pb.cancelled:
+    for sh in sheets:
+        start = ckpt.done(sh.name)
+        last_set = []                           # Last value set in the open chunk, saved with the checkpoint
+
+        def apply(row_idx):
+            entries = plans[sh.name].get(row_idx, ())
+            editor.apply_entries(entries)
+            if entries:
+                last_set[:] = [(sh.name, row_idx, entries[-1][0], entries[-1][1])]
+            # 🔹 Update progress
+            pb.update_progress(done_before + row_idx + 1, max_value)
+
+        def on_commit(rows):
+            ckpt.save(sh.name, rows, last_set[0] if last_set else None)
+            del last_set[:]
+
+        try:
+            end = chunked.apply_rows(doc, "{} - {}".format(__title__, sh.name), len(sh.body), apply, start,
+                                     on_commit=on_commit, cancelled=lambda: pb.cancelled)
+        except Exception as ex:
+            failure = ex
+            end = ckpt.done(sh.name)
+
+        if end < len(sh.body):
+            stopped = (sh.name, importcode.row_number(end))
             break
 
-        # For each row ...
-        FYT = row[col_FYT]
-
-        # If "Family and Type" contains ":", it's an element of interest
-        if ":" in FYT:
-            row_elems = [
-                e for e in all_elems
-                if e.get_Parameter(BuiltInParameter.ELEM_FAMILY_AND_TYPE_PARAM)
-                and e.get_Parameter(BuiltInParameter.ELEM_FAMILY_AND_TYPE_PARAM).AsValueString() == FYT
-            ]
-            if not row_elems:
-                continue
-
-            # Pick any element of that Family/Type
-            e = row_elems[0]
-            # Get its Type
-            typ = doc.GetElement(e.GetTypeId())
-
-            # For each parameter, check if it's a Type parameter (exists) and if it's editable
-            for code, col in zip(code_params, col_params):
-                # Only numbers (Id codes)
-                try:
-                    code_int = int(code)
-                except Exception as ex:
-                     continue
-
-                t_param = False
-                for p in typ.Parameters:
-                    # Compare each param: If code in Id number of param
-                    if code in str(p.Id.Value):
-                        t_param = p
-                        break
-
-                if not t_param or t_param.IsReadOnly:
-                    continue
-
-                value = row[col]
-
-                # Check if it is a String and if it's different from the existing value
-                if t_param.StorageType == StorageType.String:
-                    if t_param.AsString() != str(value):
-                        t_param.Set(str(value))
-
-        # 🔹 Update progress
-        pb.update_progress(counter + 1, max_value)
-
-t.Commit()
\ No newline at end of file
+        done_before += len(sh.body)
+
+# Chunks committed before a cancel or failure are kept: the checkpoint resumes after them
+tg.Assimilate()
+
+
+prof.finish()
+
+# 5️⃣ REPORT INVALID CELLS, SKIPPED WORKSHEETS AND RESUME POINT
+
+if not stopped:
+    ckpt.clear()
+
+if errors:
+    output = script.get_output()
+    output.print_table(errors.rows(), columns=["Sheet", "Row", "Column", "Value", "Error"],
+                       title="Cells not imported")
+    forms.alert("{} cells could not be converted and were not imported:\n\n{}"
+                .format(len(errors), errors.summary()), exitscript=False)
+
+if skipped:
+    forms.alert("The following worksheets were not imported:\n\n{}".format("\n".join(skipped))
+                , exitscript=False)
+
+if stopped:
+    forms.alert("The import stopped at worksheet '{}', row {}{}.\n\n"
+                "The rows before it have been saved. Run the tool again with the same workbook to resume from there."
+                .format(stopped[0], stopped[1], ": {}".format(failure) if failure else "")
+                , exitscript=False)
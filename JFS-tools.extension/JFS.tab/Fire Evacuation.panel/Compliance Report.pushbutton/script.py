@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+__title__   = "Compliance Report"
+__doc__     = """Version = 1.4
+Date     = 19.10.2026
+________________________________________________________________
+Description:
+
+EN - This tool checks, for every evacuation door and staircase of the building, its 'MINIMUM WIDTH' against its actual width,
+and writes the compliance table (per element and per level) to an HTML report and a CSV file.
+ES - Esta herramienta comprueba, para todas las puertas y escaleras de evacuación del edificio, su 'MINIMUM WIDTH' frente a su
+ancho real, y escribe la tabla de cumplimiento (por elemento y por planta) en un informe HTML y un archivo CSV.
+EN - It also measures the evacuation routes (paths of travel) and flags, per origin space, the longest one over the limit.
+ES - También mide los recorridos de evacuación (trayectorias) y señala, por espacio de origen, el más largo que supera el límite.
+EN - Optionally, it re-sizes the 'MINIMUM WIDTH' of every sized door and staircase with the width rules of a chosen code, from
+their stored 'NUMBER PEOPLE' (no path or space geometry is read again).
+ES - Opcionalmente, redimensiona el 'MINIMUM WIDTH' de todas las puertas y escaleras dimensionadas con las reglas de ancho de la
+normativa elegida, a partir de su 'NUMBER PEOPLE' guardado (sin volver a leer la geometría de trayectorias ni espacios).
+________________________________________________________________
+How-To:
+
+EN - Size the doors and stairs with the 'Evacuation Doors' and 'Evacuation Stairs' tools, then run this tool and choose the
+report file. Doors are compared with their width (instance or type 'Width'), stairs with the width of their narrowest run.
+Elements without 'MINIMUM WIDTH' are counted per level as not sized. Enter the maximum route length when asked
+(50 m by default, CTE DB-SI Section 3). Choose 'Re-size with <code>' to apply the width rules of that code (the built-in
+CTE DB-SI ones, or those of the jfs_width_rules.json file) to the stored 'NUMBER PEOPLE' of every sized element first.
+ES - Dimensionar las puertas y escaleras con las herramientas 'Evacuation Doors' y 'Evacuation Stairs', ejecutar esta
+herramienta y elegir el archivo del informe. Las puertas se comparan con su ancho (parámetro 'Anchura' de ejemplar o de tipo),
+las escaleras con el ancho de su tramo más estrecho. Los elementos sin 'MINIMUM WIDTH' se cuentan por planta como no dimensionados.
+Introducir la longitud máxima de recorrido cuando se pida (50 m por defecto, CTE DB-SI Sección 3). Elegir 'Re-size with <code>'
+para aplicar antes las reglas de ancho de esa normativa (las de CTE DB-SI incluidas, o las del archivo jfs_width_rules.json) al
+'NUMBER PEOPLE' guardado de todos los elementos dimensionados.
+________________________________________________________________
+TODO:
+
+- New functionalities as they arise.
+________________________________________________________________
+Last Updates:
+
+- [19.10.2026] v1.0 Building compliance table in one model pass (jfs.compliance), HTML and CSV.
+- [19.10.2026] v1.1 Evacuation route lengths per origin space and exit (jfs.travel), over-limit routes flagged.
+- [19.10.2026] v1.2 Batch re-size of every sized element with the width rules of a chosen code (jfs.widths).
+- [19.10.2026] v1.3 Routes grouped from the space footprints, path ends and exits only (no space solids).
+- [19.10.2026] v1.4 A 'MINIMUM WIDTH' stored as 0 is checked, not counted as not sized; level totals of people through stairs.
+________________________________________________________________
+Author: Javier Fidalgo Saeta"""
+
+
+# IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS
+
+from Autodesk.Revit.DB import *
+
+from pyrevit import forms, script
+
+import os
+
+from jfs import compliance, profiling, revitevacuation, snapshot, travel, widths
+
+
+# VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES
+
+app    = __revit__.Application
+uidoc  = __revit__.ActiveUIDocument
+doc    = __revit__.ActiveUIDocument.Document #type:Document
+
+# Stage timings and API counts: Shift+Click the button (see jfs.profiling)
+prof = profiling.start(__title__, __shiftclick__)
+
+
+# MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN
+
+
+# 1️⃣ READ DOORS, STAIRS AND LEVELS (ONE MODEL PASS)
+prof.section("1️⃣ READ DOORS, STAIRS AND LEVELS (ONE MODEL PASS)")
+
+# Records of the session snapshot: the model is only walked on the first run
+snap = snapshot.ElementSnapshot(doc)
+door_recs = snap.records(BuiltInCategory.OST_Doors,
+                         params=('NUMBER PEOPLE', 'MINIMUM WIDTH', BuiltInParameter.FURNITURE_WIDTH))
+stair_recs = snap.records(BuiltInCategory.OST_Stairs,
+                          params=('NUMBER PEOPLE', 'MINIMUM WIDTH', 'PROTECTED STAIR', 'UPWARD EVACUATION',
+                                  BuiltInParameter.STAIRS_BASE_LEVEL_PARAM, BuiltInParameter.STAIRS_TOP_LEVEL_PARAM))
+
+levels = FilteredElementCollector(doc).OfClass(Level).ToElements()
+level_names = dict((lvl.Id.Value, lvl.Name) for lvl in levels)
+level_elevations = dict((lvl.Id.Value, lvl.Elevation) for lvl in levels)
+no_level = "(no level)"
+
+if not door_recs and not stair_recs:
+    forms.alert("No doors or stairs found in the model.", exitscript=True)
+
+# Check the stored 'MINIMUM WIDTH', or re-size first with the width rules of a code (jfs.widths)
+rule_rows = widths.load_rows(widths.default_rules_path())
+CHECK = "Check the stored 'MINIMUM WIDTH'"
+resize_options = [("Re-size with {}".format(code), code) for code in widths.codes(rule_rows)]
+resize_codes = dict(resize_options)
+mode = forms.CommandSwitchWindow.show([CHECK] + [option for option, _ in resize_options], message="Evacuation widths:")
+if not mode:
+    script.exit()
+
+
+# 2️⃣ COMPARE 'MINIMUM WIDTH' WITH THE ACTUAL WIDTHS
+prof.section("2️⃣ COMPARE 'MINIMUM WIDTH' WITH THE ACTUAL WIDTHS")
+
+rows = []
+unsized = {}
+stair_rules = {}            # stair id: (protected, upward, {H})
+
+# Doors: instance width (curtain wall doors), else the width of their type (read once per type)
+type_widths = {}
+for rec in door_recs:
+    level = level_names.get(rec.level_id, no_level)
+    min_width = snapshot.value(rec, 'MINIMUM WIDTH')
+    if min_width is None:           # A stored 0 is reported as a row
+        unsized[level] = unsized.get(level, 0) + 1
+        continue
+
+    width = snapshot.value(rec, BuiltInParameter.FURNITURE_WIDTH)
+    if not width:
+        if rec.type_id not in type_widths:
+            door_type = doc.GetElement(ElementId(rec.type_id))
+            type_widths[rec.type_id] = snapshot.read_param(door_type, BuiltInParameter.FURNITURE_WIDTH) if door_type else None
+        width = type_widths[rec.type_id]
+
+    door = doc.GetElement(ElementId(rec.id))
+    rows.append(compliance.Row(level, compliance.DOOR, rec.id, door.Name, snapshot.value(rec, 'NUMBER PEOPLE'),
+                               min_width, width))
+
+# Stairs: width of their narrowest run
+for rec in stair_recs:
+    level = level_names.get(snapshot.value(rec, BuiltInParameter.STAIRS_BASE_LEVEL_PARAM), no_level)
+    min_width = snapshot.value(rec, 'MINIMUM WIDTH')
+    if min_width is None:
+        unsized[level] = unsized.get(level, 0) + 1
+        continue
+
+    stair = doc.GetElement(ElementId(rec.id))
+    run_widths = [doc.GetElement(run_id).ActualRunWidth for run_id in stair.GetStairsRuns()]
+    rows.append(compliance.Row(level, compliance.STAIR, rec.id, stair.Name, snapshot.value(rec, 'NUMBER PEOPLE'),
+                               min_width, min(run_widths) if run_widths else None))
+
+    # Width rule inputs, as in the Evacuation Stairs tool (S taken as 0)
+    base = level_elevations.get(snapshot.value(rec, BuiltInParameter.STAIRS_BASE_LEVEL_PARAM), 0.0)
+    top = level_elevations.get(snapshot.value(rec, BuiltInParameter.STAIRS_TOP_LEVEL_PARAM), base)
+    stair_rules[rec.id] = (snapshot.value(rec, 'PROTECTED STAIR') == 1, snapshot.value(rec, 'UPWARD EVACUATION') == 1,
+                           {"H": abs(top - base) / widths.M_TO_FT})
+
+prof.count("doors and stairs sized", len(rows))
+
+if not rows:
+    forms.alert("No door or staircase has the 'MINIMUM WIDTH' parameter filled. Size them first with the "
+                "'Evacuation Doors' and 'Evacuation Stairs' tools.", exitscript=True)
+
+
+# 3️⃣ RE-SIZE WITH THE WIDTH RULES (STORED 'NUMBER PEOPLE', NO GEOMETRY)
+prof.section("3️⃣ RE-SIZE WITH THE WIDTH RULES (STORED 'NUMBER PEOPLE', NO GEOMETRY)")
+
+if mode != CHECK:
+    code = resize_codes[mode]
+    width_rules = widths.WidthRules(rule_rows, code=code)
+    items = []
+    for row in rows:
+        if row.kind == compliance.DOOR:
+            items.append((widths.DOOR, row.people or 0, False, False, {}))
+        else:
+            protected, upward, values = stair_rules[row.element_id]
+            items.append((widths.STAIR, row.people or 0, protected, upward, values))
+    try:
+        min_widths_ft = [w * widths.M_TO_FT for w in width_rules.apply(items)]
+    except KeyError as ex:
+        forms.alert("The width rules of {} do not cover every element: {}".format(code, ex), exitscript=True)
+
+    changed = [(row, w) for row, w in zip(rows, min_widths_ft) if abs(w - row.min_width) > 1e-6]
+    if changed:
+        t = Transaction(doc, "{} - {}".format(__title__, code))
+        t.Start()
+        for row, w in changed:
+            doc.GetElement(ElementId(row.element_id)).LookupParameter('MINIMUM WIDTH').Set(w)
+        t.Commit()
+    rows = [row._replace(min_width=w) for row, w in zip(rows, min_widths_ft)]
+    prof.count("minimum widths changed", len(changed))
+
+
+# 4️⃣ EVACUATION ROUTE LENGTHS
+prof.section("4️⃣ EVACUATION ROUTE LENGTHS")
+
+limit = forms.ask_for_string(default=str(travel.LIMIT_M), prompt="Maximum evacuation route length (m):",
+                             title=__title__)
+try:
+    limit_m = float(limit.replace(",", "."))
+except (AttributeError, ValueError):
+    limit_m = travel.LIMIT_M
+
+# Only space footprints, path ends and exits are read; curve lengths are kept for the session,
+# so only paths changed since the last run are measured again
+model = revitevacuation.read_route_model(doc, snap)
+routes = travel.routes(model, revitevacuation.path_lengths(doc, snap), limit_m)
+prof.count("routes measured", len(routes))
+
+
+def element_name(element_id):
+    elem = doc.GetElement(ElementId(element_id))
+    return elem.Name if elem else str(element_id)
+
+
+route_rows = [compliance.RouteRow(level_names.get(r.level, no_level), element_name(r.origin),
+                                  element_name(r.exit_id) if r.exit_id is not None else "(no exit)",
+                                  r.length, r.over)
+              for r in travel.longest_by_origin(routes).values()]
+over_limit = [r for r in routes if r.over]
+
+
+# 5️⃣ SELECT FILE AND WRITE HTML / CSV REPORT
+prof.section("5️⃣ SELECT FILE AND WRITE HTML / CSV REPORT")
+
+file_path = forms.save_file(file_ext='html', default_name='{} - evacuation compliance'.format(doc.Title))
+
+if not file_path:
+    forms.alert("No file was selected.", exitscript=True)
+
+csv_path = os.path.splitext(file_path)[0] + ".csv"
+title = "{} - Evacuation widths compliance".format(doc.Title)
+
+try:
+    compliance.write_html(file_path, rows, title, unsized, route_rows)
+    compliance.write_csv(csv_path, rows, unsized, route_rows)
+except (IOError, OSError) as ex:
+    forms.alert("Something went wrong writing the report. Make sure it’s closed.\n\n{}".format(ex)
+                , exitscript=True)
+
+
+# 6️⃣ LEVEL TOTALS AND OPEN REPORT
+prof.section("6️⃣ LEVEL TOTALS AND OPEN REPORT")
+
+output = script.get_output()
+output.print_table(compliance.totals_table(compliance.level_totals(rows, unsized)),
+                   columns=compliance.TOTALS_COLUMNS, title=title)
+
+failing = [row for row in rows if compliance.status(row) != compliance.COMPLIANT]
+
+prof.finish()
+
+os.startfile(file_path)
+
+forms.alert("{} doors and stairs checked, {} NOT COMPLIANT (or without a readable width).\n"
+            "{} evacuation routes measured, {} longer than {:g} m.\n\nReport written to:\n{}\n{}"
+            .format(len(rows), len(failing), len(routes), len(over_limit), limit_m, file_path, csv_path),
+            exitscript=False)
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 __title__   = "Evacuation Doors"
-__doc__     = """Version = 1.1
-Date     = 05.09.2025
+__doc__     = """Version = 1.13
+Date     = 19.10.2026
 ________________________________________________________________
 Description:
 
@@ -26,29 +26,37 @@ Last Updates:
 
 - [28.08.2025] v1.0 Initial version without detection of people evacuated from stairs or doors at the evacuation origin.
 - [05.09.2025] v1.1 Tool complete.
+- [19.10.2026] v1.2 Paths, spaces and doors of the level from the session element snapshot (jfs.snapshot).
+- [19.10.2026] v1.3 Shared helpers (jfs.geometry / jfs.legends) and no unused imports: faster startup.
+- [19.10.2026] v1.4 Stage timings and API counts on Shift+Click (jfs.profiling).
+- [19.10.2026] v1.5 Exact segment intersection (jfs.geometry): collinear or touching paths and boundaries are always detected.
+- [19.10.2026] v1.6 Spaces crossed by the paths from a single plane sweep over all segments of the level (jfs.overlay).
+- [19.10.2026] v1.7 Doors and stairs at the path origins matched through a hashed-grid index of the path starts (jfs.proximity).
+- [19.10.2026] v1.8 Doors and stairs located from their model bounding boxes (jfs.locations): independent of the active view.
+- [19.10.2026] v1.9 Space occupancy from area x use density (CTE DB-SI Table 2.1, jfs.occupancy), read with AsDouble; Revit 'Number of People' for spaces without 'OCCUPANCY USE'.
+- [19.10.2026] v1.10 Minimum width from the compiled rule table of jfs.widths (CTE DB-SI Table 4.1, extensible per code).
+- [19.10.2026] v1.11 Missing paths: points to the 'Evacuation Paths' tool, which draws them.
+- [19.10.2026] v1.12 Stairs and their IN / OUT levels from the session snapshot: only those discharging at the door level are read.
+- [19.10.2026] v1.13 Path end, path origin and door probe tolerances shared with the evacuation model (jfs.evacuation).
 ________________________________________________________________
 Author: Javier Fidalgo Saeta"""
 
 
 # IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS
 
-from types import ObjectType
-
-
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI.Selection import *
 
 from pyrevit import forms
 
-import math
-
-import re
-
 import sys
 
 #.NET Imports
 import clr
-from rpw.db import FamilyInstance
+
+from jfs import occupancy, overlay, profiling, proximity, snapshot, widths
+from jfs.evacuation import DOOR_PROBE, PATH_TOLERANCE
+from jfs.geometry import distance_2d, segments_xy
 
 clr.AddReference('System')
 from System.Collections.Generic import List
@@ -60,9 +68,8 @@ app    = __revit__.Application
 uidoc  = __revit__.ActiveUIDocument
 doc    = __revit__.ActiveUIDocument.Document #type:Document
 
-
-def distance_2d(p1, p2):
-    return math.sqrt((p2[0] - p1[0])**2 + (p2[1] - p1[1])**2)
+# Stage timings and API counts: Shift+Click the button (see jfs.profiling)
+prof = profiling.start(__title__, __shiftclick__)
 
 
 # MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN
@@ -99,6 +106,7 @@ if res == "Cancel":
 
 
 # 1️⃣ SELECT DOOR TO ANALYZE AND GET ITS LEVEL AND LOCATION
+prof.section("1️⃣ SELECT DOOR TO ANALYZE AND GET ITS LEVEL AND LOCATION")
 
 # Filter to make only elements from the "Doors" category selectable:
 
@@ -127,23 +135,29 @@ door_level      = doc.GetElement(door_levelid).Name
 
 #door_loc       = door.Location.Point      # Not valid for curtain wall doors
 
-door_bb         = door.BoundingBox[doc.ActiveView]
-door_loc        = ((door_bb.Max.X + door_bb.Min.X)/2, (door_bb.Max.Y + door_bb.Min.Y)/2)
+# Centre of the model bounding box (session snapshot): valid for curtain wall doors and independent
+# of the active view, its crop and hidden elements (jfs.locations)
+snap            = snapshot.ElementSnapshot(doc)
+door_locs       = snap.locations(BuiltInCategory.OST_Doors)
+door_loc        = door_locs.centre(door.Id.Value)
 
 
 # 2️⃣ FIND EVACUATION PATHS THAT END AT THE ANALYZED DOOR AND GET THEIR COMPONENT LINES
+prof.section("2️⃣ FIND EVACUATION PATHS THAT END AT THE ANALYZED DOOR AND GET THEIR COMPONENT LINES")
 
 # # Get evacuation paths for this level
 
-all_paths = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_PathOfTravelLines).WhereElementIsNotElementType().ToElements()
-level_paths = [path for path in all_paths if path.get_Parameter(BuiltInParameter.PATH_OF_TRAVEL_LEVEL_NAME).AsString() == door_level]
+# (records of the session snapshot: the model is only walked on the first run)
+level_paths = snap.elements(BuiltInCategory.OST_PathOfTravelLines,
+                            lambda rec: snapshot.value(rec, BuiltInParameter.PATH_OF_TRAVEL_LEVEL_NAME) == door_level,
+                            params=(BuiltInParameter.PATH_OF_TRAVEL_LEVEL_NAME,))
 
-# Keep only those that end at the evacuation door (PathEnd within 3ft (90cm) of the door location)
+# Keep only those that end at the evacuation door (PathEnd within PATH_TOLERANCE, 3ft (90cm), of the door location)
 
-paths = [path for path in level_paths if distance_2d((path.PathEnd.X,path.PathEnd.Y),door_loc) < 3]
+paths = [path for path in level_paths if distance_2d((path.PathEnd.X,path.PathEnd.Y),door_loc) < PATH_TOLERANCE]
 
 if not paths:
-    forms.alert('No evacuation path ends at the selected door. You must draw the evacuation paths for the floor/building before running this tool.', exitscript=True)
+    forms.alert("No evacuation path ends at the selected door. You must draw the evacuation paths for the floor/building before running this tool, or generate them with the 'Evacuation Paths' tool.", exitscript=True)
 
 # Get a list of all lines that compose the paths (flattened)
 
@@ -162,9 +176,12 @@ for line in linpaths:
 
 
 # 3️⃣ COLLECT SPACES WITH LEVEL FILTERS AND 'ADDS OCCUPANCY'
+prof.section("3️⃣ COLLECT SPACES WITH LEVEL FILTERS AND 'ADDS OCCUPANCY'")
 
-all_spaces = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_MEPSpaces).WhereElementIsNotElementType().ToElements()
-level_spaces = [sp for sp in all_spaces if sp.LevelId == door_levelid]
+# Area, use and Revit number of people are read with the records, for the occupancy in 8️⃣
+space_params = (BuiltInParameter.ROOM_AREA, occupancy.USE_PARAM, BuiltInParameter.ROOM_NUMBER_OF_PEOPLE_PARAM)
+level_spaces = snap.elements(BuiltInCategory.OST_MEPSpaces, lambda rec: rec.level_id == door_levelid.Value,
+                             params=space_params)
 
 spaces = []
 msg = 0
@@ -187,6 +204,7 @@ elif msg == 2:
 
 
 # 4️⃣ GET SPACE BOUNDARY LINES
+prof.section("4️⃣ GET SPACE BOUNDARY LINES")
 
 # Get the bottom face of the spaces
 
@@ -224,66 +242,40 @@ for face in spfacesinf:
 
 
 # 5️⃣ INTERSECTION CALCULATION BETWEEN PATHS AND SPACES
+prof.section("5️⃣ INTERSECTION CALCULATION BETWEEN PATHS AND SPACES")
 
-# 1. FUNCTIONS
-
-def ccw_XYZ(A, B, C):
-    """Checks if points A, B, C are in counter-clockwise order"""
-    return (C.Y - A.Y) * (B.X - A.X) > (B.Y - A.Y) * (C.X - A.X)
-
-def intersect_XYZ(A, B, C, D):
-    """Returns True if segments AB and CD intersect"""
-    return (ccw_XYZ(A, C, D) != ccw_XYZ(B, C, D)) and (ccw_XYZ(A, B, C) != ccw_XYZ(A, B, D))
-
-def ccw_xy(A, B, C):
-    """Checks if points A, B, C are in counter-clockwise order (tuple version)"""
-    return (C[1] - A[1]) * (B[0] - A[0]) > (B[1] - A[1]) * (C[0] - A[0])
-
-def intersect_xy(A, B, C, D):
-    """Returns True if segments AB and CD intersect (tuple version)"""
-    return (ccw_xy(A, C, D) != ccw_xy(B, C, D)) and (ccw_xy(A, B, C) != ccw_xy(A, B, D))
-
-# 2. LOOPS
+# One plane sweep over all path and boundary segments (jfs.overlay), with exact intersection tests:
+# a path touching or running along a boundary line intersects it
 
 sp_with_intersection = []
 sp_without_intersection = []
 sp_without_intersection_edges_XYZ01 = []
 
-for sp, spbound in zip(spaces, sp_edges_XYZ01):          # each space
-    found = False
-    for edge in spbound:                                 # each boundary line
-        p0, p1 = edge
-        for line in linpaths_XYZ01:                          # each path segment
-            r0, r1 = line
-            if intersect_XYZ(p0, p1, r0, r1):
-                sp_with_intersection.append(sp)
-                found = True
-                break   # 1 intersection is enough
-        if found:
-            break
+crossed = overlay.spaces_crossed(segments_xy(linpaths_XYZ01),
+                                 [segments_xy(spbound) for spbound in sp_edges_XYZ01])
+
+for idx, (sp, spbound) in enumerate(zip(spaces, sp_edges_XYZ01)):          # each space
+    if idx in crossed:
+        sp_with_intersection.append(sp)
 
     # if NO intersection occurred, save the space and its edges
-    if not found:
+    else:
         sp_without_intersection.append(sp)
         sp_without_intersection_edges_XYZ01.append(spbound)
 
 
 # 6️⃣ IDENTIFY SPACES WITH EVACUATION ORIGIN AT THEIR EXIT DOOR
+prof.section("6️⃣ IDENTIFY SPACES WITH EVACUATION ORIGIN AT THEIR EXIT DOOR")
 
 # Get doors - works with curtain wall doors
 
-all_doors = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Doors).WhereElementIsNotElementType().ToElements()
-level_doors = [dr for dr in all_doors if dr.LevelId == door_levelid]
+level_doors = snap.elements(BuiltInCategory.OST_Doors, lambda rec: rec.level_id == door_levelid.Value)
 
 
-pathorgs = []
-for path in paths:
-    pathorgs.append((path.PathStart.X, path.PathStart.Y))
+# Path origins hashed in PATH_TOLERANCE (3ft) cells: each door / stair only looks at its neighbouring cells (jfs.proximity)
+pathorgs = proximity.PointIndex(PATH_TOLERANCE, [((path.PathStart.X, path.PathStart.Y), path) for path in paths])
 
-level_dorgs = []
-for dr in level_doors:
-    door_bb = dr.BoundingBox[doc.ActiveView]
-    level_dorgs.append(((door_bb.Max.X + door_bb.Min.X) / 2, (door_bb.Max.Y + door_bb.Min.Y) / 2 ))
+level_dorgs = [door_locs.centre(dr.Id.Value) for dr in level_doors]
 
 doors = []
 doors_o = []
@@ -296,17 +288,15 @@ if not sp_with_intersection:
     doors_n.append((door.FacingOrientation.X, door.FacingOrientation.Y))
 
 for dr, dorg in zip(level_doors, level_dorgs):
-    for pathorg in pathorgs:
-        if distance_2d(dorg, pathorg) < 3:
-            doors.append(dr)
-            doors_o.append(dorg)
-            doors_n.append((dr.FacingOrientation.X, dr.FacingOrientation.Y))
-            break
+    if pathorgs.any_near(dorg):
+        doors.append(dr)
+        doors_o.append(dorg)
+        doors_n.append((dr.FacingOrientation.X, dr.FacingOrientation.Y))
 
 # Get perpendicular line to the door
 
 doors_p1p2 = []
-k = 2
+k = DOOR_PROBE
 for o,n in zip(doors_o, doors_n):
     p1 = (o[0] + k * n[0], o[1] + k * n[1])
     p2 = (o[0] - k * n[0], o[1] - k * n[1])
@@ -315,25 +305,16 @@ for o,n in zip(doors_o, doors_n):
 
 # Search for intersection with previously discarded spaces
 
-sp_with_door = []
+door_segs = [(r1[0], r1[1], r2[0], r2[1]) for r1, r2 in doors_p1p2]     # each door perpendicular line
 
-for sp, spbound in zip(sp_without_intersection, sp_without_intersection_edges_XYZ01):
-    found = False
-    for edge in spbound:         # each boundary line
-        p0, p1 = edge
-        p0 = (p0.X, p0.Y)
-        p1 = (p1.X, p1.Y)
-        for line in doors_p1p2:    # each door perpendicular line
-            r1, r2 = line
-            if intersect_xy(p0, p1, r1, r2):
-                sp_with_door.append(sp)
-                found = True
-                break  # 1 intersection is enough
-        if found:
-            break
+with_door = overlay.spaces_crossed(door_segs,
+                                   [segments_xy(spbound) for spbound in sp_without_intersection_edges_XYZ01])
+
+sp_with_door = [sp for idx, sp in enumerate(sp_without_intersection) if idx in with_door]
 
 
 # 7️⃣ COLLECT OCCUPANCY FROM DOORS / STAIRS
+prof.section("7️⃣ COLLECT OCCUPANCY FROM DOORS / STAIRS")
 
 # Collect people from doors with the parameter filled
 
@@ -347,25 +328,29 @@ for dr in doors_wpeople:
 
 # Collect people from stairs
 
-all_stairs = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Stairs).WhereElementIsNotElementType().ToElements()
+# Direction and base / top level ids from the records of the session snapshot: only the stairs
+# discharging at the door level are read from the model
+stair_params = ('UPWARD EVACUATION', BuiltInParameter.STAIRS_BASE_LEVEL_PARAM, BuiltInParameter.STAIRS_TOP_LEVEL_PARAM)
 
-all_stairs_levelOUT = []
-all_stairs_pointOUT = []
+stairs_level = []
+pointsOUT_level = []
 msg = 0
-for stair in all_stairs:
-    if stair.LookupParameter('UPWARD EVACUATION') and stair.LookupParameter('UPWARD EVACUATION').StorageType == StorageType.Integer:
-        if stair.LookupParameter('UPWARD EVACUATION').HasValue:
-            stair_direction = stair.LookupParameter('UPWARD EVACUATION').AsInteger()
-        else:
-            msg = 2
-            stair_direction = 0
-    else:
-        msg = 1
+for rec in snap.records(BuiltInCategory.OST_Stairs, stair_params):
+    stair_direction = snapshot.value(rec, 'UPWARD EVACUATION')
+    if stair_direction is None:
+        # Not filled, or no such parameter in the category (checked once)
+        if not msg:
+            msg = 2 if doc.GetElement(ElementId(rec.id)).LookupParameter('UPWARD EVACUATION') else 1
         stair_direction = 0
 
-    stair_levelBASE = stair.get_Parameter(BuiltInParameter.STAIRS_BASE_LEVEL_PARAM).AsValueString()
-    stair_levelTOP = stair.get_Parameter(BuiltInParameter.STAIRS_TOP_LEVEL_PARAM).AsValueString()
+    if stair_direction:
+        stair_levelOUT_id = snapshot.value(rec, BuiltInParameter.STAIRS_TOP_LEVEL_PARAM)
+    else:
+        stair_levelOUT_id = snapshot.value(rec, BuiltInParameter.STAIRS_BASE_LEVEL_PARAM)
+    if stair_levelOUT_id != door_levelid.Value:
+        continue
 
+    stair = doc.GetElement(ElementId(rec.id))
     runs = list(stair.GetStairsRuns())
     runs_z = []
     for r in runs:
@@ -377,16 +362,14 @@ for stair in all_stairs:
     runTOP_id = runs_arranged[-1]
 
     if stair_direction:
-        stair_levelOUT = stair_levelTOP
         runOUT = doc.GetElement(runTOP_id)
         pointOUT = list(runOUT.GetStairsPath())[-1].GetEndPoint(1)
     else:
-        stair_levelOUT = stair_levelBASE
         runOUT = doc.GetElement(runBASE_id)
         pointOUT = list(runOUT.GetStairsPath())[0].GetEndPoint(0)
 
-    all_stairs_levelOUT.append(stair_levelOUT)
-    all_stairs_pointOUT.append(pointOUT)
+    stairs_level.append(stair)
+    pointsOUT_level.append(pointOUT)
 
 if msg == 1:
     forms.alert("The parameter 'UPWARD EVACUATION' does not exist in the Stairs category. "
@@ -396,19 +379,10 @@ if msg == 1:
 elif msg == 2:
     forms.alert("There is at least one staircase without the 'UPWARD EVACUATION' parameter filled. For the purposes of this tool, these will be assumed as DOWNWARD evacuation.", exitscript=False)
 
-stairs_level = []
-pointsOUT_level = []
-for stair, lvl, pt in zip(all_stairs, all_stairs_levelOUT, all_stairs_pointOUT):
-    if lvl == door_level:
-        stairs_level.append(stair)
-        pointsOUT_level.append(pt)
-
 stairs = []
 for stair, pt in zip(stairs_level, pointsOUT_level):
-    for path in paths:
-        if distance_2d((path.PathStart.X, path.PathStart.Y), (pt.X, pt.Y)) < 3:
-            stairs.append(stair)
-            break
+    if pathorgs.any_near((pt.X, pt.Y)):
+        stairs.append(stair)
 
 people_stairs = 0
 for stair in stairs:
@@ -416,45 +390,40 @@ for stair in stairs:
 
 
 # 8️⃣ GROUP ALL SPACES, SUM THEIR OCCUPANCY, AND ADD PEOPLE FROM DOORS AND STAIRS
+prof.section("8️⃣ GROUP ALL SPACES, SUM THEIR OCCUPANCY, AND ADD PEOPLE FROM DOORS AND STAIRS")
 
 evac_spaces = list(set(sp_with_intersection + sp_with_door))
 
-def parse_asvaluestring_to_int(value_str):
-    """
-    Converts a Revit AsValueString (with commas, dots, units, etc.)
-    to an integer rounded up.
-    """
-    if not value_str:
-        return None
-
-    # 1. Remove everything that isn't a digit, dot, or comma
-    clean = re.sub(r"[^0-9,.\-]", "", value_str)
-
-    # 2. Unify format: if there is a decimal comma → change to dot
-    if "," in clean and "." not in clean:
-        clean = clean.replace(",", ".")
-
-    # 3. Convert to float
-    try:
-        num = float(clean)
-    except ValueError:
-        return None
-
-    # 4. Round up and return integer
-    return int(math.ceil(num))
+# People of every space of the level in one pass: area x density of its use (CTE DB-SI Table 2.1),
+# or its Revit 'Number of People' if it has no use of the table (jfs.occupancy)
+densities = occupancy.load_densities(occupancy.default_table_path())
+level_occupancy = [(rec.id,
+                    snapshot.value(rec, BuiltInParameter.ROOM_AREA),
+                    snapshot.value(rec, occupancy.USE_PARAM),
+                    snapshot.value(rec, BuiltInParameter.ROOM_NUMBER_OF_PEOPLE_PARAM))
+                   for rec in snap.records(BuiltInCategory.OST_MEPSpaces, space_params)
+                   if rec.level_id == door_levelid.Value]
+space_people = occupancy.level_occupancy(level_occupancy, densities)
+
+unknown = occupancy.unknown_uses(level_occupancy, densities)
+if unknown:
+    forms.alert("These 'OCCUPANCY USE' values are not in the density table, so those spaces keep their "
+                "Revit 'Number of People':\n\n{}".format("\n".join(unknown)), exitscript=False)
 
 number_people = 0
 for sp in evac_spaces:
-    people_str = sp.get_Parameter(BuiltInParameter.ROOM_NUMBER_OF_PEOPLE_PARAM).AsValueString()
-    people_int = parse_asvaluestring_to_int(people_str)
-    number_people = number_people + people_int
+    number_people = number_people + space_people.get(sp.Id.Value, 0)
 
 number_people = number_people + people_doors + people_stairs
 
 
 # 9️⃣ FILL DOOR PARAMETERS
+prof.section("9️⃣ FILL DOOR PARAMETERS")
 
-min_width = max(number_people/200.0, 0.80)
+# Minimum width from the rule table (CTE DB-SI Table 4.1 and the rules of the pyRevit data folder, jfs.widths)
+width_rules = widths.WidthRules(widths.load_rows(widths.default_rules_path()))
+width_rule = width_rules.rule(widths.DOOR)
+min_width = width_rule.width(P=number_people)
 min_width_ft = min_width * 3.28084
 
 t = Transaction(doc, __title__)
@@ -468,6 +437,8 @@ door_MW.Set(min_width_ft)
 
 t.Commit()
 
+prof.finish()
+
 # 🔟 FINAL MESSAGE: COMPLIANT / NON-COMPLIANT
 
 # Get door width / curtain wall door width
@@ -487,16 +458,16 @@ w = total_width + 0.09999
 
 if w >= min_width_ft:
     forms.alert(
-        "The calculated number of people is {}, which requires a minimum door width of {:.2f} m according to CTE DB-SI.\n\n"
+        "The calculated number of people is {}, which requires a minimum door width of {:.2f} m according to {} ({}).\n\n"
         "These values have been added to the 'NUMBER PEOPLE' and 'MINIMUM WIDTH' parameters respectively.\n\n"
     
         "The current total width of the door is {:.2f} m, so it IS COMPLIANT with the minimum evacuation width."
-        .format(number_people, float(min_width), float(total_width_m)), exitscript=False)
+        .format(number_people, float(min_width), width_rule.code, width_rule.description, float(total_width_m)), exitscript=False)
 
 else:
     forms.alert(
-        "The calculated number of people is {}, which requires a minimum door width of {:.2f} m according to CTE DB-SI.\n\n"
+        "The calculated number of people is {}, which requires a minimum door width of {:.2f} m according to {} ({}).\n\n"
         "These values have been added to the 'NUMBER PEOPLE' and 'MINIMUM WIDTH' parameters respectively.\n\n"
 
         "The current total width of the door is {:.2f} m, so it IS NOT COMPLIANT with the minimum evacuation width."
-        .format(number_people, float(min_width), float(total_width_m)), exitscript=False)
\ No newline at end of file
+        .format(number_people, float(min_width), width_rule.code, width_rule.description, float(total_width_m)), exitscript=False)
\ No newline at end of file
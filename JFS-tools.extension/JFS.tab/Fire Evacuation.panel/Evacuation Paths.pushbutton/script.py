@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+__title__   = "Evacuation Paths"
+__doc__     = """Version = 1.0
+Date     = 19.10.2026
+________________________________________________________________
+Description:
+
+EN - This tool draws the evacuation paths (Path of Travel) of the spaces no path starts in or crosses, from their most remote
+point to the nearest exit of the floor (exterior door or staircase), so that the 'Evacuation Doors' and 'Evacuation Stairs'
+tools can size them.
+ES - Esta herramienta dibuja las trayectorias de evacuación (Path of Travel) de los espacios en los que no empieza ni por los que
+pasa ninguna trayectoria, desde su punto más alejado hasta la salida de planta más cercana (puerta exterior o escalera), para
+que las herramientas 'Evacuation Doors' y 'Evacuation Stairs' puedan dimensionarlas.
+________________________________________________________________
+How-To:
+
+EN - Run the tool, review the table of candidate paths in the output window and confirm. Routes are found on a grid of the
+spaces of each level that only crosses walls at doors; Revit draws each path between the same start and end points in a
+floor plan of its level. Spaces without 'ADDS OCCUPANCY' or without people are skipped.
+ES - Ejecutar la herramienta, revisar la tabla de trayectorias propuestas en la ventana de resultados y confirmar. Los
+recorridos se buscan en una malla de los espacios de cada planta que solo atraviesa los muros por las puertas; Revit dibuja
+cada trayectoria entre los mismos puntos de inicio y fin en una planta de su nivel. Se omiten los espacios sin 'ADDS OCCUPANCY'
+o sin ocupantes.
+________________________________________________________________
+TODO:
+
+- New functionalities as they arise.
+________________________________________________________________
+Last Updates:
+
+- [19.10.2026] v1.0 Routes of the unpathed spaces from a navigation grid per level (jfs.navigation), one multi-source Dijkstra from the floor exits.
+________________________________________________________________
+Author: Javier Fidalgo Saeta"""
+
+
+# IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS
+
+from Autodesk.Revit.DB import *
+
+from pyrevit import forms, script
+
+from jfs import navigation, profiling, revitevacuation, travel
+
+
+# VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES - VARIABLES
+
+app    = __revit__.Application
+uidoc  = __revit__.ActiveUIDocument
+doc    = __revit__.ActiveUIDocument.Document #type:Document
+
+# Stage timings and API counts: Shift+Click the button (see jfs.profiling)
+prof = profiling.start(__title__, __shiftclick__)
+
+
+# MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN
+
+
+# 1️⃣ READ SPACES, PATHS, DOORS AND STAIRS
+prof.section("1️⃣ READ SPACES, PATHS, DOORS AND STAIRS")
+
+model = revitevacuation.read_model(doc)
+level_names = dict((lvl.Id.Value, lvl.Name) for lvl in FilteredElementCollector(doc).OfClass(Level))
+
+if not model.spaces:
+    forms.alert("No spaces adding occupancy found in the model.", exitscript=True)
+
+
+# 2️⃣ ROUTES FROM THE UNPATHED SPACES TO THE FLOOR EXITS
+prof.section("2️⃣ ROUTES FROM THE UNPATHED SPACES TO THE FLOOR EXITS")
+
+# Navigation grid of every level and one multi-source Dijkstra from its exits
+plan = navigation.candidate_paths(model)
+prof.count("candidate paths", len(plan.paths))
+
+if not plan.paths and not plan.unreachable:
+    forms.alert("Every space with people already has an evacuation path.", exitscript=True)
+
+
+# 3️⃣ CANDIDATE PATHS
+prof.section("3️⃣ CANDIDATE PATHS")
+
+
+def element_name(element_id):
+    elem = doc.GetElement(ElementId(element_id))
+    return elem.Name if elem else str(element_id)
+
+
+no_level = "(no level)"
+rows = sorted([level_names.get(p.level, no_level), element_name(plan.origins[p.id]), element_name(plan.exits[p.id]),
+               "{:.2f}".format(travel.polyline_length(p.segments) * travel.FT_TO_M)] for p in plan.paths)
+unreachable = sorted([level_names.get(model.spaces[sid].level, no_level), element_name(sid)]
+                     for sid in plan.unreachable)
+
+output = script.get_output()
+if rows:
+    output.print_table(rows, columns=["Level", "Space", "Exit", "Length (m)"], title="Candidate evacuation paths")
+if unreachable:
+    output.print_table(unreachable, columns=["Level", "Space"],
+                       title="Spaces without a route to an exterior door or staircase")
+
+if not plan.paths:
+    forms.alert("No space without evacuation path can reach an exterior door or a staircase of its floor. "
+                "Check the doors of those spaces (see the output window).", exitscript=True)
+
+if not forms.alert("{} evacuation paths will be drawn (see the output window).\n\nContinue?".format(len(plan.paths)),
+                   yes=True, no=True):
+    script.exit()
+
+
+# 4️⃣ CREATE PATHS OF TRAVEL
+prof.section("4️⃣ CREATE PATHS OF TRAVEL")
+
+views = revitevacuation.plan_views(doc)
+
+t = Transaction(doc, __title__)
+t.Start()
+
+created, failed = revitevacuation.create_paths(doc, plan.paths, views)
+
+t.Commit()
+
+prof.count("paths of travel created", len(created))
+prof.finish()
+
+# 5️⃣ FINAL MESSAGE
+message = "{} evacuation paths drawn.".format(len(created))
+if failed:
+    message += ("\n\n{} could not be drawn (no floor plan of their level, or Revit found no route between their "
+                "points).".format(len(failed)))
+if unreachable:
+    message += "\n\n{} spaces cannot reach an exit of their floor (see the output window).".format(len(unreachable))
+forms.alert(message, exitscript=False)
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 __title__   = "Evacuation Stairs"
-__doc__     = """Version = 1.0
-Fecha    = 29.10.2025
+__doc__     = """Version = 1.13
+Fecha    = 19.10.2026
 ________________________________________________________________
 Description:
 
@@ -27,29 +27,38 @@ ________________________________________________________________
 Last Updates:
 
 - [29.10.2025] v1.0 Tool assuming simple width calculation cases (min_width = max(number_people / 160.0, 1.0)).
+- [19.10.2026] v1.1 Paths, spaces and doors of the level from the session element snapshot (jfs.snapshot).
+- [19.10.2026] v1.2 Shared helpers (jfs.geometry / jfs.legends) and no unused imports: faster startup.
+- [19.10.2026] v1.3 Stage timings and API counts on Shift+Click (jfs.profiling).
+- [19.10.2026] v1.4 Exact segment intersection (jfs.geometry): collinear or touching paths and boundaries are always detected.
+- [19.10.2026] v1.5 Spaces crossed by the paths from a single plane sweep over all segments of the level (jfs.overlay).
+- [19.10.2026] v1.6 Doors and stairs at the path origins matched through a hashed-grid index of the path starts (jfs.proximity).
+- [19.10.2026] v1.7 Doors and stairs located from their model bounding boxes (jfs.locations): independent of the active view.
+- [19.10.2026] v1.8 Space occupancy from area x use density (CTE DB-SI Table 2.1, jfs.occupancy), read with AsDouble; Revit 'Number of People' for spaces without 'OCCUPANCY USE'.
+- [19.10.2026] v1.9 Minimum width from the compiled rule table of jfs.widths (CTE DB-SI Table 4.1): protected ('PROTECTED STAIR') and upward evacuation stairs.
+- [19.10.2026] v1.10 Missing paths: points to the 'Evacuation Paths' tool, which draws them.
+- [19.10.2026] v1.11 Width rule and parameters of the selected staircase (the stair loops no longer overwrite it).
+- [19.10.2026] v1.12 Stairs and their IN / OUT levels from the session snapshot: only those discharging at the IN level are read.
+- [19.10.2026] v1.13 Path end, path origin, door probe and vertical continuity tolerances shared with the evacuation model (jfs.evacuation).
 ________________________________________________________________
 Author: Javier Fidalgo Saeta"""
 
 
 # IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS
 
-from types import ObjectType
-
-
 from Autodesk.Revit.DB import *
 from Autodesk.Revit.UI.Selection import *
 
 from pyrevit import forms
 
-import math
-
-import re
-
 import sys
 
 #.NET Imports
 import clr
-from rpw.db import FamilyInstance
+
+from jfs import occupancy, overlay, profiling, proximity, snapshot, widths
+from jfs.evacuation import CONTINUITY_TOLERANCE, DOOR_PROBE, PATH_TOLERANCE
+from jfs.geometry import distance_2d, segments_xy
 
 clr.AddReference('System')
 from System.Collections.Generic import List
@@ -61,9 +70,8 @@ app    = __revit__.Application
 uidoc  = __revit__.ActiveUIDocument
 doc    = __revit__.ActiveUIDocument.Document #type:Document
 
-
-def distance_2d(p1, p2):
-    return math.sqrt((p2[0] - p1[0])**2 + (p2[1] - p1[1])**2)
+# Stage timings and API counts: Shift+Click the button (see jfs.profiling)
+prof = profiling.start(__title__, __shiftclick__)
 
 
 # MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN - MAIN
@@ -100,6 +108,7 @@ if res == "Cancel":
 
 
 # 1️⃣ SELECT THE STAIRCASE TO ANALYZE AND OBTAIN ITS RUNS, LEVELS, AND EVACUATION DIRECTION
+prof.section("1️⃣ SELECT THE STAIRCASE TO ANALYZE AND OBTAIN ITS RUNS, LEVELS, AND EVACUATION DIRECTION")
 
 # This method ensures only an element with the category name "stairs" is selectable:
 
@@ -109,47 +118,45 @@ class stair_filter(ISelectionFilter):
             return True
 try:
     sel_str = uidoc.Selection.PickObject(ObjectType.Element, stair_filter())
-    stair = doc.GetElement(sel_str)
+    sel_stair = doc.GetElement(sel_str)
 except:
     forms.alert('Nothing selected. Please select a staircase to continue.', exitscript=True)
 
 # Parameter check
 
-if not stair.LookupParameter('NUMBER PEOPLE'):
+if not sel_stair.LookupParameter('NUMBER PEOPLE'):
     forms.alert("The parameter 'NUMBER PEOPLE' does not exist in the stairs category. "
                 "Add this shared parameter for the tool to function correctly.", exitscript=True)
 
-if not stair.LookupParameter('MINIMUM WIDTH'):
+if not sel_stair.LookupParameter('MINIMUM WIDTH'):
     forms.alert("The parameter 'MINIMUM WIDTH' does not exist in the stairs category. "
                 "Add this shared parameter for the tool to function correctly.", exitscript=True)
 
-if not stair.LookupParameter('UPWARD EVACUATION'):
+if not sel_stair.LookupParameter('UPWARD EVACUATION'):
     forms.alert("The 'UPWARD EVACUATION' parameter does not exist in the stairs category. For the purposes of this tool, it will be assumed that all stairs are DOWNWARD evacuation.\n\n"
                 "Add this shared parameter for the tool to work correctly if upward evacuation stairs exist.", exitscript=False)
-    stair_direction = 0
+    sel_direction = 0
 
-elif not stair.LookupParameter('UPWARD EVACUATION').HasValue:
+elif not sel_stair.LookupParameter('UPWARD EVACUATION').HasValue:
     forms.alert("The selected staircase does not have the 'UPWARD EVACUATION' parameter filled. "
                 "For the purposes of this tool, it will be assumed that this staircase is DOWNWARD evacuation.",
                 exitscript=False)
-    stair_direction = 0
+    sel_direction = 0
 
 else:
-    stair_direction = stair.LookupParameter('UPWARD EVACUATION').AsInteger()
+    sel_direction = sel_stair.LookupParameter('UPWARD EVACUATION').AsInteger()
 
-stair_bb_max = (stair.BoundingBox[doc.ActiveView].Max.X, stair.BoundingBox[doc.ActiveView].Max.Y)
-stair_bb_min = (stair.BoundingBox[doc.ActiveView].Min.X, stair.BoundingBox[doc.ActiveView].Min.Y)
-stair_bb_med = (
-    (stair_bb_min[0] + stair_bb_max[0]) / 2,
-    (stair_bb_min[1] + stair_bb_max[1]) / 2
-)
+# Model bounding boxes of the stairs (session snapshot): independent of the active view (jfs.locations)
+snap = snapshot.ElementSnapshot(doc)
+stair_locs = snap.locations(BuiltInCategory.OST_Stairs)
+stair_bb_med = stair_locs.centre(sel_stair.Id.Value)
 
-stair_levelBASE      = stair.get_Parameter(BuiltInParameter.STAIRS_BASE_LEVEL_PARAM).AsValueString()
-stair_levelTOP       = stair.get_Parameter(BuiltInParameter.STAIRS_TOP_LEVEL_PARAM).AsValueString()
-stair_levelBASE_id   = stair.get_Parameter(BuiltInParameter.STAIRS_BASE_LEVEL_PARAM).AsElementId()
-stair_levelTOP_id    = stair.get_Parameter(BuiltInParameter.STAIRS_TOP_LEVEL_PARAM).AsElementId()
+stair_levelBASE_id   = sel_stair.get_Parameter(BuiltInParameter.STAIRS_BASE_LEVEL_PARAM).AsElementId()
+stair_levelTOP_id    = sel_stair.get_Parameter(BuiltInParameter.STAIRS_TOP_LEVEL_PARAM).AsElementId()
+stair_levelBASE      = doc.GetElement(stair_levelBASE_id).Name
+stair_levelTOP       = doc.GetElement(stair_levelTOP_id).Name
 
-runs = list(stair.GetStairsRuns())
+runs = list(sel_stair.GetStairsRuns())
 runs_z = []
 for t in runs:
     t = doc.GetElement(t)
@@ -159,7 +166,7 @@ runs_arranged = [x for _, x in sorted(zip(runs_z, runs))]
 runBASE_id = runs_arranged[0]
 runTOP_id = runs_arranged[-1]
 
-if stair_direction:
+if sel_direction:
     stair_levelIN    = stair_levelBASE
     stair_levelOUT   = stair_levelTOP
     stair_levelIN_id = stair_levelBASE_id
@@ -179,18 +186,21 @@ else:
 
 
 # 2️⃣ FIND EVACUATION PATHS THAT END AT THE STAIRCASE AND GET THEIR COMPONENT LINES
+prof.section("2️⃣ FIND EVACUATION PATHS THAT END AT THE STAIRCASE AND GET THEIR COMPONENT LINES")
 
 # Get evacuation paths for this level
 
-all_paths = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_PathOfTravelLines).WhereElementIsNotElementType().ToElements()
-level_paths = [path for path in all_paths if path.get_Parameter(BuiltInParameter.PATH_OF_TRAVEL_LEVEL_NAME).AsString() == stair_levelIN]
+# (records of the session snapshot: the model is only walked on the first run)
+level_paths = snap.elements(BuiltInCategory.OST_PathOfTravelLines,
+                            lambda rec: snapshot.value(rec, BuiltInParameter.PATH_OF_TRAVEL_LEVEL_NAME) == stair_levelIN,
+                            params=(BuiltInParameter.PATH_OF_TRAVEL_LEVEL_NAME,))
 
 # Keep those that end at the staircase
 
-paths = [path for path in level_paths if distance_2d((path.PathEnd.X,path.PathEnd.Y),(pointIN.X, pointIN.Y)) < 3]
+paths = [path for path in level_paths if distance_2d((path.PathEnd.X,path.PathEnd.Y),(pointIN.X, pointIN.Y)) < PATH_TOLERANCE]
 
 if not paths:
-    forms.alert("No evacuation path ends at the selected staircase. You must draw evacuation paths for the floor/building before running the tool.\n\n"
+    forms.alert("No evacuation path ends at the selected staircase. You must draw evacuation paths for the floor/building before running the tool, or generate them with the 'Evacuation Paths' tool.\n\n"
                 "If it is a protected staircase and paths end at its compartment door, it is recommended to run the 'Evacuation Doors' tool on those doors and manually add the sum of their 'NUMBER PEOPLE' to the staircase parameter.\n\n"
                 "Alternatively, this could be a staircase connecting a floor with downward evacuation to an upper floor with upward evacuation; in which case, 'NUMBER PEOPLE' would remain at '0'.", exitscript=False)
 
@@ -211,9 +221,12 @@ for line in linpaths:
 
 
 # 3️⃣ COLLECT SPACES WITH LEVEL FILTERS AND 'ADDS OCCUPANCY'
+prof.section("3️⃣ COLLECT SPACES WITH LEVEL FILTERS AND 'ADDS OCCUPANCY'")
 
-all_spaces = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_MEPSpaces).WhereElementIsNotElementType().ToElements()
-level_spaces = [sp for sp in all_spaces if doc.GetElement(sp.LevelId).Name == stair_levelIN]
+# Area, use and Revit number of people are read with the records, for the occupancy in 8️⃣
+space_params = (BuiltInParameter.ROOM_AREA, occupancy.USE_PARAM, BuiltInParameter.ROOM_NUMBER_OF_PEOPLE_PARAM)
+level_spaces = snap.elements(BuiltInCategory.OST_MEPSpaces, lambda rec: rec.level_id == stair_levelIN_id.Value,
+                             params=space_params)
 
 spaces = []
 msg = 0
@@ -238,6 +251,7 @@ elif msg == 2:
 
 
 # 4️⃣ GET SPACE BOUNDARY LINES
+prof.section("4️⃣ GET SPACE BOUNDARY LINES")
 
 # Get the bottom face of the spaces
 
@@ -275,66 +289,41 @@ for face in spfacesinf:
 
 
 # 5️⃣ INTERSECTION CALCULATION BETWEEN PATHS AND SPACES
+prof.section("5️⃣ INTERSECTION CALCULATION BETWEEN PATHS AND SPACES")
 
-# 1. FUNCTIONS
-
-def ccw_XYZ(A, B, C):
-    """Checks if points A, B, C are in counter-clockwise order"""
-    return (C.Y - A.Y) * (B.X - A.X) > (B.Y - A.Y) * (C.X - A.X)
-
-def intersect_XYZ(A, B, C, D):
-    """Returns True if segments AB and CD intersect"""
-    return (ccw_XYZ(A, C, D) != ccw_XYZ(B, C, D)) and (ccw_XYZ(A, B, C) != ccw_XYZ(A, B, D))
-
-def ccw_xy(A, B, C):
-    """Checks if points A, B, C are in counter-clockwise order (tuple version)"""
-    return (C[1] - A[1]) * (B[0] - A[0]) > (B[1] - A[1]) * (C[0] - A[0])
-
-def intersect_xy(A, B, C, D):
-    """Returns True if segments AB and CD intersect (tuple version)"""
-    return (ccw_xy(A, C, D) != ccw_xy(B, C, D)) and (ccw_xy(A, B, C) != ccw_xy(A, B, D))
-
-# 2. LOOPS
+# One plane sweep over all path and boundary segments (jfs.overlay), with exact intersection tests:
+# a path touching or running along a boundary line intersects it
 
 sp_with_intersection = []
 sp_without_intersection = []
 sp_without_intersection_edges_XYZ01 = []
 
-for sp, spbound in zip(spaces, sp_edges_XYZ01):          # each space
-    found = False
-    for edge in spbound:                                 # each boundary line
-        p0, p1 = edge
-        for line in linpaths_XYZ01:                          # each path segment
-            r0, r1 = line
-            if intersect_XYZ(p0, p1, r0, r1):
-                sp_with_intersection.append(sp)
-                found = True
-                break   # 1 intersection is enough
-        if found:
-            break
+crossed = overlay.spaces_crossed(segments_xy(linpaths_XYZ01),
+                                 [segments_xy(spbound) for spbound in sp_edges_XYZ01])
+
+for idx, (sp, spbound) in enumerate(zip(spaces, sp_edges_XYZ01)):          # each space
+    if idx in crossed:
+        sp_with_intersection.append(sp)
 
     # if NO intersection occurred, save the space and its edges
-    if not found:
+    else:
         sp_without_intersection.append(sp)
         sp_without_intersection_edges_XYZ01.append(spbound)
 
 
 # 6️⃣ IDENTIFY SPACES WITH EVACUATION ORIGIN AT THEIR EXIT DOOR
+prof.section("6️⃣ IDENTIFY SPACES WITH EVACUATION ORIGIN AT THEIR EXIT DOOR")
 
 # Get doors - works with curtain wall doors
 
-all_doors = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Doors).WhereElementIsNotElementType().ToElements()
-level_doors = [dr for dr in all_doors if dr.LevelId == stair_levelIN_id]
+door_locs = snap.locations(BuiltInCategory.OST_Doors)
+level_doors = snap.elements(BuiltInCategory.OST_Doors, lambda rec: rec.level_id == stair_levelIN_id.Value)
 
 
-pathorgs = []
-for path in paths:
-    pathorgs.append((path.PathStart.X, path.PathStart.Y))
+# Path origins hashed in PATH_TOLERANCE (3ft) cells: each door / stair only looks at its neighbouring cells (jfs.proximity)
+pathorgs = proximity.PointIndex(PATH_TOLERANCE, [((path.PathStart.X, path.PathStart.Y), path) for path in paths])
 
-level_dorgs = []
-for dr in level_doors:
-    door_bb = dr.BoundingBox[doc.ActiveView]
-    level_dorgs.append(((door_bb.Max.X + door_bb.Min.X) / 2, (door_bb.Max.Y + door_bb.Min.Y) / 2 ))
+level_dorgs = [door_locs.centre(dr.Id.Value) for dr in level_doors]
 
 doors = []
 doors_o = []
@@ -342,17 +331,15 @@ doors_n = []
 
 
 for dr, dorg in zip(level_doors, level_dorgs):
-    for pathorg in pathorgs:
-        if distance_2d(dorg, pathorg) < 3:
-            doors.append(dr)
-            doors_o.append(dorg)
-            doors_n.append((dr.FacingOrientation.X, dr.FacingOrientation.Y))
-            break
+    if pathorgs.any_near(dorg):
+        doors.append(dr)
+        doors_o.append(dorg)
+        doors_n.append((dr.FacingOrientation.X, dr.FacingOrientation.Y))
 
 # Get perpendicular line to the door
 
 doors_p1p2 = []
-k = 2
+k = DOOR_PROBE
 for o,n in zip(doors_o, doors_n):
     p1 = (o[0] + k * n[0], o[1] + k * n[1])
     p2 = (o[0] - k * n[0], o[1] - k * n[1])
@@ -361,25 +348,16 @@ for o,n in zip(doors_o, doors_n):
 
 # Search for intersection with previously discarded spaces
 
-sp_with_door = []
+door_segs = [(r1[0], r1[1], r2[0], r2[1]) for r1, r2 in doors_p1p2]     # each door perpendicular line
+
+with_door = overlay.spaces_crossed(door_segs,
+                                   [segments_xy(spbound) for spbound in sp_without_intersection_edges_XYZ01])
 
-for sp, spbound in zip(sp_without_intersection, sp_without_intersection_edges_XYZ01):
-    found = False
-    for edge in spbound:         # each boundary line
-        p0, p1 = edge
-        p0 = (p0.X, p0.Y)
-        p1 = (p1.X, p1.Y)
-        for line in doors_p1p2:    # each door perpendicular line
-            r1, r2 = line
-            if intersect_xy(p0, p1, r1, r2):
-                sp_with_door.append(sp)
-                found = True
-                break  # 1 intersection is enough
-        if found:
-            break
+sp_with_door = [sp for idx, sp in enumerate(sp_without_intersection) if idx in with_door]
 
 
 # 7️⃣ COLLECT OCCUPANCY FROM DOORS / STAIRS + PREVIOUS STAIRS IN EVACUATION
+prof.section("7️⃣ COLLECT OCCUPANCY FROM DOORS / STAIRS + PREVIOUS STAIRS IN EVACUATION")
 
 # Collect people from doors where the parameter is filled
 
@@ -391,141 +369,130 @@ for dr in doors_wpeople:
 
 # Collect people from stairs + previous stairs in vertical evacuation
 
-all_stairs = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Stairs).WhereElementIsNotElementType().ToElements()
+# Direction and base / top level ids from the records of the session snapshot: only the stairs
+# discharging at the IN level are read from the model
+stair_params = ('UPWARD EVACUATION', BuiltInParameter.STAIRS_BASE_LEVEL_PARAM, BuiltInParameter.STAIRS_TOP_LEVEL_PARAM)
 
-
-all_stairs_levelOUT = []
-all_stairs_pointOUT = []
+stairs_level = []
+pointsOUT_level = []
 msg = 0
-for stair in all_stairs:
-    if stair.LookupParameter('UPWARD EVACUATION') and stair.LookupParameter('UPWARD EVACUATION').StorageType == StorageType.Integer:
-        if stair.LookupParameter('UPWARD EVACUATION').HasValue:
-            stair_direction = stair.LookupParameter('UPWARD EVACUATION').AsInteger()
-        else:
+for rec in snap.records(BuiltInCategory.OST_Stairs, stair_params):
+    st_direction = snapshot.value(rec, 'UPWARD EVACUATION')
+    if st_direction is None:
+        # Not filled (a category without the parameter was already reported in 1️⃣)
+        if sel_stair.LookupParameter('UPWARD EVACUATION'):
             msg = 1
-            stair_direction = 0
-    else:
-        stair_direction = 0
-
-    stair_levelBASE = stair.get_Parameter(BuiltInParameter.STAIRS_BASE_LEVEL_PARAM).AsValueString()
-    stair_levelTOP = stair.get_Parameter(BuiltInParameter.STAIRS_TOP_LEVEL_PARAM).AsValueString()
+        st_direction = 0
 
-    runs = list(stair.GetStairsRuns())
-    runs_z = []
-    for t in runs:
+    if st_direction:
+        st_levelOUT_id = snapshot.value(rec, BuiltInParameter.STAIRS_TOP_LEVEL_PARAM)
+    else:
+        st_levelOUT_id = snapshot.value(rec, BuiltInParameter.STAIRS_BASE_LEVEL_PARAM)
+    if st_levelOUT_id != stair_levelIN_id.Value:
+        continue
+
+    st = doc.GetElement(ElementId(rec.id))
+    st_runs = list(st.GetStairsRuns())
+    st_runs_z = []
+    for t in st_runs:
         t = doc.GetElement(t)
-        runs_z.append(t.BaseElevation)
-    runs_arranged = [x for _, x in sorted(zip(runs_z, runs))]
+        st_runs_z.append(t.BaseElevation)
+    st_runs_arranged = [x for _, x in sorted(zip(st_runs_z, st_runs))]
 
-    runBASE_id = runs_arranged[0]
-    runTOP_id = runs_arranged[-1]
+    st_runBASE_id = st_runs_arranged[0]
+    st_runTOP_id = st_runs_arranged[-1]
 
-    if stair_direction:
-        stair_levelOUT = stair_levelTOP
-        stair_runOUT = doc.GetElement(runTOP_id)
-        stair_pointOUT = list(stair_runOUT.GetStairsPath())[-1].GetEndPoint(1)
+    if st_direction:
+        st_runOUT = doc.GetElement(st_runTOP_id)
+        st_pointOUT = list(st_runOUT.GetStairsPath())[-1].GetEndPoint(1)
     else:
-        stair_levelOUT = stair_levelBASE
-        stair_runOUT = doc.GetElement(runBASE_id)
-        stair_pointOUT = list(stair_runOUT.GetStairsPath())[0].GetEndPoint(0)
+        st_runOUT = doc.GetElement(st_runBASE_id)
+        st_pointOUT = list(st_runOUT.GetStairsPath())[0].GetEndPoint(0)
 
-    all_stairs_levelOUT.append(stair_levelOUT)
-    all_stairs_pointOUT.append(stair_pointOUT)
+    stairs_level.append(st)
+    pointsOUT_level.append(st_pointOUT)
 
 if msg == 1:
     forms.alert("At least one stair in the project is missing the 'UPWARD EVACUATION' parameter. "
                 "For this tool, these stairs will be assumed as DOWNWARD evacuation.", exitscript=False)
 
-# Filter stairs that discharge at the current level
-stairs_level = []
-pointsOUT_level = []
-for stair, lvl, pt in zip(all_stairs, all_stairs_levelOUT, all_stairs_pointOUT):
-    if lvl == stair_levelIN:
-        stairs_level.append(stair)
-        pointsOUT_level.append(pt)
-
 # Spatial check to see if the discharging stair belongs to the current evacuation path
 stairs = []
-for stair, pt in zip(stairs_level, pointsOUT_level):
-    bb_max = (stair.BoundingBox[doc.ActiveView].Max.X, stair.BoundingBox[doc.ActiveView].Max.Y)
-    bb_min = (stair.BoundingBox[doc.ActiveView].Min.X, stair.BoundingBox[doc.ActiveView].Min.Y)
-    x, y = stair_bb_med
-
+for st, pt in zip(stairs_level, pointsOUT_level):
     # VERTICAL CONTINUITY
     # Check if the mid-point of the evacuation stair's Bounding Box is inside the current stair's BB
-    INbb = (bb_min[0] <= x <= bb_max[0]) and (bb_min[1] <= y <= bb_max[1])
+    INbb = stair_locs.contains(st.Id.Value, stair_bb_med)
 
-    # Check if the distance between the IN point and OUT point is within tolerance (5 feet)
-    if INbb or distance_2d((pointIN.X, pointIN.Y), (pt.X, pt.Y)) < 5:
-        stairs.append(stair)
+    # Check if the distance between the IN point and OUT point is within tolerance (CONTINUITY_TOLERANCE, 5 feet)
+    if INbb or distance_2d((pointIN.X, pointIN.Y), (pt.X, pt.Y)) < CONTINUITY_TOLERANCE:
+        stairs.append(st)
 
     # STAIRS FROM PATH ORIGIN
-    else:
-        for path in paths:
-            if distance_2d((path.PathStart.X, path.PathStart.Y), (pt.X, pt.Y)) < 3:
-                stairs.append(stair)
-                break
+    elif pathorgs.any_near((pt.X, pt.Y)):
+        stairs.append(st)
 
 people_stairs = 0
-for stair in stairs:
-    people_stairs = people_stairs + stair.LookupParameter('NUMBER PEOPLE').AsInteger()
+for st in stairs:
+    people_stairs = people_stairs + st.LookupParameter('NUMBER PEOPLE').AsInteger()
 
 
 # 8️⃣ GROUP ALL SPACES, SUM THEIR OCCUPANCY, AND ADD PEOPLE FROM DOORS AND STAIRS
+prof.section("8️⃣ GROUP ALL SPACES, SUM THEIR OCCUPANCY, AND ADD PEOPLE FROM DOORS AND STAIRS")
 
 evac_spaces = list(set(sp_with_intersection + sp_with_door))
 
 
-def parse_asvaluestring_to_int(value_str):
-    """
-    Converts a Revit AsValueString (with commas, dots, units, etc.)
-    to an integer rounded up.
-    """
-    if not value_str:
-        return None
-
-    # 1. Remove everything that isn't a digit, dot, or comma
-    clean = re.sub(r"[^0-9,.\-]", "", value_str)
-
-    # 2. Unify format: if there is a decimal comma → change to dot
-    if "," in clean and "." not in clean:
-        clean = clean.replace(",", ".")
-
-    # 3. Convert to float
-    try:
-        num = float(clean)
-    except ValueError:
-        return None
-
-    # 4. Round up and return integer
-    return int(math.ceil(num))
+# People of every space of the level in one pass: area x density of its use (CTE DB-SI Table 2.1),
+# or its Revit 'Number of People' if it has no use of the table (jfs.occupancy)
+densities = occupancy.load_densities(occupancy.default_table_path())
+level_occupancy = [(rec.id,
+                    snapshot.value(rec, BuiltInParameter.ROOM_AREA),
+                    snapshot.value(rec, occupancy.USE_PARAM),
+                    snapshot.value(rec, BuiltInParameter.ROOM_NUMBER_OF_PEOPLE_PARAM))
+                   for rec in snap.records(BuiltInCategory.OST_MEPSpaces, space_params)
+                   if rec.level_id == stair_levelIN_id.Value]
+space_people = occupancy.level_occupancy(level_occupancy, densities)
 
+unknown = occupancy.unknown_uses(level_occupancy, densities)
+if unknown:
+    forms.alert("These 'OCCUPANCY USE' values are not in the density table, so those spaces keep their "
+                "Revit 'Number of People':\n\n{}".format("\n".join(unknown)), exitscript=False)
 
 number_people = 0
 for sp in evac_spaces:
-    people_str = sp.get_Parameter(BuiltInParameter.ROOM_NUMBER_OF_PEOPLE_PARAM).AsValueString()
-    people_int = parse_asvaluestring_to_int(people_str)
-    number_people = number_people + people_int
+    number_people = number_people + space_people.get(sp.Id.Value, 0)
 
 number_people = number_people + people_doors + people_stairs
 
 
 # 9️⃣ FILL STAIR PARAMETERS
-
-min_width = max(number_people / 160.0, 1.0)        # CHECK
+prof.section("9️⃣ FILL STAIR PARAMETERS")
+
+# Minimum width from the rule table (CTE DB-SI Table 4.1 and the rules of the pyRevit data folder, jfs.widths)
+# - Protected stairs: optional Yes/No parameter 'PROTECTED STAIR' (S, the stair area, is taken as 0: conservative)
+# - Upward evacuation: H is the height between the IN and OUT levels of the staircase
+stair_protected = sel_stair.LookupParameter('PROTECTED STAIR')
+stair_protected = bool(stair_protected and stair_protected.HasValue and stair_protected.AsInteger())
+evacuation_height = abs(doc.GetElement(stair_levelOUT_id).Elevation - doc.GetElement(stair_levelIN_id).Elevation) / 3.28084
+
+width_rules = widths.WidthRules(widths.load_rows(widths.default_rules_path()))
+width_rule = width_rules.rule(widths.STAIR, protected=stair_protected, upward=sel_direction)
+min_width = width_rule.width(P=number_people, H=evacuation_height)
 min_width_ft = min_width * 3.28084
 
 t = Transaction(doc, __title__)
 t.Start()
 
-stair_NP = stair.LookupParameter('NUMBER PEOPLE')
+stair_NP = sel_stair.LookupParameter('NUMBER PEOPLE')
 stair_NP.Set(number_people)
 
-stair_MW = stair.LookupParameter('MINIMUM WIDTH')
+stair_MW = sel_stair.LookupParameter('MINIMUM WIDTH')
 stair_MW.Set(min_width_ft)
 
 t.Commit()
 
+prof.finish()
+
 # 🔟 FINAL MESSAGE: COMPLIANT / NON-COMPLIANT
 
 # Get stair width
@@ -536,16 +503,16 @@ w = total_width + 0.09999
 
 if w >= min_width_ft:
     forms.alert(
-        "Calculated occupancy: {}. This requires a minimum stair width of {:.2f} m according to CTE DB-SI (assuming unprotected downward stairs).\n\n"
+        "Calculated occupancy: {}. This requires a minimum stair width of {:.2f} m according to {} ({}).\n\n"
         "These values have been added to the 'NUMBER PEOPLE' and 'MINIMUM WIDTH' parameters.\n\n"
         
         "The current stair width is {:.2f} m: PASSES the minimum evacuation width requirement."
-        .format(number_people, float(min_width), float(total_width_m)), exitscript=False)
+        .format(number_people, float(min_width), width_rule.code, width_rule.description, float(total_width_m)), exitscript=False)
 
 else:
     forms.alert(
-        "Calculated occupancy: {}. This requires a minimum stair width of {:.2f} m according to CTE DB-SI (assuming unprotected downward stairs).\n\n"
+        "Calculated occupancy: {}. This requires a minimum stair width of {:.2f} m according to {} ({}).\n\n"
         "These values have been added to the 'NUMBER PEOPLE' and 'MINIMUM WIDTH' parameters.\n\n"
 
         "The current stair width is {:.2f} m: DOES NOT COMPLY with the minimum evacuation width requirement."
-        .format(number_people, float(min_width), float(total_width_m)), exitscript=False)
+        .format(number_people, float(min_width), width_rule.code, width_rule.description, float(total_width_m)), exitscript=False)
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 __title__   = "Create Counts"
-__doc__     = """Version = 1.0
-Date     = 30.01.2026
+__doc__     = """Version = 1.3
+Date     = 19.10.2026
 ________________________________________________________________
 Description:
 
@@ -20,25 +20,24 @@ ________________________________________________________________
 Last Updates:
 
 - [30.01.2026] v1.0 Tool complete.
+- [19.10.2026] v1.1 Instance counts from the session element snapshot (jfs.snapshot), built once per document.
+- [19.10.2026] v1.2 Shared helpers (jfs.geometry / jfs.legends) and no unused imports: faster startup.
+- [19.10.2026] v1.3 Stage timings and API counts on Shift+Click (jfs.profiling).
 ________________________________________________________________
 Author: Javier Fidalgo Saeta"""
 
 
 # IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS
 
-from types import ObjectType
-
 from Autodesk.Revit.DB import *
 
 from pyrevit import forms
 
 
-import re
-
-
 #.NET Imports
 import clr
-from rpw.db import FamilyInstance
+
+from jfs import legends, profiling, snapshot
 
 
 clr.AddReference('System')
@@ -50,6 +49,9 @@ app    = __revit__.Application
 uidoc  = __revit__.ActiveUIDocument
 doc    = __revit__.ActiveUIDocument.Document #type:Document
 
+# Stage timings and API counts: Shift+Click the button (see jfs.profiling)
+prof = profiling.start(__title__, __shiftclick__)
+
 active_view = doc.ActiveView
 
 
@@ -57,6 +59,7 @@ active_view = doc.ActiveView
 
 
 # 1️⃣ TEXT TYPE TO BE USED
+prof.section("1️⃣ TEXT TYPE TO BE USED")
 
 # By default, pick the first type found so the tool can run in any context
 text_type_id = FilteredElementCollector(doc).OfClass(TextNoteType).FirstElementId()
@@ -76,25 +79,14 @@ if msg:
                 "ES - Esta herramienta está diseñada para crear notas de texto de tipo 'Count Text'. Este tipo no existe en el documento por lo que se utilizará otro cualquiera.", exitscript=False)
 
 
-# 2️⃣ FUNCTION TO GET COUNT FROM LEGEND COMPONENTS
-
-def countfromlegcom(legcom_element):
-    """ OBTAINS THE INSTANCE COUNT OF THE SOURCE TYPE OF A LEGEND COMPONENT """
+# 2️⃣ INSTANCE COUNTS
+prof.section("2️⃣ INSTANCE COUNTS")
 
-    legcom_type = legcom_element.get_Parameter(BuiltInParameter.LEGEND_COMPONENT)
-
-    type_id = legcom_type.AsElementId()
-
-    all_elems = FilteredElementCollector(doc).WhereElementIsNotElementType().ToElements()
-
-    count = 0
-    for e in all_elems:
-        if e.GetTypeId() == type_id:
-            count += 1
-
-    return count
+# Instance count of every type, from the session snapshot (the model is only walked on the first run)
+type_counts = snapshot.ElementSnapshot(doc).type_counts()
 
 # 3️⃣ CREATE COUNT TEXT NOTES
+prof.section("3️⃣ CREATE COUNT TEXT NOTES")
 
 t = Transaction(doc,__title__)
 
@@ -112,7 +104,7 @@ for legcom_id in all_legcom_in_view:
 
     try:
         # Obtain the count
-        count = countfromlegcom(legcom_element)
+        count = legends.countfromlegcom(legcom_element, type_counts)
         text = str(count)
         text_u = text + " units"
 
@@ -129,4 +121,6 @@ for legcom_id in all_legcom_in_view:
     # CREATE TEXT NOTE
     TextNote.Create(doc, active_view.Id, pt, text_u, text_type_id)
 
-t.Commit()
\ No newline at end of file
+t.Commit()
+
+prof.finish()
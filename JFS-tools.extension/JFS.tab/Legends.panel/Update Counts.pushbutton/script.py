@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 __title__   = "Update Counts"
-__doc__     = """Version = 1.0
-Date     = 30.01.2026
+__doc__     = """Version = 1.3
+Date     = 19.10.2026
 ________________________________________________________________
 Description:
 
@@ -22,15 +22,15 @@ ________________________________________________________________
 Last Updates:
 
 - [30.01.2026] v1.0 Tool complete.
+- [19.10.2026] v1.1 Instance counts from the session element snapshot (jfs.snapshot), built once per document.
+- [19.10.2026] v1.2 Shared helpers (jfs.geometry / jfs.legends) and no unused imports: faster startup.
+- [19.10.2026] v1.3 Stage timings and API counts on Shift+Click (jfs.profiling).
 ________________________________________________________________
 Author: Javier Fidalgo Saeta"""
 
 
 # IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS
 
-from types import ObjectType
-
-
 from Autodesk.Revit.DB import *
 
 from Autodesk.Revit.DB import XYZ
@@ -39,12 +39,12 @@ from pyrevit import forms
 
 import math
 
-import re
-
 import sys
 
 import clr
-from rpw.db import FamilyInstance
+
+from jfs import legends, profiling, snapshot
+from jfs.geometry import distance_2d_XYZ
 
 
 from System.Collections.Generic import List
@@ -60,6 +60,9 @@ app    = __revit__.Application
 uidoc  = __revit__.ActiveUIDocument
 doc    = __revit__.ActiveUIDocument.Document #type:Document
 
+# Stage timings and API counts: Shift+Click the button (see jfs.profiling)
+prof = profiling.start(__title__, __shiftclick__)
+
 active_view = doc.ActiveView
 
 
@@ -103,6 +106,7 @@ if res == "Cancel":
 
 
 # 1️⃣ DETECT COUNT 'TAGS' AND LEGEND COMPONENTS
+prof.section("1️⃣ DETECT COUNT 'TAGS' AND LEGEND COMPONENTS")
 
 msg = 1
 
@@ -130,9 +134,12 @@ if not txtnts:
 
 # GET ALL LEGEND COMPONENTS IN VIEW
 all_legcom_in_view = FilteredElementCollector(doc, active_view.Id).OfCategory(BuiltInCategory.OST_LegendComponents).WhereElementIsNotElementType().ToElements()
+prof.count("text notes", len(txtnts))
+prof.count("legend components", len(all_legcom_in_view))
 
 
 # 2️⃣ PROMPT FOR APPROXIMATE POSITION OF COUNTS
+prof.section("2️⃣ PROMPT FOR APPROXIMATE POSITION OF COUNTS")
 
 forms.alert("EN - It is necessary to indicate the approximate format of the legend grid:\n\n"
             "S - square / V - vertical / H - horizontal\n(if format is variable, S - square is recommended)\n\n"
@@ -177,6 +184,7 @@ except:
 
 
 # 3️⃣ DETECT LOCATION OF TEXTS AND COMPONENTS
+prof.section("3️⃣ DETECT LOCATION OF TEXTS AND COMPONENTS")
 
 # Text coordinates
 txtnt_pts = []
@@ -193,6 +201,7 @@ for alc in all_legcom_in_view:
 
 
 # 4️⃣ CALCULATE NEAREST COMPONENT BASED ON DIRECTION
+prof.section("4️⃣ CALCULATE NEAREST COMPONENT BASED ON DIRECTION")
 
 # Iterate through all text notes and find the corresponding component for each
 
@@ -263,6 +272,7 @@ else:
 
 
 # 5️⃣ SEPARATE LEGEND COMPONENTS LINKED MORE THAN ONCE
+prof.section("5️⃣ SEPARATE LEGEND COMPONENTS LINKED MORE THAN ONCE")
 
 counts_lc = Counter(lc_respective)
 
@@ -295,69 +305,14 @@ for i in range(len(lc_respective)):
         txtnt_pts_un.append(point_t)
 
 
-# 6️⃣ FUNCTIONS
-
-def countfromlegcom(legcom_element):
-    """ OBTAINS THE INSTANCE COUNT OF THE SOURCE TYPE OF A LEGEND COMPONENT """
-
-    legcom_type = legcom_element.get_Parameter(BuiltInParameter.LEGEND_COMPONENT)
-
-    type_id = legcom_type.AsElementId()
-
-    all_elems = FilteredElementCollector(doc).WhereElementIsNotElementType().ToElements()
-
-    count = 0
-    for e in all_elems:
-        if e.GetTypeId() == type_id:
-            count += 1
-
-    return count
-
-
-def arrowfrom2pts(pt1,pt2):
-    """ RETURNS A REVIT CURVELOOP OBJECT """
-
-    # 1. Arrow configuration
-    head_length = 1.5  # Head length
-    head_width = 1.0  # Head width
-    shaft_width = 0.2  # Shaft width
-
-    # 2. Vector calculations
-    direction = (pt2 - pt1).Normalize()
-    # Perpendicular vector for width (assuming View XY plane)
-    normal = XYZ.BasisZ
-    side_vec = direction.CrossProduct(normal).Normalize()
-
-    # Geometry key points
-    p_base_head = pt2 - direction * head_length
-
-    # Outline vertices
-    v1 = pt1 + side_vec * (shaft_width / 2.0)  # Shaft start right
-    v2 = p_base_head + side_vec * (shaft_width / 2.0)  # Shaft shoulder right
-    v3 = p_base_head + side_vec * (head_width / 2.0)  # Head wing right
-    v4 = pt2  # Final tip
-    v5 = p_base_head - side_vec * (head_width / 2.0)  # Head wing left
-    v6 = p_base_head - side_vec * (shaft_width / 2.0)  # Shaft shoulder left
-    v7 = pt1 - side_vec * (shaft_width / 2.0)  # Shaft start left
-
-    points = [v1, v2, v3, v4, v5, v6, v7]
-
-    # 3. Create CurveLoop
-    curves = []
-    for i in range(len(points)):
-        p_start = points[i]
-        p_end = points[(i + 1) % len(points)]  # Close loop with the first point
-        curves.append(Line.CreateBound(p_start, p_end))
-
-    curveloop = CurveLoop.Create(curves)
-
-    return curveloop
-
-def distance_2d_XYZ(pt1, pt2):
-    return math.sqrt((pt2.X - pt1.X)**2 + (pt2.Y - pt1.Y)**2)
+# 6️⃣ INSTANCE COUNTS
+prof.section("6️⃣ INSTANCE COUNTS")
 
+# Instance count of every type, from the session snapshot (the model is only walked on the first run)
+type_counts = snapshot.ElementSnapshot(doc).type_counts()
 
 # 7️⃣ ARROW PREPARATION
+prof.section("7️⃣ ARROW PREPARATION")
 
 # 1. Name for new filled region types
 new_type_name_r = "aux_red"
@@ -383,6 +338,7 @@ curveloops_u_revitList = List[CurveLoop]()
 
 
 # 8️⃣ UPDATES
+prof.section("8️⃣ UPDATES")
 
 ocs = []        # ORIGINAL COUNTS
 ncs = []        # NEW COUNTS
@@ -433,7 +389,7 @@ for tn,lc,pt1,pt2 in zip(txtnts_rep,lc_rep,txtnt_pts_rep,lc_pt_rep):
 
     try:
         # Obtain the count
-        count = countfromlegcom(lc)
+        count = legends.countfromlegcom(lc, type_counts)
         text_u = str(count) + " units"
 
     except Exception as e:
@@ -448,7 +404,7 @@ for tn,lc,pt1,pt2 in zip(txtnts_rep,lc_rep,txtnt_pts_rep,lc_pt_rep):
 
     # CREATE ARROW
     if distance_2d_XYZ(pt1,pt2) > 0.1: # Skip if arrow is too small
-        curveloop = arrowfrom2pts(pt1,pt2)
+        curveloop = legends.arrowfrom2pts(pt1,pt2)
         region = FilledRegion.Create(doc, filled_region_type_r.Id, active_view.Id, [curveloop])
 
 
@@ -461,7 +417,7 @@ for tn,lc,pt1,pt2 in zip(txtnts_un, lc_un, txtnt_pts_un, lc_pt_un):
 
     try:
         # Obtain the count
-        count = countfromlegcom(lc)
+        count = legends.countfromlegcom(lc, type_counts)
         text_u = str(count) + " units"
 
     except Exception as e:
@@ -476,7 +432,7 @@ for tn,lc,pt1,pt2 in zip(txtnts_un, lc_un, txtnt_pts_un, lc_pt_un):
 
     # PREPARE DATA FOR COMBINED ARROW REGION
     if distance_2d_XYZ(pt1, pt2) > 0.1:  # Skip if arrow is too small
-        curveloop = arrowfrom2pts(pt1, pt2)
+        curveloop = legends.arrowfrom2pts(pt1, pt2)
         curveloops_u.append(curveloop)
         curveloops_u_revitList.Add(curveloop)
 
@@ -491,6 +447,8 @@ except:
 
 t.Commit()
 
+prof.finish()
+
 # 🔟 FINAL MESSAGE
 
 c_updated = len(ncs)
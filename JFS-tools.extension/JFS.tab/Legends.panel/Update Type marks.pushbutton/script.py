@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 __title__   = "Update Type marks"
-__doc__     = """Version = 1.1
-Date     = 30.01.2026
+__doc__     = """Version = 1.3
+Date     = 19.10.2026
 ________________________________________________________________
 Description:
 
@@ -23,15 +23,14 @@ Last Updates:
 
 - [17.10.2025] v1.0 Tool complete.
 - [30.01.2026] v1.1 Addition of auxiliary arrows to visualize the link between each text note and its legend component..
+- [19.10.2026] v1.2 Shared helpers (jfs.geometry / jfs.legends) and no unused imports: faster startup.
+- [19.10.2026] v1.3 Stage timings and API counts on Shift+Click (jfs.profiling).
 ________________________________________________________________
 Author: Javier Fidalgo Saeta"""
 
 
 # IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS - IMPORTS
 
-from types import ObjectType
-
-
 from Autodesk.Revit.DB import *
 
 from Autodesk.Revit.DB import XYZ
@@ -40,12 +39,12 @@ from pyrevit import forms
 
 import math
 
-import re
-
 import sys
 
 import clr
-from rpw.db import FamilyInstance
+
+from jfs import legends, profiling
+from jfs.geometry import distance_2d_XYZ
 
 from System.Collections.Generic import List
 
@@ -60,6 +59,9 @@ app    = __revit__.Application
 uidoc  = __revit__.ActiveUIDocument
 doc    = __revit__.ActiveUIDocument.Document #type:Document
 
+# Stage timings and API counts: Shift+Click the button (see jfs.profiling)
+prof = profiling.start(__title__, __shiftclick__)
+
 active_view = doc.ActiveView
 
 
@@ -103,6 +105,7 @@ if res == "Cancel":
 
 
 # 1️⃣ DETECT TYPE MARK 'TAGS' AND LEGEND COMPONENTS
+prof.section("1️⃣ DETECT TYPE MARK 'TAGS' AND LEGEND COMPONENTS")
 
 msg = 1
 
@@ -133,6 +136,7 @@ all_legcom_in_view = FilteredElementCollector(doc, active_view.Id).OfCategory(Bu
 
 
 # 2️⃣ PROMPT FOR APPROXIMATE POSITION OF TYPE MARKS
+prof.section("2️⃣ PROMPT FOR APPROXIMATE POSITION OF TYPE MARKS")
 
 forms.alert("EN - It is necessary to indicate the approximate format of the legend grid:\n\n"
             "S - square / V - vertical / H - horizontal\n(if format is variable, S - square is recommended)\n\n"
@@ -177,6 +181,7 @@ except:
 
 
 # 3️⃣ DETECT LOCATION OF TEXTS AND COMPONENTS
+prof.section("3️⃣ DETECT LOCATION OF TEXTS AND COMPONENTS")
 
 # Text coordinates
 txtnt_pts = []
@@ -193,6 +198,7 @@ for alc in all_legcom_in_view:
 
 
 # 4️⃣ CALCULATE NEAREST COMPONENT BASED ON DIRECTION
+prof.section("4️⃣ CALCULATE NEAREST COMPONENT BASED ON DIRECTION")
 
 # Iterate through all text notes and find the corresponding component for each
 
@@ -263,6 +269,7 @@ else:
 
 
 # 5️⃣ SEPARATE LEGEND COMPONENTS LINKED MORE THAN ONCE
+prof.section("5️⃣ SEPARATE LEGEND COMPONENTS LINKED MORE THAN ONCE")
 
 counts_lc = Counter(lc_respective)
 
@@ -295,64 +302,8 @@ for i in range(len(lc_respective)):
         txtnt_pts_un.append(point_t)
 
 
-# 6️⃣ FUNCTIONS
-
-def markfromlegcom(legcom_element):
-    """ OBTAINS THE TYPE MARK FROM THE SOURCE TYPE OF A LEGEND COMPONENT """
-
-    legcom_type = legcom_element.get_Parameter(BuiltInParameter.LEGEND_COMPONENT)
-
-    type_id = legcom_type.AsElementId()
-    type = doc.GetElement(type_id)  # OBTAIN THE TYPE
-    # OBTAIN THE TYPE MARK PARAMETER
-    mark_param = type.get_Parameter(BuiltInParameter.WINDOW_TYPE_ID)
-
-    return mark_param
-
-def arrowfrom2pts(pt1,pt2):
-    """ RETURNS A REVIT CURVELOOP OBJECT """
-
-    # 1. Arrow configuration
-    head_length = 1.5  # Head length
-    head_width = 1.0  # Head width
-    shaft_width = 0.2  # Shaft width
-
-    # 2. Vector calculations
-    direction = (pt2 - pt1).Normalize()
-    # Perpendicular vector for width (assuming View XY plane)
-    normal = XYZ.BasisZ
-    side_vec = direction.CrossProduct(normal).Normalize()
-
-    # Geometry key points
-    p_base_head = pt2 - direction * head_length
-
-    # Outline vertices
-    v1 = pt1 + side_vec * (shaft_width / 2.0)  # Shaft start right
-    v2 = p_base_head + side_vec * (shaft_width / 2.0)  # Shaft shoulder right
-    v3 = p_base_head + side_vec * (head_width / 2.0)  # Head wing right
-    v4 = pt2  # Final tip
-    v5 = p_base_head - side_vec * (head_width / 2.0)  # Head wing left
-    v6 = p_base_head - side_vec * (shaft_width / 2.0)  # Shaft shoulder left
-    v7 = pt1 - side_vec * (shaft_width / 2.0)  # Shaft start left
-
-    points = [v1, v2, v3, v4, v5, v6, v7]
-
-    # 3. Create CurveLoop
-    curves = []
-    for i in range(len(points)):
-        p_start = points[i]
-        p_end = points[(i + 1) % len(points)]  # Close loop with the first point
-        curves.append(Line.CreateBound(p_start, p_end))
-
-    curveloop = CurveLoop.Create(curves)
-
-    return curveloop
-
-def distance_2d_XYZ(pt1, pt2):
-    return math.sqrt((pt2.X - pt1.X)**2 + (pt2.Y - pt1.Y)**2)
-
-
 # 7️⃣ ARROW PREPARATION
+prof.section("7️⃣ ARROW PREPARATION")
 
 # 1. Name for new filled region types
 new_type_name_r = "aux_red"
@@ -378,6 +329,7 @@ curveloops_u_revitList = List[CurveLoop]()
 
 
 # 8️⃣ UPDATES
+prof.section("8️⃣ UPDATES")
 
 otms = []   # ORIGINAL TYPE MARKS
 ntms = []   # NEW TYPE MARKS
@@ -424,7 +376,7 @@ for tn,lc,pt1,pt2 in zip(txtnts_rep,lc_rep,txtnt_pts_rep,lc_pt_rep):
 
     try:
         # Retrieve Type Mark parameter
-        ntm_param = markfromlegcom(lc)
+        ntm_param = legends.markfromlegcom(doc, lc)
 
         if ntm_param and ntm_param.AsValueString():
 
@@ -443,7 +395,7 @@ for tn,lc,pt1,pt2 in zip(txtnts_rep,lc_rep,txtnt_pts_rep,lc_pt_rep):
 
     # CREATE ARROW
     if distance_2d_XYZ(pt1, pt2) > 0.1: # Skip if arrow is too small
-        curveloop = arrowfrom2pts(pt1, pt2)
+        curveloop = legends.arrowfrom2pts(pt1, pt2)
         region = FilledRegion.Create(doc, filled_region_type_r.Id, active_view.Id, [curveloop])
 
 
@@ -453,7 +405,7 @@ for tn, lc, pt1, pt2 in zip(txtnts_un, lc_un, txtnt_pts_un, lc_pt_un):
 
     try:
         # Retrieve Type Mark parameter
-        ntm_param = markfromlegcom(lc)
+        ntm_param = legends.markfromlegcom(doc, lc)
 
         if ntm_param and ntm_param.AsValueString():
 
@@ -472,7 +424,7 @@ for tn, lc, pt1, pt2 in zip(txtnts_un, lc_un, txtnt_pts_un, lc_pt_un):
 
     # DATA FOR COMBINED ARROW REGION
     if distance_2d_XYZ(pt1, pt2) > 0.1:  # Skip if arrow is too small
-        curveloop = arrowfrom2pts(pt1, pt2)
+        curveloop = legends.arrowfrom2pts(pt1, pt2)
         curveloops_u.append(curveloop)
         curveloops_u_revitList.Add(curveloop)
 
@@ -486,6 +438,8 @@ except:
 
 t.Commit()
 
+prof.finish()
+
 # 🔟 FINAL MESSAGE
 
 tm_updated = len(ntms)
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+#⬇️ Imports
+from jfs import session
+
+#--------------------------------------------------
+#📦 Variables
+args = __eventargs__    # Autodesk.Revit.DB.Events.DocumentChangedEventArgs
+
+#--------------------------------------------------
+#🎯 MAIN
+# Appends the elements changed to the invalidation journal of the document, so every JFS
+# cache refreshes only those (only for documents with something cached, and O(changed ids):
+# it runs after every change)
+session.record_changes(args.GetDocument(),
+                       args.GetAddedElementIds(),
+                       args.GetModifiedElementIds(),
+                       args.GetDeletedElementIds())
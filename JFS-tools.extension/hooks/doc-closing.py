@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+#⬇️ Imports
+from jfs import session
+
+#--------------------------------------------------
+#📦 Variables
+args = __eventargs__    # Autodesk.Revit.DB.Events.DocumentClosingEventArgs
+
+#--------------------------------------------------
+#🎯 MAIN
+# Drops the JFS caches of the document being closed
+session.forget(args.Document)
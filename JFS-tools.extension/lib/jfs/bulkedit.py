@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""Bulk edit of type parameters, independent of schedules (pure Python).
+
+The input is any iterable of records ``(type key, parameter key, value)``, with an
+optional fourth item ``(sheet, row, column)`` used to report invalid values:
+
+- type key: type id (int or digits), UniqueId or 'Family: Type'
+- parameter key: Id code of the parameter (as exported) or its name
+- value: cell value, converted with the cellvalues.Column of the parameter
+
+Records are grouped by type, so each type and its parameters are looked up once
+and, when a parameter is given several times, only the last value is set. Values
+equal to the current ones are not set.
+
+Applying runs in three steps: snapshot (read the types and current values the
+records need from the model), plan (convert and diff against the snapshot: pure,
+may run on worker threads) and apply_entries (set the values that changed).
+
+The document is only reached through a model adapter, jfs.revitmodel.RevitModel
+in Revit or jfs.standin.StandInModel elsewhere, with this interface:
+
+    type_id(typ)                -> hashable id of a type
+    element(type_id)            -> type or None
+    element_by_unique_id(uid)   -> type or None
+    type_names()                -> iterable of ('Family: Type', type id)
+    params(typ)                 -> {parameter key: parameter} (Id codes and names)
+    param_code(param)           -> Id code of a parameter
+    is_read_only(param)
+    column(param)               -> cellvalues.Column, or None if it can't be imported
+    current(param)              -> value in the form a Column converter returns it
+    set(param, value)
+"""
+
+from collections import OrderedDict
+
+from jfs import cellvalues
+
+
+def group_by_type(records):
+    """{type key: {parameter key: (value, source)}} in input order. A later
+    record of the same type and parameter replaces the earlier one."""
+    groups = OrderedDict()
+    for n, record in enumerate(records):
+        type_key, param_key, value = record[:3]
+        source = record[3] if len(record) > 3 else ("", n + 1, param_key)
+        groups.setdefault(type_key, OrderedDict())[param_key] = (value, source)
+    return groups
+
+
+def wanted_keys(records):
+    """{type key: set of parameter keys} of some records."""
+    wanted = OrderedDict()
+    for record in records:
+        wanted.setdefault(record[0], set()).add(record[1])
+    return wanted
+
+
+class Snapshot(object):
+    """What the model holds for a set of records, read once by BulkEditor.snapshot.
+    Pure data: plan() converts and diffs against it without touching the model,
+    so it can run on worker threads."""
+
+    def __init__(self):
+        self.type_ids = {}          # type key -> type id (None if not found)
+        self.values = {}            # type id -> {parameter key: (code, current value)}, writable ones only
+        self.columns = {}           # parameter code -> Column
+
+    def differs(self, type_id, code, value):
+        """Whether a converted value differs from the current one of a type parameter."""
+        for known_code, current in self.values.get(type_id, {}).values():
+            if known_code == code:
+                return self.columns[code].differs(current, value)
+        return True
+
+
+def plan(snapshot, records, errors, diff=True):
+    """Apply-list of some records: [(type id, parameter code, value)] with only the
+    values that differ from the snapshot (every converted value if not 'diff').
+    Invalid values are added to 'errors'."""
+    entries = []
+    for type_key, items in group_by_type(records).items():
+        type_id = snapshot.type_ids.get(type_key)
+        if type_id is None:
+            continue
+        values = snapshot.values[type_id]
+        for param_key, (value, source) in items.items():
+            known = values.get(param_key)
+            if not known:
+                continue
+            code, current = known
+            column = snapshot.columns[code]
+            if column.skips(value):
+                continue
+
+            try:
+                converted = column.convert(value)
+            except cellvalues.CellError as ex:
+                sheet, row, col = source
+                errors.add(sheet, row, col, value, str(ex))
+                continue
+
+            if not diff or column.differs(current, converted):
+                entries.append((type_id, code, converted))
+    return entries
+
+
+class BulkEditor(object):
+    """Applies records to the types of a model. Indexes and converters are built
+    once and shared by every call, so the editor can be fed in several batches
+    (e.g. one per row or per Transaction)."""
+
+    def __init__(self, model, errors=None):
+        self.model = model
+        self.errors = errors if errors is not None else cellvalues.ConversionErrors()
+        self._names = None          # 'Family: Type' -> type id, built on the first name key
+        self._types = {}            # type id -> type
+        self._params = {}           # type id -> {parameter key: parameter}
+        self._columns = {}          # parameter code -> Column (or None)
+        self.sets = 0               # Parameters set
+        self.missing_types = set()  # Type keys not found
+        self.missing_params = set() # Parameter keys not found in some type
+
+    # TYPES
+
+    def resolve(self, type_key):
+        """Type of a key (type id, UniqueId or 'Family: Type'), or None."""
+        key = cellvalues.cell_text(type_key)
+        if not key:
+            return None
+        if ":" in key:
+            if self._names is None:
+                self._names = {}
+                for name, type_id in self.model.type_names():
+                    self._names.setdefault(name, type_id)
+            type_id = self._names.get(key)
+            return self.model.element(type_id) if type_id is not None else None
+        if key.isdigit():
+            return self.model.element(int(key))
+        return self.model.element_by_unique_id(key)
+
+    def params(self, typ):
+        type_id = self.model.type_id(typ)
+        params = self._params.get(type_id)
+        if params is None:
+            params = self._params[type_id] = self.model.params(typ)
+        return params
+
+    def column(self, param):
+        code = self.model.param_code(param)
+        if code not in self._columns:
+            self._columns[code] = self.model.column(param)
+        return self._columns[code]
+
+    # SNAPSHOT AND APPLY
+
+    def snapshot(self, wanted, snap=None):
+        """Reads the types and current values of {type key: parameter keys} into
+        a Snapshot (or adds them to 'snap')."""
+        snap = snap if snap is not None else Snapshot()
+        for type_key, param_keys in wanted.items():
+            if type_key not in snap.type_ids:
+                typ = self.resolve(type_key)
+                if typ is None:
+                    snap.type_ids[type_key] = None
+                    self.missing_types.add(type_key)
+                else:
+                    snap.type_ids[type_key] = self.model.type_id(typ)
+                    self._types[snap.type_ids[type_key]] = typ
+
+            type_id = snap.type_ids[type_key]
+            if type_id is None:
+                continue
+            params = self.params(self._types[type_id])
+            values = snap.values.setdefault(type_id, {})
+            for param_key in param_keys:
+                if param_key in values:
+                    continue
+                param = params.get(param_key)
+                if param is None:
+                    self.missing_params.add(param_key)
+                    continue
+                if self.model.is_read_only(param):
+                    continue
+                column = self.column(param)
+                if not column:
+                    continue
+                code = self.model.param_code(param)
+                snap.columns[code] = column
+                values[param_key] = (code, self.model.current(param))
+        return snap
+
+    def apply_entries(self, entries):
+        """Sets the values of an apply-list (see plan). Returns the number set."""
+        for type_id, code, value in entries:
+            typ = self._types.get(type_id)
+            if typ is None:
+                typ = self._types[type_id] = self.model.element(type_id)
+            self.model.set(self.params(typ)[code], value)
+        self.sets += len(entries)
+        return len(entries)
+
+    def apply(self, records):
+        """Applies an iterable of records. Returns the number of parameters set."""
+        records = list(records)
+        snap = self.snapshot(wanted_keys(records))
+        return self.apply_entries(plan(snap, records, self.errors))
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""Schedule catalog: the import codes of every schedule of a document, persisted
+between runs (pure Python).
+
+Each entry is keyed by schedule id and stores the version stamp of the schedule
+when it was scanned. An entry is reused while the stamp is unchanged, so only new
+or modified schedules have their fields scanned again.
+"""
+
+import hashlib
+import json
+import os
+
+
+CATALOG_VERSION = 1
+
+
+def file_id(document):
+    """Name of the catalog file of a document (path or title), without extension."""
+    return "schedule_catalog_" + hashlib.sha1(document.encode("utf-8")).hexdigest()[:12]
+
+
+class ScheduleCatalog(object):
+    """Cached scan of the schedules of one document, stored as JSON in 'path'."""
+
+    def __init__(self, path, document):
+        self.path = path
+        self.document = document
+        self.entries = {}           # schedule id -> {"stamp", "codes", "has_fyt"}
+        self.changed = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return
+        if data.get("version") == CATALOG_VERSION and data.get("document") == self.document:
+            self.entries = dict(data.get("schedules", {}))
+
+    def get(self, schedule_id, stamp):
+        """(codes, has_fyt) of a schedule if it was scanned with the same stamp, else None."""
+        if not stamp:
+            return None
+        entry = self.entries.get(str(schedule_id))
+        if not entry or entry.get("stamp") != stamp:
+            return None
+        return entry["codes"], entry["has_fyt"]
+
+    def put(self, schedule_id, stamp, codes, has_fyt):
+        if not stamp:
+            return
+        self.entries[str(schedule_id)] = {"stamp": stamp, "codes": list(codes), "has_fyt": has_fyt}
+        self.changed = True
+
+    def prune(self, schedule_ids):
+        """Forgets the schedules not in 'schedule_ids' (deleted from the document)."""
+        keep = set(str(i) for i in schedule_ids)
+        for key in list(self.entries):
+            if key not in keep:
+                del self.entries[key]
+                self.changed = True
+
+    def save(self):
+        """Writes the catalog if anything changed since it was loaded."""
+        if not self.changed:
+            return
+        data = {"version": CATALOG_VERSION, "document": self.document, "schedules": self.entries}
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(data, f)
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(tmp, self.path)
+            self.changed = False
+        except (IOError, OSError):
+            pass                    # A catalog that can't be saved is rebuilt next time
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Conversion of spreadsheet cells into typed parameter values.
+
+Pure Python (no Revit API): every unit factor or name lookup a converter needs is
+resolved beforehand, so a converter is a plain callable ``cell -> value`` that
+raises CellError when the cell cannot be converted.
+"""
+
+# KINDS OF CONVERSION (one per parameter storage / data type)
+
+STRING    = "string"
+DOUBLE    = "double"
+INTEGER   = "integer"
+YESNO     = "yesno"
+ELEMENTID = "elementid"
+
+YES_WORDS = ("1", "yes", "y", "true", "si", "sí", "s", "x")
+NO_WORDS  = ("0", "no", "n", "false")
+
+NONE_WORDS = ("<none>", "<ninguno>", "<ninguna>", "none")
+
+
+class CellError(ValueError):
+    """Raised by a converter when a cell value cannot be converted."""
+    pass
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def cell_text(value):
+    """Text of a cell as it would be written to a String parameter
+    (integral numbers read from Excel as floats lose their '.0')."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if _is_number(value):
+        return str(value)
+    return value.strip() if hasattr(value, "strip") else str(value)
+
+
+def parse_number(value, symbols=()):
+    """Converts a cell to float. Accepts decimal comma, digit grouping and an
+    optional trailing unit symbol from 'symbols' (e.g. 'mm', 'm²')."""
+    if _is_number(value):
+        return float(value)
+
+    text = cell_text(value)
+    if not text:
+        raise CellError("empty cell")
+
+    # Remove the unit symbol shown by the schedule, if any
+    for symbol in symbols:
+        if symbol and text.endswith(symbol):
+            text = text[:-len(symbol)].strip()
+            break
+
+    text = text.replace(" ", "").replace(u"\u00a0", "")
+
+    # Unify format: the last separator found is the decimal one
+    if "," in text and "." in text:
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif "," in text:
+        text = text.replace(",", ".")
+
+    try:
+        return float(text)
+    except ValueError:
+        raise CellError("not a number")
+
+
+def to_double(scale=1.0, offset=0.0, symbols=()):
+    """Converter for unit-aware doubles: display value -> internal value.
+    Revit unit conversions are affine, so 'scale' and 'offset' are enough."""
+    def convert(value):
+        return parse_number(value, symbols) * scale + offset
+    return convert
+
+
+def to_integer(symbols=()):
+    def convert(value):
+        num = parse_number(value, symbols)
+        if not num.is_integer():
+            raise CellError("not an integer")
+        return int(num)
+    return convert
+
+
+def to_yesno():
+    def convert(value):
+        if _is_number(value):
+            if value in (0, 1):
+                return int(value)
+            raise CellError("not Yes/No")
+        text = cell_text(value).lower()
+        if text in YES_WORDS:
+            return 1
+        if text in NO_WORDS:
+            return 0
+        raise CellError("not Yes/No")
+    return convert
+
+
+def to_text():
+    return cell_text
+
+
+def to_elementid(names, none_value):
+    """Converter for ElementId parameters: element name -> id. 'names' maps
+    names (and 'Family: Type' keys) to ids, 'none_value' is used for '<None>'."""
+    def convert(value):
+        text = cell_text(value)
+        if not text:
+            raise CellError("empty cell")
+        if text.lower() in NONE_WORDS:
+            return none_value
+        try:
+            return names[text]
+        except KeyError:
+            raise CellError("no element named '{}'".format(text))
+    return convert
+
+
+class Column(object):
+    """Precomputed conversion of one spreadsheet column: its kind, the converter
+    and the tolerance under which a converted Double counts as unchanged."""
+
+    def __init__(self, kind, convert, tolerance=0.0):
+        self.kind = kind
+        self.convert = convert
+        self.tolerance = tolerance
+
+    def skips(self, value):
+        """Empty cells only clear String parameters; other kinds keep their value."""
+        return self.kind != STRING and cell_text(value) == ""
+
+    def differs(self, current, value):
+        if self.kind == DOUBLE:
+            return abs(current - value) > self.tolerance
+        return current != value
+
+
+# BULK ERROR REPORT
+
+class ConversionErrors(object):
+    """Collects invalid cells during an import to report them all at the end."""
+
+    def __init__(self):
+        self.items = []
+
+    def add(self, sheet, row, column, value, message):
+        self.items.append((sheet, row, column, cell_text(value), message))
+
+    def extend(self, other):
+        """Adds the errors collected by another instance (e.g. on a worker thread)."""
+        self.items.extend(other.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def rows(self):
+        """Error rows sorted by (sheet, row), ready for an output table."""
+        return [list(item) for item in sorted(self.items, key=lambda i: (i[0], i[1]))]
+
+    def summary(self, limit=15):
+        lines = ["{} - Row {} - {}: '{}' ({})".format(*item) for item in self.rows()[:limit]]
+        if len(self.items) > limit:
+            lines.append("... and {} more.".format(len(self.items) - limit))
+        return "\n".join(lines)
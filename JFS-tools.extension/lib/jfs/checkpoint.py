@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Resume checkpoints for long imports (pure Python).
+
+A checkpoint records, for one workbook (by content hash) and one document, how
+many body rows of each worksheet are already committed. It is saved after every
+committed chunk and cleared when the import finishes. A resumed import neither
+reads the current values of, converts nor compares the rows before that point:
+only the rows left are planned and applied.
+
+The file alone can't tell whether those chunks are still in the model (the
+import undone, the document closed without saving, a crash after a save), so
+every save also records the last value set of the chunk, [sheet, row idx, type
+id, parameter code]. Before resuming, only the rows of that sample are read
+again and compared with the model (see jfs.importplan.holds).
+"""
+
+import hashlib
+import json
+import os
+
+
+CHECKPOINT_VERSION = 2
+SAMPLE_SIZE = 20          # Values kept to confirm the checkpoint (the last ones set)
+
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-1 of the contents of a file."""
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        block = f.read(block_size)
+        while block:
+            sha.update(block)
+            block = f.read(block_size)
+    return sha.hexdigest()
+
+
+class Checkpoint(object):
+    """Rows already applied per worksheet. A saved checkpoint of another
+    workbook (or of the same workbook modified since) or of another document is ignored."""
+
+    def __init__(self, path, workbook_hash, document):
+        self.path = path
+        self.workbook_hash = workbook_hash
+        self.document = document
+        self.sheets = {}
+        self.sample = []
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return
+        if (data.get("version") == CHECKPOINT_VERSION and data.get("workbook") == self.workbook_hash
+                and data.get("document") == self.document):
+            self.sheets = dict(data.get("sheets", {}))
+            self.sample = [tuple(item) for item in data.get("sample", [])]
+
+    def rows_done(self):
+        """Total rows already applied."""
+        return sum(self.sheets.values())
+
+    def done(self, sheet):
+        """Rows of 'sheet' already applied: the import resumes at this body row."""
+        return self.sheets.get(sheet, 0)
+
+    def starts(self):
+        """{sheet: first body row to plan and apply}."""
+        return dict(self.sheets)
+
+    def save(self, sheet, rows, sample=None):
+        """Saves the rows of 'sheet' applied, and the last value set in them
+        ('sample': (sheet, row idx, type id, parameter code)), if any."""
+        self.sheets[sheet] = rows
+        if sample:
+            self.sample = (self.sample + [tuple(sample)])[-SAMPLE_SIZE:]
+        data = {"version": CHECKPOINT_VERSION, "workbook": self.workbook_hash,
+                "document": self.document, "sheets": self.sheets, "sample": self.sample}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(tmp, self.path)
+
+    def clear(self):
+        self.sheets = {}
+        self.sample = []
+        if os.path.exists(self.path):
+            os.remove(self.path)
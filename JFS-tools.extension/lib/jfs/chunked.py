@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Chunked apply engine: writes rows in short Transactions (run it inside a
+TransactionGroup) so a cancel or a failure keeps everything committed so far."""
+
+from Autodesk.Revit.DB import Transaction
+
+from jfs import profiling
+
+
+CHUNK_SIZE = 200        # Rows per Transaction
+
+
+def apply_rows(doc, name, count, apply, start=0, chunk_size=CHUNK_SIZE, on_commit=None, cancelled=None):
+    """Calls apply(idx) for idx in [start, count), committing a Transaction every
+    'chunk_size' rows and calling on_commit(next idx) after each commit.
+
+    Stops early when cancelled() returns True (the rows applied so far are
+    committed). Returns the index of the first row not applied (count when
+    finished). If apply raises, the open chunk is rolled back and the exception
+    re-raised: earlier chunks stay committed."""
+    idx = start
+    while idx < count:
+        if cancelled and cancelled():
+            break
+
+        end = min(idx + chunk_size, count)
+        chunk_start = idx
+        t = Transaction(doc, "{} ({}-{})".format(name, chunk_start + 1, end))
+        t.Start()
+        try:
+            while idx < end and not (cancelled and cancelled()):
+                apply(idx)
+                idx += 1
+        except Exception:
+            t.RollBack()
+            raise
+
+        t.Commit()
+        profiling.count("Transaction.Commit")
+        if on_commit and idx > chunk_start:
+            on_commit(idx)
+
+    return idx
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Evacuation width compliance of a whole building (pure Python).
+
+The evacuation tools store the sizing of each door and staircase in its
+'NUMBER PEOPLE' and 'MINIMUM WIDTH' parameters. This module compares those
+with the actual widths and writes the building table, per element and per
+level, as CSV and HTML:
+
+    rows = [compliance.Row(level, compliance.DOOR, id, name, people, min_width_ft, width_ft), ...]
+    compliance.write_csv(path, rows)
+    compliance.write_html(path, rows, title)
+
+The longest evacuation route of every origin space (jfs.travel) can be added as
+RouteRow 'routes'. Widths are in feet, as read from Revit; the report shows
+metres.
+"""
+
+import csv
+import io
+from collections import OrderedDict, namedtuple
+
+
+DOOR = "Door"
+STAIR = "Stair"
+
+COMPLIANT = "COMPLIANT"
+NOT_COMPLIANT = "NOT COMPLIANT"
+NO_WIDTH = "NO WIDTH"           # Sized, but its actual width could not be read
+STATUSES = (COMPLIANT, NOT_COMPLIANT, NO_WIDTH)
+WITHIN_LIMIT = "WITHIN LIMIT"
+OVER_LIMIT = "OVER LIMIT"
+
+FT_TO_M = 0.3048
+TOLERANCE_FT = 0.09999          # Unit conversion inaccuracies, as in the evacuation tools
+ENCODING = "utf-8-sig"          # BOM so that Excel detects UTF-8
+
+COLUMNS = ["Level", "Element", "Id", "Name", "Number people", "Minimum width (m)", "Width (m)", "Status"]
+
+ROUTE_COLUMNS = ["Level", "Origin space", "Exit", "Longest route (m)", "Status"]
+
+Row = namedtuple("Row", "level kind element_id name people min_width width")
+RouteRow = namedtuple("RouteRow", "level origin exit length over")    # Names as text, length in metres
+
+
+def status(row):
+    if not row.width:
+        return NO_WIDTH
+    return COMPLIANT if row.width + TOLERANCE_FT >= row.min_width else NOT_COMPLIANT
+
+
+def _metres(value_ft):
+    return "" if value_ft is None else "{:.2f}".format(value_ft * FT_TO_M)
+
+
+def table(rows):
+    """Report rows (lists of text), sorted by level, element kind and name."""
+    ordered = sorted(rows, key=lambda r: (r.level, r.kind, r.name, r.element_id))
+    return [[r.level, r.kind, str(r.element_id), r.name, str(r.people or 0),
+             _metres(r.min_width), _metres(r.width), status(r)] for r in ordered]
+
+
+def level_totals(rows, unsized=None):
+    """{level: {"Door": {status: n}, "Stair": {...}, "door people": n,
+    "stair people": n, "unsized": n}}, levels in order. The people of doors
+    and of stairs are totalled apart, as one person may go through both.
+    'unsized' is {level: elements without 'MINIMUM WIDTH'}."""
+    totals = OrderedDict()
+    unsized = unsized or {}
+    for level in sorted(set([r.level for r in rows]) | set(unsized)):
+        totals[level] = OrderedDict([(DOOR, OrderedDict((s, 0) for s in STATUSES)),
+                                     (STAIR, OrderedDict((s, 0) for s in STATUSES)),
+                                     ("door people", 0),
+                                     ("stair people", 0),
+                                     ("unsized", unsized.get(level, 0))])
+    for r in rows:
+        totals[r.level][r.kind][status(r)] += 1
+        totals[r.level]["door people" if r.kind == DOOR else "stair people"] += r.people or 0
+    return totals
+
+
+def totals_table(totals):
+    """Per-level rows: level, compliant / not compliant doors and stairs,
+    people through doors, people through stairs, elements not sized."""
+    result = []
+    for level, t in totals.items():
+        result.append([level,
+                       str(t[DOOR][COMPLIANT]), str(t[DOOR][NOT_COMPLIANT] + t[DOOR][NO_WIDTH]),
+                       str(t[STAIR][COMPLIANT]), str(t[STAIR][NOT_COMPLIANT] + t[STAIR][NO_WIDTH]),
+                       str(t["door people"]), str(t["stair people"]), str(t["unsized"])])
+    return result
+
+
+TOTALS_COLUMNS = ["Level", "Doors compliant", "Doors not compliant", "Stairs compliant",
+                  "Stairs not compliant", "People through doors", "People through stairs", "Not sized"]
+
+
+def route_table(routes):
+    """Route rows (lists of text), sorted by level and origin."""
+    return [[r.level, r.origin, r.exit, "{:.2f}".format(r.length), OVER_LIMIT if r.over else WITHIN_LIMIT]
+            for r in sorted(routes, key=lambda r: (r.level, r.origin))]
+
+
+# OUTPUT
+
+def write_csv(path, rows, unsized=None, routes=None):
+    """Element table followed, after an empty line, by the per-level totals
+    (and the route table, if any)."""
+    with io.open(path, "w", encoding=ENCODING, newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for row in table(rows):
+            writer.writerow(row)
+        writer.writerow([])
+        writer.writerow(TOTALS_COLUMNS)
+        for row in totals_table(level_totals(rows, unsized)):
+            writer.writerow(row)
+        if routes:
+            writer.writerow([])
+            writer.writerow(ROUTE_COLUMNS)
+            for row in route_table(routes):
+                writer.writerow(row)
+
+
+def _escape(text):
+    return (text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            .replace('"', "&quot;"))
+
+
+def _html_table(columns, rows, status_col=None, ok=COMPLIANT):
+    lines = ["<table>", "<tr>" + "".join("<th>{}</th>".format(_escape(c)) for c in columns) + "</tr>"]
+    for row in rows:
+        css = ""
+        if status_col is not None and row[status_col] != ok:
+            css = ' class="fail"'
+        lines.append("<tr{}>".format(css) + "".join("<td>{}</td>".format(_escape(c)) for c in row) + "</tr>")
+    lines.append("</table>")
+    return "\n".join(lines)
+
+
+def write_html(path, rows, title, unsized=None, routes=None):
+    """Self-contained HTML page: per-level totals, the element table and the
+    route table, if any."""
+    html = "\n".join([
+        "<!DOCTYPE html>",
+        '<html><head><meta charset="utf-8"><title>{}</title>'.format(_escape(title)),
+        "<style>body{font-family:sans-serif}table{border-collapse:collapse;margin-bottom:2em}"
+        "th,td{border:1px solid #999;padding:2px 8px}th{background:#eee}.fail td{background:#f8d0d0}</style>",
+        "</head><body>",
+        "<h1>{}</h1>".format(_escape(title)),
+        "<h2>Levels</h2>",
+        _html_table(TOTALS_COLUMNS, totals_table(level_totals(rows, unsized))),
+        "<h2>Doors and stairs</h2>",
+        _html_table(COLUMNS, table(rows), status_col=len(COLUMNS) - 1),
+    ] + ([
+        "<h2>Evacuation routes</h2>",
+        _html_table(ROUTE_COLUMNS, route_table(routes), status_col=len(ROUTE_COLUMNS) - 1, ok=WITHIN_LIMIT),
+    ] if routes else []) + [
+        "</body></html>",
+    ])
+    with io.open(path, "w", encoding="utf-8") as f:
+        f.write(html if isinstance(html, type(u"")) else html.decode("utf-8"))
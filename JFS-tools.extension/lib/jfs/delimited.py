@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Delimited text exchange format (CSV / TSV) for the Excel type-parameter tools
+(pure Python: stdlib csv).
+
+One file holds one exported schedule. The import code (importcode.Metadata, the
+same block stored in the hidden worksheet of an xlsx) is written at the top, one
+line per metadata row prefixed with META_PREFIX, followed by the header row and
+the body rows:
+
+    #JFS import code,2
+    #sheet,Doors
+    ...
+    #checksum,<sha1>
+    Family and Type,Width,...
+    Door: 900x2100,900,...
+
+Rows are written and read one at a time, so no file is held in memory as a whole.
+"""
+
+import csv
+import io
+import os
+
+from jfs import importcode
+
+
+EXTENSIONS = (".csv", ".tsv")
+META_PREFIX = "#"
+ENCODING = "utf-8-sig"          # BOM so that Excel detects UTF-8
+FILE_NAME_INVALID = '<>:"/\\|?*'
+
+
+def is_delimited(path):
+    return os.path.splitext(path)[1].lower() in EXTENSIONS
+
+
+def delimiter(path):
+    """Tab for .tsv files, comma otherwise."""
+    return "\t" if os.path.splitext(path)[1].lower() == ".tsv" else ","
+
+
+def sibling_path(path, name):
+    """Path of the file of a schedule named 'name' next to 'path' (same
+    extension), used when several schedules are exported at once."""
+    stem, ext = os.path.splitext(path)
+    clean = "".join("_" if c in FILE_NAME_INVALID else c for c in name).strip()
+    return "{} - {}{}".format(stem, clean, ext)
+
+
+def write_sheet(path, rows, meta):
+    """Writes the import code of a sheet (importcode.Metadata) and its rows."""
+    with io.open(path, "w", encoding=ENCODING, newline="") as f:
+        writer = csv.writer(f, delimiter=delimiter(path))
+        for row in importcode.encode([meta]):
+            writer.writerow([META_PREFIX + row[0]] + list(row[1:]))
+        for row in rows:
+            writer.writerow(row)
+
+
+def _meta_rows(rows):
+    """Metadata lines at the top of the file, without the prefix. Reading stops
+    after the checksum line (or at the first line without the prefix)."""
+    meta = []
+    for row in rows:
+        if not row or not row[0].startswith(META_PREFIX):
+            break
+        meta.append([row[0][len(META_PREFIX):]] + row[1:])
+        if meta[-1][0] == "checksum":
+            break
+    return meta
+
+
+def read_sheet(path, fyt_code):
+    """Reads a delimited file exported by 'Export schedule' as an
+    importcode.SheetData. Raises ImportCodeError if its import code is missing,
+    modified or damaged."""
+    with io.open(path, "r", encoding=ENCODING, newline="") as f:
+        rows = csv.reader(f, delimiter=delimiter(path))
+
+        meta_rows = _meta_rows(rows)
+        if not meta_rows:
+            raise importcode.ImportCodeError("no import code found")
+        blocks, invalid = importcode.decode(meta_rows)
+        if invalid:
+            raise importcode.ImportCodeError(list(invalid.values())[0])
+        if not blocks:
+            raise importcode.ImportCodeError("no import code found")
+
+        meta = list(blocks.values())[0]
+        return importcode.read_tagged_sheet(meta.sheet, rows, meta, fyt_code)
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""Headless evacuation model of a building and what-if simulation (pure Python).
+
+The model holds plain data read once from the document (see
+jfs.revitevacuation): spaces with their people and boundary segments, paths of
+travel and exits (doors and stairs). The people evacuated through an exit are
+worked out as in the Evacuation Doors / Stairs tools:
+
+    - the paths ending at the exit (PathEnd within 3 ft of its point);
+    - the spaces crossed by those paths, and the spaces not crossed whose
+      exit door is at a path origin (2 ft probe across the door);
+    - the doors and discharging stairs at the path origins (and, for stairs,
+      the stair below / above in vertical continuity), whose own load is
+      added: loads propagate along the evacuation graph.
+
+An exit no path ends at keeps the people stored in it ('NUMBER PEOPLE').
+
+    model = evacuation.EvacuationModel(spaces, paths, exits)
+    model.load(door_id)
+    sim = model.what_if(people={space_id: 40}, removed=[door_id], extra_paths=[path])
+    sim.deltas      ->  {exit id: (people before, people after)}
+    sim.model       ->  the edited model, for further what-ifs
+
+Nothing is written to the document. A what-if only recomputes the exits it
+affects (the links of the exits whose geometry changed, then the loads of
+those and of every exit downstream), reusing the rest of the base model.
+"""
+
+from collections import namedtuple
+
+from jfs import overlay
+from jfs.geometry import distance_2d
+from jfs.proximity import PointIndex
+
+
+# Tolerances of the Evacuation Doors / Stairs tools too, so that both size the same exits
+PATH_TOLERANCE = 3.0            # ft: path end / origin to a door or stair
+CONTINUITY_TOLERANCE = 5.0      # ft: stair IN point to the OUT point of the stair before it
+DOOR_PROBE = 2.0                # ft: half length of the probe line across a door
+
+DOOR = "door"
+STAIR = "stair"
+
+# Segments are (x0, y0, x1, y1) tuples and points (x, y), in feet
+Space = namedtuple("Space", "id level people edges")
+Path = namedtuple("Path", "id level start end segments")
+# level: where the paths end at the exit. Doors: point = centre, normal = facing.
+# Stairs: point = IN point, box = plan box, out_level / out_point = where they discharge.
+Exit = namedtuple("Exit", "id kind level point people normal box out_level out_point")
+# Spaces counted directly, upstream exits and paths of an exit
+Links = namedtuple("Links", "spaces upstream paths")
+Simulation = namedtuple("Simulation", "model deltas recomputed")
+
+
+def door(element_id, level, point, normal, people=0):
+    return Exit(element_id, DOOR, level, point, people, normal, None, None, None)
+
+
+def stair(element_id, level, point, box, out_level, out_point, people=0):
+    return Exit(element_id, STAIR, level, point, people, None, box, out_level, out_point)
+
+
+def _box_centre(box):
+    return ((box[0] + box[2]) / 2, (box[1] + box[3]) / 2)
+
+
+def _box_contains(box, pt):
+    return box[0] <= pt[0] <= box[2] and box[1] <= pt[1] <= box[3]
+
+
+def _group(items, key):
+    groups = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item.id)
+    return groups
+
+
+class EvacuationModel(object):
+    """Spaces, paths and exits of a building (lists of Space, Path, Exit)."""
+
+    def __init__(self, spaces, paths, exits):
+        self.spaces = dict((s.id, s) for s in spaces)
+        self.paths = dict((p.id, p) for p in paths)
+        self.exits = dict((e.id, e) for e in exits)
+        self._links = {}
+        self._loads = {}
+        self._index()
+
+    def _index(self):
+        self.level_spaces = _group(self.spaces.values(), lambda s: s.level)
+        self.level_paths = _group(self.paths.values(), lambda p: p.level)
+        self.level_exits = _group(self.exits.values(), lambda e: e.level)
+        self.level_doors = _group([e for e in self.exits.values() if e.kind == DOOR], lambda e: e.level)
+        self.discharging = _group([e for e in self.exits.values() if e.kind == STAIR], lambda e: e.out_level)
+        self._path_ends = {}        # level -> PointIndex of the path ends (built on demand)
+
+    def _ends(self, level):
+        index = self._path_ends.get(level)
+        if index is None:
+            index = self._path_ends[level] = PointIndex(
+                PATH_TOLERANCE, [(self.paths[pid].end, pid) for pid in self.level_paths.get(level, ())])
+        return index
+
+    # LINKS (GEOMETRY)
+
+    def links(self, exit_id):
+        """Links of an exit, or None if no path ends at it."""
+        if exit_id in self._links:
+            return self._links[exit_id]
+        links = self._links[exit_id] = self._compute_links(self.exits[exit_id])
+        return links
+
+    def _compute_links(self, e):
+        paths = [self.paths[pid] for pid in sorted(self._ends(e.level).near(e.point))]
+        if not paths:
+            return None
+
+        level_spaces = self.level_spaces.get(e.level, [])
+        edges = [self.spaces[sid].edges for sid in level_spaces]
+        crossed = overlay.spaces_crossed([seg for p in paths for seg in p.segments], edges)
+        direct = set(level_spaces[idx] for idx in crossed)
+
+        starts = PointIndex(PATH_TOLERANCE, [(p.start, p.id) for p in paths])
+        upstream = []
+        probes = []
+        if not direct and e.kind == DOOR:
+            probes.append(e)            # A unique space no path crosses, left through this door
+        for did in self.level_doors.get(e.level, ()):
+            d = self.exits[did]
+            if starts.any_near(d.point):
+                if did != e.id:
+                    upstream.append(did)
+                    probes.append(d)
+                elif not probes:
+                    probes.append(d)
+
+        # Spaces not crossed whose exit door is at a path origin
+        if probes:
+            rest = [sid for sid in level_spaces if sid not in direct]
+            k = DOOR_PROBE
+            segs = [(d.point[0] + k * d.normal[0], d.point[1] + k * d.normal[1],
+                     d.point[0] - k * d.normal[0], d.point[1] - k * d.normal[1]) for d in probes]
+            hit = overlay.spaces_crossed(segs, [self.spaces[sid].edges for sid in rest])
+            direct.update(rest[idx] for idx in hit)
+
+        # Stairs discharging at this level: at a path origin, or in vertical continuity with this stair
+        centre = _box_centre(e.box) if e.kind == STAIR and e.box else None
+        for sid in self.discharging.get(e.level, ()):
+            if sid == e.id:
+                continue
+            s = self.exits[sid]
+            continuity = e.kind == STAIR and (
+                (centre is not None and s.box is not None and _box_contains(s.box, centre)) or
+                distance_2d(e.point, s.out_point) < CONTINUITY_TOLERANCE)
+            if continuity or starts.any_near(s.out_point):
+                upstream.append(sid)
+
+        return Links(frozenset(direct), tuple(upstream), tuple(p.id for p in paths))
+
+    # LOADS
+
+    def load(self, exit_id):
+        """People evacuated through an exit."""
+        if exit_id in self._loads:
+            return self._loads[exit_id]
+        return self._compute_load(exit_id, set())
+
+    def _compute_load(self, exit_id, computing):
+        links = self.links(exit_id)
+        if links is None:
+            total = self.exits[exit_id].people or 0
+        else:
+            computing.add(exit_id)
+            total = sum(self.spaces[sid].people for sid in links.spaces)
+            for uid in links.upstream:
+                if uid in self._loads:
+                    total += self._loads[uid]
+                elif uid in computing:
+                    total += self.exits[uid].people or 0        # Cycle: stored people
+                else:
+                    total += self._compute_load(uid, computing)
+            computing.discard(exit_id)
+        self._loads[exit_id] = total
+        return total
+
+    def loads(self):
+        """{exit id: people} of every exit."""
+        return dict((exit_id, self.load(exit_id)) for exit_id in self.exits)
+
+    def _dependents(self):
+        """{space id: exits counting it} and {exit id: exits it evacuates into}."""
+        users, downstream = {}, {}
+        for exit_id in self.exits:
+            links = self.links(exit_id)
+            if links is None:
+                continue
+            for sid in links.spaces:
+                users.setdefault(sid, set()).add(exit_id)
+            for uid in links.upstream:
+                downstream.setdefault(uid, set()).add(exit_id)
+        return users, downstream
+
+    # WHAT-IF
+
+    def what_if(self, people=None, edges=None, removed=(), extra_paths=()):
+        """Dry run of edits: 'people' {space id: people}, 'edges' {space id:
+        boundary segments} (a moved partition), 'removed' exit ids and
+        'extra_paths' (Path). Returns a Simulation; this model is not changed."""
+        people = people or {}
+        edges = edges or {}
+        removed = set(eid for eid in removed if eid in self.exits)
+        extra_paths = list(extra_paths)
+        self.loads()
+        users, downstream = self._dependents()
+
+        sim = EvacuationModel.__new__(EvacuationModel)
+        sim.spaces = dict(self.spaces)
+        for sid, value in people.items():
+            sim.spaces[sid] = sim.spaces[sid]._replace(people=value)
+        for sid, segs in edges.items():
+            sim.spaces[sid] = sim.spaces[sid]._replace(edges=list(segs))
+        sim.paths = dict(self.paths)
+        sim.paths.update((p.id, p) for p in extra_paths)
+        sim.exits = dict((eid, e) for eid, e in self.exits.items() if eid not in removed)
+        sim._index()
+        for level, index in self._path_ends.items():
+            if not any(p.level == level for p in extra_paths):
+                sim._path_ends[level] = index
+
+        # Exits whose links change: geometry of their level, a removed upstream exit, new paths ending at them
+        relink = set()
+        edited_levels = set(self.spaces[sid].level for sid in edges)
+        for level in edited_levels:
+            relink.update(eid for eid in self.level_exits.get(level, ()) if self._links.get(eid) is not None)
+        for eid in removed:
+            relink.update(downstream.get(eid, ()))
+        for p in extra_paths:
+            relink.update(eid for eid in sim.level_exits.get(p.level, ())
+                          if distance_2d(sim.exits[eid].point, p.end) < PATH_TOLERANCE)
+        relink -= removed
+
+        # Exits whose load changes: those, the users of the edited spaces, and everything downstream
+        stale = set(relink)
+        for sid in people:
+            stale.update(users.get(sid, ()))
+        for eid in removed:
+            stale.update(downstream.get(eid, ()))
+        stale -= removed
+        pending = list(stale)
+        while pending:
+            for eid in downstream.get(pending.pop(), ()):
+                if eid not in stale and eid not in removed:
+                    stale.add(eid)
+                    pending.append(eid)
+
+        sim._links = dict((eid, links) for eid, links in self._links.items()
+                          if eid not in relink and eid not in removed)
+        sim._loads = dict((eid, load) for eid, load in self._loads.items()
+                          if eid not in stale and eid not in removed)
+
+        deltas = {}
+        for eid in stale:
+            after = sim.load(eid)
+            if after != self._loads.get(eid):
+                deltas[eid] = (self._loads.get(eid), after)
+        for eid in removed:
+            deltas[eid] = (self._loads.get(eid), None)
+        return Simulation(sim, deltas, stale)
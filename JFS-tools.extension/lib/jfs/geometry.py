@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Plan geometry helpers shared by the JFS tools (pure Python).
+
+Points are (x, y) tuples or anything with X / Y attributes (Revit XYZ); only
+the plan coordinates are used.
+
+Segment intersection uses a robust orientation predicate: the floating point
+determinant is trusted only when it is larger than its worst-case rounding
+error (Shewchuk's filter); otherwise the sign is computed exactly with
+fractions. Collinear and touching segments (a path drawn along a wall) are
+therefore always found, whatever the rounding. Segments are plain tuples
+(x0, y0, x1, y1) and the batch functions test whole lists at once.
+"""
+
+import math
+import re
+from fractions import Fraction
+
+
+EPSILON = 2.0 ** -53                                # Half an ulp of 1.0
+CCW_ERRBOUND = (3.0 + 16.0 * EPSILON) * EPSILON     # Relative error bound of the float determinant
+
+
+# DISTANCES
+
+def distance_2d(p1, p2):
+    """Plan distance between two (x, y) tuples."""
+    return math.sqrt((p2[0] - p1[0])**2 + (p2[1] - p1[1])**2)
+
+
+def distance_2d_XYZ(pt1, pt2):
+    """Plan distance between two XYZ points."""
+    return math.sqrt((pt2.X - pt1.X)**2 + (pt2.Y - pt1.Y)**2)
+
+
+# ORIENTATION AND SEGMENT INTERSECTION
+
+def _orient_exact(ax, ay, bx, by, cx, cy):
+    det = ((Fraction(ax) - Fraction(cx)) * (Fraction(by) - Fraction(cy))
+           - (Fraction(ay) - Fraction(cy)) * (Fraction(bx) - Fraction(cx)))
+    return (det > 0) - (det < 0)
+
+
+def orient2d(ax, ay, bx, by, cx, cy):
+    """Sign of the turn a -> b -> c: 1 counter-clockwise, -1 clockwise, 0 collinear.
+    Exact for any float input."""
+    detleft = (ax - cx) * (by - cy)
+    detright = (ay - cy) * (bx - cx)
+    det = detleft - detright
+    if detleft > 0:
+        if detright <= 0:
+            return 1 if det > 0 else (-1 if det < 0 else 0)
+        detsum = detleft + detright
+    elif detleft < 0:
+        if detright >= 0:
+            return 1 if det > 0 else (-1 if det < 0 else 0)
+        detsum = -detleft - detright
+    else:
+        return 1 if det > 0 else (-1 if det < 0 else 0)
+
+    if abs(det) >= CCW_ERRBOUND * detsum:
+        return 1 if det > 0 else -1
+    return _orient_exact(ax, ay, bx, by, cx, cy)
+
+
+def _between(px, py, x0, y0, x1, y1):
+    """Whether p (collinear with the segment) lies on it."""
+    return min(x0, x1) <= px <= max(x0, x1) and min(y0, y1) <= py <= max(y0, y1)
+
+
+def segments_intersect(s, t):
+    """Whether the closed segments s and t (x0, y0, x1, y1) share a point,
+    touching and collinear overlaps included."""
+    ax, ay, bx, by = s
+    cx, cy, dx, dy = t
+    # Bounding boxes first: most pairs are far apart
+    if (max(ax, bx) < min(cx, dx) or max(cx, dx) < min(ax, bx) or
+            max(ay, by) < min(cy, dy) or max(cy, dy) < min(ay, by)):
+        return False
+
+    d1 = orient2d(cx, cy, dx, dy, ax, ay)
+    d2 = orient2d(cx, cy, dx, dy, bx, by)
+    if d1 * d2 > 0:
+        return False
+    d3 = orient2d(ax, ay, bx, by, cx, cy)
+    d4 = orient2d(ax, ay, bx, by, dx, dy)
+    if d3 * d4 > 0:
+        return False
+    if d1 or d2 or d3 or d4:
+        return True
+    # All four collinear: the boxes overlap, so do the segments unless one of
+    # them is a single point off the other
+    return (_between(ax, ay, cx, cy, dx, dy) or _between(bx, by, cx, cy, dx, dy) or
+            _between(cx, cy, ax, ay, bx, by) or _between(dx, dy, ax, ay, bx, by))
+
+
+def segment_xy(p0, p1):
+    """Segment tuple of two XYZ points (plan coordinates)."""
+    return (p0.X, p0.Y, p1.X, p1.Y)
+
+
+def segments_xy(pairs):
+    """Segment tuples of a list of [p0, p1] XYZ pairs."""
+    return [(p0.X, p0.Y, p1.X, p1.Y) for p0, p1 in pairs]
+
+
+def any_intersection(segments, others):
+    """Whether any segment of 'segments' intersects any of 'others'. Only the
+    segments of 'others' within the bounding box of 'segments' are tested."""
+    if not segments or not others:
+        return False
+    minx = min(min(s[0], s[2]) for s in segments)
+    maxx = max(max(s[0], s[2]) for s in segments)
+    miny = min(min(s[1], s[3]) for s in segments)
+    maxy = max(max(s[1], s[3]) for s in segments)
+    candidates = [t for t in others
+                  if not (t[0] < minx and t[2] < minx or t[0] > maxx and t[2] > maxx or
+                          t[1] < miny and t[3] < miny or t[1] > maxy and t[3] > maxy)]
+    for t in candidates:
+        for s in segments:
+            if segments_intersect(s, t):
+                return True
+    return False
+
+
+def ccw_xy(A, B, C):
+    """Checks if points A, B, C are in counter-clockwise order (tuple version)"""
+    return orient2d(A[0], A[1], B[0], B[1], C[0], C[1]) > 0
+
+
+def intersect_xy(A, B, C, D):
+    """Returns True if segments AB and CD intersect (tuple version)"""
+    return segments_intersect((A[0], A[1], B[0], B[1]), (C[0], C[1], D[0], D[1]))
+
+
+def ccw_XYZ(A, B, C):
+    """Checks if points A, B, C are in counter-clockwise order"""
+    return orient2d(A.X, A.Y, B.X, B.Y, C.X, C.Y) > 0
+
+
+def intersect_XYZ(A, B, C, D):
+    """Returns True if segments AB and CD intersect"""
+    return segments_intersect((A.X, A.Y, B.X, B.Y), (C.X, C.Y, D.X, D.Y))
+
+
+# VALUES
+
+def parse_asvaluestring_to_int(value_str):
+    """Converts a Revit AsValueString (with commas, dots, units, etc.)
+    to an integer rounded up. None if there is no number."""
+    if not value_str:
+        return None
+
+    # Remove everything that isn't a digit, dot, or comma
+    clean = re.sub(r"[^0-9,.\-]", "", value_str)
+
+    # Unify format: if there is a decimal comma -> change to dot
+    if "," in clean and "." not in clean:
+        clean = clean.replace(",", ".")
+
+    try:
+        num = float(clean)
+    except ValueError:
+        return None
+
+    return int(math.ceil(num))
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Import codes written by 'Export schedule' and their decoding by 'Import text data'.
+
+Pure Python: a worksheet is handled as a list of rows (lists of cell values).
+
+Since schema version 2 the import code is a metadata block per exported sheet,
+stored in a hidden worksheet (META_SHEET):
+
+    ["JFS import code", version]
+    ["sheet", sheet name]                       <- one block per exported sheet
+    ["schedule", schedule id]
+    ["fields", code, code, ...]                 <- one code per visible field / column
+    ["storage", storage, storage, ...]          <- "" if not a type parameter
+    ["row", excel row, type id, family and type]  (one per row with a type)
+    ["checksum", sha1 of the block]
+
+Version 1 (legacy) is the trailer below the data: blank row, TRAILER_LABEL and
+the field codes joined with SEP.
+"""
+
+import hashlib
+
+from jfs.cellvalues import cell_text
+
+
+SCHEMA_VERSION = 2
+
+META_SHEET = "JFS import code"
+META_TITLE = "JFS import code"
+
+SEP = "_"
+TRAILER_LABEL = "Import Code (do not modify):"
+
+
+class ImportCodeError(ValueError):
+    """Raised when a worksheet has no valid import code."""
+    pass
+
+
+# METADATA BLOCK (SCHEMA VERSION 2)
+
+class Metadata(object):
+    """Import code of one exported sheet. 'rows' maps Excel row numbers to
+    (type id, 'Family and Type' text at export)."""
+
+    def __init__(self, sheet, schedule_id, fields, storage, rows):
+        self.sheet = sheet
+        self.schedule_id = schedule_id
+        self.fields = list(fields)
+        self.storage = list(storage)
+        self.rows = rows
+
+    def checksum(self):
+        tokens = [str(SCHEMA_VERSION), self.sheet, str(self.schedule_id)]
+        tokens += self.fields + ["|"] + self.storage + ["|"]
+        for number in sorted(self.rows):
+            type_id, fyt = self.rows[number]
+            tokens += [str(number), str(type_id), fyt]
+        return hashlib.sha1(u"\x1f".join(tokens).encode("utf-8")).hexdigest()
+
+    def encode(self):
+        """Rows of this block in the metadata sheet."""
+        rows = [["sheet", self.sheet],
+                ["schedule", str(self.schedule_id)],
+                ["fields"] + self.fields,
+                ["storage"] + self.storage]
+        for number in sorted(self.rows):
+            type_id, fyt = self.rows[number]
+            rows.append(["row", str(number), str(type_id), fyt])
+        rows.append(["checksum", self.checksum()])
+        return rows
+
+
+def encode(blocks):
+    """Rows of the metadata sheet for a list of Metadata blocks."""
+    rows = [[META_TITLE, str(SCHEMA_VERSION)]]
+    for block in blocks:
+        rows += block.encode()
+    return rows
+
+
+def _int(value):
+    return int(float(cell_text(value)))
+
+
+def decode(rows):
+    """Reads the metadata sheet. Returns ({sheet name: Metadata}, {sheet name: error})
+    - blocks whose checksum doesn't match are returned as errors.
+    Raises ImportCodeError if the sheet is not a known schema version."""
+    rows = iter(rows)
+    first = next(rows, [])
+    if len(first) < 2 or cell_text(first[0]) != META_TITLE:
+        raise ImportCodeError("the metadata sheet is not valid")
+    try:
+        version = _int(first[1])
+    except ValueError:
+        raise ImportCodeError("the metadata sheet is not valid")
+    if version > SCHEMA_VERSION:
+        raise ImportCodeError("the file was exported with a newer version of the tool (schema {})".format(version))
+
+    blocks = {}
+    invalid = {}
+    block = None
+    for row in rows:
+        cells = [cell_text(c) for c in row]
+        while cells and cells[-1] == "":
+            cells.pop()
+        if not cells:
+            continue
+        key, values = cells[0], cells[1:]
+        try:
+            if key == "sheet":
+                block = Metadata(values[0], None, [], [], {})
+            elif block is None:
+                continue
+            elif key == "schedule":
+                block.schedule_id = _int(values[0])
+            elif key == "fields":
+                block.fields = values
+            elif key == "storage":
+                block.storage = values + [""] * (len(block.fields) - len(values))
+            elif key == "row":
+                fyt = values[2] if len(values) > 2 else ""
+                block.rows[_int(values[0])] = (_int(values[1]), fyt)
+            elif key == "checksum":
+                if values and values[0] == block.checksum():
+                    blocks[block.sheet] = block
+                else:
+                    invalid[block.sheet] = "import code modified (checksum)"
+                block = None
+        except (IndexError, ValueError):
+            if block is not None:
+                invalid[block.sheet] = "import code damaged"
+            block = None
+
+    if block is not None:
+        invalid[block.sheet] = "import code incomplete"
+    return blocks, invalid
+
+
+# WORKSHEET DATA
+
+class SheetData(object):
+    """Rows of an exported worksheet split into header and body, with the
+    columns of the editable parameters taken from its import code.
+    'refs' maps Excel row numbers to (type id, 'Family and Type') when known."""
+
+    def __init__(self, name, header, body, codes, fyt_col, storage=None, refs=None):
+        self.name = name
+        self.header = header
+        self.body = body
+        self.codes = codes
+        self.fyt_col = fyt_col
+        self.refs = refs or {}
+        # (code, column) of every parameter with an Id code, except 'Family and Type'
+        # (and, when known, except fields that weren't type parameters at export)
+        self.params = [(code, col) for col, code in enumerate(codes)
+                       if col != fyt_col and _is_id_code(code) and (not storage or storage[col])]
+
+    def column_name(self, col):
+        return cell_text(self.header[col]) if col < len(self.header) else str(col + 1)
+
+    def type_ref(self, row_idx):
+        """(type id, 'Family and Type' at export) of a body row, or None."""
+        return self.refs.get(row_number(row_idx))
+
+
+def row_number(row_idx):
+    """Excel row number of a body row (row 1 is the header)."""
+    return row_idx + 2
+
+
+def _is_id_code(code):
+    try:
+        int(code)
+        return True
+    except ValueError:
+        return False
+
+
+def _is_blank(row):
+    return all(cell_text(c) == "" for c in row)
+
+
+def _pad(body, width):
+    """Removes trailing blank rows and pads short rows so every code has a cell."""
+    while body and _is_blank(body[-1]):
+        body.pop()
+    return [list(row) + [""] * (width - len(row)) for row in body]
+
+
+def read_tagged_sheet(name, rows, meta, fyt_code):
+    """Worksheet with a metadata block: header row followed by body rows.
+    'rows' may be any iterable (e.g. a streaming reader). Raises ImportCodeError."""
+    if fyt_code not in meta.fields:
+        raise ImportCodeError("the import code has no 'Family and Type' field")
+    rows = iter(rows)
+    header = next(rows, [])
+    body = _pad(list(rows), len(meta.fields))
+    return SheetData(name, header, body, meta.fields, meta.fields.index(fyt_code), meta.storage, meta.rows)
+
+
+def read_sheet(name, rows, fyt_code):
+    """Decodes a legacy worksheet (schema version 1): header row, body rows,
+    blank row, trailer label and import code. 'rows' may be any iterable (e.g. a
+    streaming reader): only the body rows and the trailer are kept, and nothing
+    after the trailer is read. Raises ImportCodeError."""
+    rows = iter(rows)
+    header = next(rows, [])
+
+    body = []
+    code_row = None
+    for row in rows:
+        if row and cell_text(row[0]) == TRAILER_LABEL:
+            code_row = next(rows, None)
+            break
+        body.append(row)
+
+    if not code_row:
+        raise ImportCodeError("no import code found")
+
+    codes = cell_text(code_row[0]).split(SEP)
+    if fyt_code not in codes:
+        raise ImportCodeError("the import code has no 'Family and Type' field")
+
+    body = _pad(body, len(codes))
+    return SheetData(name, header, body, codes, codes.index(fyt_code))
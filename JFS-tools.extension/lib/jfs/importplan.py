@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""Pure-data stage of 'Import text data' (pure Python): reading the file and
+planning the changes, both on worker threads (jfs.workers).
+
+Only the snapshot of the model (jfs.bulkedit.BulkEditor.snapshot) and applying
+the planned values need the Revit API, on the main thread:
+
+    sheets, skipped = read_file(path, fyt_code)                     # worker threads
+    snapshot = editor.snapshot(wanted_keys(sheets))                 # main thread
+    plans, errors = plan_sheets(snapshot, sheets)                   # worker threads
+    editor.apply_entries(plans[sheet name].get(row_idx, ()))        # main thread
+
+A resumed import (jfs.checkpoint) first confirms the sample of its checkpoint
+against the rows of that sample only (sample_keys, holds), then snapshots, plans
+and applies only the rows from the first one not committed ('starts').
+"""
+
+from collections import OrderedDict
+
+from jfs import bulkedit, cellvalues, delimited, importcode, workers, xlsxreader
+
+
+PLAN_ROWS = 2000        # Rows per planning task
+
+
+# READ
+
+def read_file(path, fyt_code, threads=None):
+    """Reads an exported .xlsx (every visible worksheet, one per thread) or a
+    .csv/.tsv file. Returns (sheets, skipped): importcode.SheetData of the sheets
+    with a valid import code and 'name (reason)' of the others.
+    Raises ImportCodeError if the import code sheet is not valid, and IOError,
+    csv.Error or XlsxError if the file can't be read."""
+    if delimited.is_delimited(path):
+        return [delimited.read_sheet(path, fyt_code)], []
+
+    with xlsxreader.XlsxReader(path) as workbook:
+        blocks, invalid = {}, {}
+        if importcode.META_SHEET in workbook.sheet_names(hidden=True):
+            blocks, invalid = importcode.decode(workbook.iter_rows(importcode.META_SHEET))
+        names = workbook.sheet_names()
+        strings = workbook.shared_strings()
+
+    def read(name):
+        try:
+            if name in invalid:
+                raise importcode.ImportCodeError(invalid[name])
+            # Each thread reads with its own zip handle
+            with xlsxreader.XlsxReader(path, strings) as reader:
+                if name in blocks:
+                    return importcode.read_tagged_sheet(name, reader.iter_rows(name), blocks[name], fyt_code), None
+                return importcode.read_sheet(name, reader.iter_rows(name), fyt_code), None
+        except importcode.ImportCodeError as ex:
+            return None, "{} ({})".format(name, ex)
+
+    sheets, skipped = [], []
+    for sheet, reason in workers.parallel_map(read, names, threads):
+        if sheet:
+            sheets.append(sheet)
+        else:
+            skipped.append(reason)
+    return sheets, skipped
+
+
+# RECORDS
+
+def type_key(sh, row_idx):
+    """Bulk edit type key of a body row: the type id recorded at export while its
+    'Family and Type' is unchanged, else 'Family and Type' if it contains ':'
+    (an element of interest), else None."""
+    fyt = cellvalues.cell_text(sh.body[row_idx][sh.fyt_col])
+    ref = sh.type_ref(row_idx)
+    if ref and ref[1] == fyt:
+        return ref[0]
+    if ":" in fyt:
+        return fyt
+    return None
+
+
+def row_records(sh, row_idx):
+    """Bulk edit records of one body row."""
+    key = type_key(sh, row_idx)
+    if key is None:
+        return []
+    row = sh.body[row_idx]
+    number = importcode.row_number(row_idx)
+    return [(key, code, row[col], (sh.name, number, sh.column_name(col))) for code, col in sh.params]
+
+
+def wanted_keys(sheets, starts=None):
+    """{type key: parameter codes} of every row of the sheets (from the rows of
+    'starts', {sheet name: first row idx}), for the snapshot."""
+    starts = starts or {}
+    wanted = OrderedDict()
+    for sh in sheets:
+        codes = set(code for code, _ in sh.params)
+        for row_idx in range(starts.get(sh.name, 0), len(sh.body)):
+            key = type_key(sh, row_idx)
+            if key is not None:
+                wanted.setdefault(key, set()).update(codes)
+    return wanted
+
+
+# PLAN
+
+def plan_sheets(snapshot, sheets, threads=None, rows_per_task=PLAN_ROWS, starts=None):
+    """Converts every row (from the rows of 'starts', {sheet name: first row
+    idx}), in blocks of rows on worker threads, then diffs against the
+    snapshot. A type parameter given in several rows or sheets gets the value
+    of the last one in (sheet, row) order, set at that row if it changes.
+    Returns ({sheet name: {row idx: apply-list}}, ConversionErrors), with only
+    the rows that have changes."""
+    starts = starts or {}
+    tasks = [(sh, start, min(start + rows_per_task, len(sh.body)))
+             for sh in sheets for start in range(starts.get(sh.name, 0), len(sh.body), rows_per_task)]
+
+    def plan(task):
+        sh, start, end = task
+        errors = cellvalues.ConversionErrors()
+        rows = {}
+        for row_idx in range(start, end):
+            entries = bulkedit.plan(snapshot, row_records(sh, row_idx), errors, diff=False)
+            if entries:
+                rows[row_idx] = entries
+        return sh.name, rows, errors
+
+    converted = dict((sh.name, {}) for sh in sheets)
+    errors = cellvalues.ConversionErrors()
+    for name, rows, task_errors in workers.parallel_map(plan, tasks, threads):
+        converted[name].update(rows)
+        errors.extend(task_errors)
+
+    # Last row of every type parameter, in the order the rows are applied
+    last = {}
+    for sh in sheets:
+        for row_idx in sorted(converted[sh.name]):
+            for type_id, code, _ in converted[sh.name][row_idx]:
+                last[(type_id, code)] = (sh.name, row_idx)
+
+    plans = dict((sh.name, {}) for sh in sheets)
+    for name, rows in converted.items():
+        for row_idx, entries in rows.items():
+            entries = [(type_id, code, value) for type_id, code, value in entries
+                       if last[(type_id, code)] == (name, row_idx) and snapshot.differs(type_id, code, value)]
+            if entries:
+                plans[name][row_idx] = entries
+    return plans, errors
+
+
+# RESUME
+
+def _sample_rows(sheets, sample):
+    """(sheet, row idx, type id, code) of a checkpoint sample whose row exists."""
+    by_name = dict((sh.name, sh) for sh in sheets)
+    for name, row_idx, type_id, code in sample:
+        sh = by_name.get(name)
+        if sh is not None and row_idx < len(sh.body):
+            yield sh, row_idx, type_id, code
+
+
+def sample_keys(sheets, sample):
+    """{type key: parameter codes} of the rows of a checkpoint sample (see
+    jfs.checkpoint), for the snapshot holds() compares against."""
+    records = [r for sh, row_idx, _, _ in _sample_rows(sheets, sample) for r in row_records(sh, row_idx)]
+    return bulkedit.wanted_keys(records)
+
+
+def holds(snapshot, sheets, sample):
+    """Whether the model holds every value of a checkpoint sample: converted
+    again from its row, it equals the current value of its type parameter."""
+    found = 0
+    for sh, row_idx, type_id, code in _sample_rows(sheets, sample):
+        entries = bulkedit.plan(snapshot, row_records(sh, row_idx), cellvalues.ConversionErrors(), diff=False)
+        values = [value for entry_type, entry_code, value in entries if (entry_type, entry_code) == (type_id, code)]
+        if not values or snapshot.differs(type_id, code, values[-1]):
+            return False
+        found += 1
+    return found == len(sample)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Invalidation journal of a document (pure Python).
+
+The doc-changed hook appends one event per DocumentChanged: a sequence number and
+the ids added, modified and deleted. Every cache keeps the sequence number it is
+up to date with (its cursor) and asks for the ids changed since, so several caches
+can invalidate exactly their affected entries independently.
+
+The journal is a ring buffer bounded by the number of ids it holds: the oldest
+events are dropped when it is full, and a cache whose cursor is older than the
+first event kept must be rebuilt. It is a plain dict (see jfs.session) and
+appending costs O(changed ids).
+"""
+
+from collections import deque
+
+
+CAPACITY = 200000       # Ids kept before the oldest events are dropped
+
+
+def new_journal(capacity=CAPACITY):
+    return {"seq": 0,               # Sequence number of the last event
+            "first": 1,             # Sequence number of the oldest event kept
+            "events": deque(),      # (seq, changed ids, deleted ids)
+            "size": 0,              # Ids held by the events
+            "capacity": capacity}
+
+
+def record(journal, changed, deleted):
+    """Appends an event with the ids (ints) added or modified and the ids deleted.
+    Returns its sequence number."""
+    changed = tuple(changed)
+    deleted = tuple(deleted)
+    journal["seq"] += 1
+    if changed or deleted:
+        journal["events"].append((journal["seq"], changed, deleted))
+        journal["size"] += len(changed) + len(deleted)
+
+    events = journal["events"]
+    while journal["size"] > journal["capacity"] and events:
+        seq, old_changed, old_deleted = events.popleft()
+        journal["size"] -= len(old_changed) + len(old_deleted)
+        journal["first"] = seq + 1
+    return journal["seq"]
+
+
+def cursor(journal):
+    """Cursor of a cache that is up to date now."""
+    return journal["seq"]
+
+
+def since(journal, cursor):
+    """(new cursor, changed ids, deleted ids) since 'cursor'. The sets are None if
+    events after 'cursor' were dropped: the cache must be rebuilt.
+    An id both changed and deleted counts as its last state."""
+    if cursor + 1 < journal["first"]:
+        return journal["seq"], None, None
+    changed, deleted = set(), set()
+    for seq, event_changed, event_deleted in reversed(journal["events"]):
+        if seq <= cursor:
+            break
+        for element_id in event_changed:
+            if element_id not in deleted:
+                changed.add(element_id)
+        for element_id in event_deleted:
+            if element_id not in changed:
+                deleted.add(element_id)
+    return journal["seq"], changed, deleted
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Legend component helpers shared by the Legends tools (type marks and counts)."""
+
+from Autodesk.Revit.DB import BuiltInParameter, CurveLoop, Line, XYZ
+
+
+# Arrow drawn from a text note to its legend component (feet)
+HEAD_LENGTH = 1.5
+HEAD_WIDTH  = 1.0
+SHAFT_WIDTH = 0.2
+
+
+def legend_type_id(legcom_element):
+    """ElementId of the source type of a legend component."""
+    return legcom_element.get_Parameter(BuiltInParameter.LEGEND_COMPONENT).AsElementId()
+
+
+def countfromlegcom(legcom_element, type_counts):
+    """Instance count of the source type of a legend component, from
+    {type id: number of instances} (see jfs.snapshot)."""
+    return type_counts.get(legend_type_id(legcom_element).Value, 0)
+
+
+def markfromlegcom(doc, legcom_element):
+    """Type Mark parameter of the source type of a legend component."""
+    legcom_type = doc.GetElement(legend_type_id(legcom_element))
+    return legcom_type.get_Parameter(BuiltInParameter.WINDOW_TYPE_ID)
+
+
+def arrowfrom2pts(pt1, pt2):
+    """Closed CurveLoop of an arrow from pt1 to pt2 (in the XY plane of the view)."""
+    direction = (pt2 - pt1).Normalize()
+    # Perpendicular vector for width (assuming View XY plane)
+    side_vec = direction.CrossProduct(XYZ.BasisZ).Normalize()
+
+    p_base_head = pt2 - direction * HEAD_LENGTH
+
+    points = [pt1 + side_vec * (SHAFT_WIDTH / 2.0),             # Shaft start right
+              p_base_head + side_vec * (SHAFT_WIDTH / 2.0),     # Shaft shoulder right
+              p_base_head + side_vec * (HEAD_WIDTH / 2.0),      # Head wing right
+              pt2,                                              # Final tip
+              p_base_head - side_vec * (HEAD_WIDTH / 2.0),      # Head wing left
+              p_base_head - side_vec * (SHAFT_WIDTH / 2.0),     # Shaft shoulder left
+              pt1 - side_vec * (SHAFT_WIDTH / 2.0)]             # Shaft start left
+
+    curves = [Line.CreateBound(points[i], points[(i + 1) % len(points)]) for i in range(len(points))]
+    return CurveLoop.Create(curves)
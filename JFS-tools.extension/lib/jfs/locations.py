@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Plan locations of doors and stairs (pure Python).
+
+The evacuation tools locate doors and stairs by the centre of their bounding
+box: Location.Point is not valid for curtain wall doors, and a stair has no
+single point. The boxes used are the model-space ones (the session snapshot
+reads them with get_BoundingBox(None)), so the result does not depend on the
+active view, its crop or hidden elements, and a level can be sized without
+opening a view of it:
+
+    locs = snap.locations(BuiltInCategory.OST_Doors)      # {id: box} of the snapshot
+    locs.centre(door.Id.Value)                            # (x, y)
+    locs.contains(stair.Id.Value, (x, y))
+
+Boxes are (min x, min y, min z, max x, max y, max z) tuples keyed by element id
+value, so the same class works on stand-in data outside Revit.
+"""
+
+
+def plan_box(bbox):
+    """(min x, min y, max x, max y) of a box, or None."""
+    if bbox is None:
+        return None
+    return (bbox[0], bbox[1], bbox[3], bbox[4])
+
+
+def centre(bbox):
+    """Plan centre (x, y) of a box, or None."""
+    if bbox is None:
+        return None
+    return ((bbox[0] + bbox[3]) / 2, (bbox[1] + bbox[4]) / 2)
+
+
+class Locations(object):
+    """Plan boxes and centres of elements, by element id value. Centres are
+    computed once per element."""
+
+    def __init__(self, boxes):
+        self.boxes = boxes
+        self.centres = {}
+
+    def __contains__(self, element_id):
+        return self.boxes.get(element_id) is not None
+
+    def plan_box(self, element_id):
+        return plan_box(self.boxes.get(element_id))
+
+    def centre(self, element_id):
+        point = self.centres.get(element_id)
+        if point is None:
+            point = self.centres[element_id] = centre(self.boxes.get(element_id))
+        return point
+
+    def contains(self, element_id, pt):
+        """Whether the plan box of the element contains pt (x, y), edges included."""
+        box = self.plan_box(element_id)
+        if box is None:
+            return False
+        return box[0] <= pt[0] <= box[2] and box[1] <= pt[1] <= box[3]
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""Evacuation routes of the spaces without paths of travel (pure Python).
+
+Each level of the evacuation model (jfs.evacuation) is rasterized into a
+navigation grid: a cell belongs to the space containing its centre, and the
+cells around every door (its opening, wall thickness included) are walkable
+and connect the spaces on both sides. One multi-source Dijkstra from the exits
+of the floor (doors leading out of every space of the level, and stairs) gives,
+for every cell, the distance to its nearest exit and the way there:
+
+    plan = navigation.candidate_paths(model)
+    model.what_if(extra_paths=plan.paths)   # sized as if they were drawn
+
+A candidate path starts at the farthest cell of its space (the most remote
+origin) and ends at the exit point; the grid route is shortened by cutting
+every corner the grid allows. Candidate ids are negative, so they never clash
+with element ids.
+"""
+
+import heapq
+import math
+from collections import namedtuple
+
+from jfs import overlay
+from jfs.evacuation import DOOR, DOOR_PROBE, STAIR, Path
+
+
+CELL = 1.0              # ft: side of a grid cell
+DOOR_OPENING = 1.5      # ft: radius around a door point walkable across the wall
+
+# paths: candidate Path list; origins / exits: {path id: space id / exit id}; unreachable: space ids
+Plan = namedtuple("Plan", "paths origins exits unreachable")
+
+SQRT2 = math.sqrt(2.0)
+_STEPS = ((1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+          (1, 1, SQRT2), (1, -1, SQRT2), (-1, 1, SQRT2), (-1, -1, SQRT2))
+
+
+class NavigationGrid(object):
+    """Spaces of a level (Space) and its doors (door Exits) as a grid of cells."""
+
+    def __init__(self, spaces, doors, cell=CELL):
+        self.cell = cell
+        self.space_ids = [s.id for s in spaces]
+        xs = [c for s in spaces for seg in s.edges for c in (seg[0], seg[2])] + [d.point[0] for d in doors]
+        ys = [c for s in spaces for seg in s.edges for c in (seg[1], seg[3])] + [d.point[1] for d in doors]
+        if not xs:
+            xs, ys = [0.0], [0.0]
+        margin = DOOR_OPENING + DOOR_PROBE + cell
+        self.x0, self.y0 = min(xs) - margin, min(ys) - margin
+        self.nx = int((max(xs) + margin - self.x0) / cell) + 1
+        self.ny = int((max(ys) + margin - self.y0) / cell) + 1
+
+        self.labels = [-1] * (self.nx * self.ny)        # Index of the space of every cell, -1 outside
+        for label, space in enumerate(spaces):
+            self._fill(label, space.edges)
+        self.openings = set()
+        for d in doors:
+            self.openings.update(self.around(d.point, max(DOOR_OPENING, cell)))
+
+    def _fill(self, label, edges):
+        """Scanline fill of the cells whose centre is inside the edges (even-odd rule)."""
+        if not edges:
+            return
+        cell, labels = self.cell, self.labels
+        y_min = min(min(s[1], s[3]) for s in edges)
+        y_max = max(max(s[1], s[3]) for s in edges)
+        j0 = max(0, int(math.ceil((y_min - self.y0) / cell - 0.5)))
+        j1 = min(self.ny - 1, int(math.floor((y_max - self.y0) / cell - 0.5)))
+        for j in range(j0, j1 + 1):
+            y = self.y0 + (j + 0.5) * cell
+            crossings = sorted(x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+                               for x0, y0, x1, y1 in edges if (y0 > y) != (y1 > y))
+            for xa, xb in zip(crossings[::2], crossings[1::2]):
+                i0 = max(0, int(math.ceil((xa - self.x0) / cell - 0.5)))
+                i1 = min(self.nx - 1, int(math.floor((xb - self.x0) / cell - 0.5)))
+                row = j * self.nx
+                for i in range(i0, i1 + 1):
+                    labels[row + i] = label
+
+    # CELLS
+
+    def index(self, pt):
+        """Cell of a point, or None outside the grid."""
+        i = int(math.floor((pt[0] - self.x0) / self.cell))
+        j = int(math.floor((pt[1] - self.y0) / self.cell))
+        if 0 <= i < self.nx and 0 <= j < self.ny:
+            return j * self.nx + i
+        return None
+
+    def centre(self, idx):
+        j, i = divmod(idx, self.nx)
+        return (self.x0 + (i + 0.5) * self.cell, self.y0 + (j + 0.5) * self.cell)
+
+    def around(self, pt, radius):
+        """Cells whose centre is within 'radius' of pt."""
+        cell = self.cell
+        i0 = max(0, int(math.floor((pt[0] - radius - self.x0) / cell)))
+        i1 = min(self.nx - 1, int(math.floor((pt[0] + radius - self.x0) / cell)))
+        j0 = max(0, int(math.floor((pt[1] - radius - self.y0) / cell)))
+        j1 = min(self.ny - 1, int(math.floor((pt[1] + radius - self.y0) / cell)))
+        cells = []
+        for j in range(j0, j1 + 1):
+            for i in range(i0, i1 + 1):
+                idx = j * self.nx + i
+                c = self.centre(idx)
+                if math.hypot(c[0] - pt[0], c[1] - pt[1]) <= radius:
+                    cells.append(idx)
+        return cells
+
+    def space_at(self, pt):
+        """Id of the space at a point, or None."""
+        idx = self.index(pt)
+        label = self.labels[idx] if idx is not None else -1
+        return self.space_ids[label] if label >= 0 else None
+
+    def walkable(self, idx):
+        return self.labels[idx] >= 0 or idx in self.openings
+
+    def passable(self, a, b):
+        """Whether one can walk between two neighbouring cells: within a space, or through a door opening."""
+        if not self.walkable(b):
+            return False
+        return self.labels[a] == self.labels[b] or a in self.openings or b in self.openings
+
+    def neighbours(self, idx):
+        j, i = divmod(idx, self.nx)
+        for di, dj, cost in _STEPS:
+            ni, nj = i + di, j + dj
+            if not (0 <= ni < self.nx and 0 <= nj < self.ny):
+                continue
+            n = nj * self.nx + ni
+            if not self.passable(idx, n):
+                continue
+            # Diagonals never cut the corner of a wall
+            if di and dj and not (self.passable(idx, j * self.nx + ni) and self.passable(idx, nj * self.nx + i)):
+                continue
+            yield n, cost * self.cell
+
+    # ROUTES
+
+    def distances(self, sources):
+        """Multi-source Dijkstra from 'sources' [(point, exit id)]: every
+        walkable cell within the door opening of a point starts at its
+        distance to it. Returns {cell: distance}, {cell: next cell towards the
+        exit} and {cell: exit id}."""
+        dist, parent, owner, heap = {}, {}, {}, []
+        for pt, exit_id in sources:
+            for idx in self.around(pt, max(DOOR_OPENING, self.cell)):
+                if not self.walkable(idx):
+                    continue
+                c = self.centre(idx)
+                d = math.hypot(c[0] - pt[0], c[1] - pt[1])
+                if d < dist.get(idx, float("inf")):
+                    dist[idx], owner[idx] = d, exit_id
+                    parent.pop(idx, None)
+                    heapq.heappush(heap, (d, idx))
+        while heap:
+            d, idx = heapq.heappop(heap)
+            if d > dist[idx]:
+                continue
+            for n, cost in self.neighbours(idx):
+                nd = d + cost
+                if nd < dist.get(n, float("inf")):
+                    dist[n], parent[n], owner[n] = nd, idx, owner[idx]
+                    heapq.heappush(heap, (nd, n))
+        return dist, parent, owner
+
+    def visible(self, p, q):
+        """Whether the straight segment p-q only crosses passable cells."""
+        steps = int(math.hypot(q[0] - p[0], q[1] - p[1]) / (self.cell / 2)) + 1
+        prev = self.index(p)
+        for k in range(1, steps + 1):
+            t = float(k) / steps
+            idx = self.index((p[0] + t * (q[0] - p[0]), p[1] + t * (q[1] - p[1])))
+            if idx is None:
+                return False
+            if idx != prev:
+                if not self.passable(prev, idx):
+                    return False
+                prev = idx
+        return True
+
+    def polyline(self, start, parent):
+        """Points from a start cell to its exit, corners cut where the grid allows."""
+        pts = [self.centre(start)]
+        idx = start
+        while idx in parent:
+            idx = parent[idx]
+            pts.append(self.centre(idx))
+        result = [pts[0]]
+        i = 0
+        while i < len(pts) - 1:
+            j = i + 1
+            while j + 1 < len(pts) and self.visible(pts[i], pts[j + 1]):
+                j += 1
+            result.append(pts[j])
+            i = j
+        return result
+
+
+def floor_exits(model, level, grid):
+    """Exits of a level that leave the floor: stairs, and doors with one side
+    (DOOR_PROBE across the door) outside every space of the level."""
+    exits = []
+    for eid in model.level_exits.get(level, ()):
+        e = model.exits[eid]
+        if e.kind == STAIR:
+            exits.append(e)
+        elif e.kind == DOOR and e.normal:
+            k = DOOR_PROBE
+            sides = [grid.space_at((e.point[0] + s * k * e.normal[0], e.point[1] + s * k * e.normal[1]))
+                     for s in (1, -1)]
+            if None in sides:
+                exits.append(e)
+    return exits
+
+
+def unpathed_spaces(model, level):
+    """Ids of the spaces of a level no path of travel starts in or crosses."""
+    space_ids = model.level_spaces.get(level, [])
+    segments = [seg for pid in model.level_paths.get(level, ()) for seg in model.paths[pid].segments]
+    crossed = overlay.spaces_crossed(segments, [model.spaces[sid].edges for sid in space_ids]) if segments else ()
+    pathed = set(space_ids[idx] for idx in crossed)
+    return [sid for sid in space_ids if sid not in pathed]
+
+
+def _segments(points):
+    return [p + q for p, q in zip(points, points[1:]) if p != q]
+
+
+def candidate_paths(model, cell=CELL, levels=None, first_id=-1):
+    """Candidate Path from every unpathed space with people to its nearest
+    floor exit, all levels (or 'levels'). Returns a Plan."""
+    plan = Plan([], {}, {}, [])
+    next_id = first_id
+    for level in sorted(model.level_spaces, key=str):
+        if levels is not None and level not in levels:
+            continue
+        todo = [sid for sid in unpathed_spaces(model, level) if model.spaces[sid].people]
+        if not todo:
+            continue
+        spaces = [model.spaces[sid] for sid in model.level_spaces[level]]
+        doors = [model.exits[eid] for eid in model.level_doors.get(level, ())]
+        grid = NavigationGrid(spaces, doors, cell)
+        exits = floor_exits(model, level, grid)
+        dist, parent, owner = grid.distances([(e.point, e.id) for e in exits])
+
+        farthest = {}
+        for idx, d in dist.items():
+            label = grid.labels[idx]
+            if label >= 0 and (label not in farthest or d > dist[farthest[label]]):
+                farthest[label] = idx
+        labels = dict((sid, label) for label, sid in enumerate(grid.space_ids))
+        for sid in todo:
+            start = farthest.get(labels[sid])
+            if start is None:
+                plan.unreachable.append(sid)
+                continue
+            points = grid.polyline(start, parent)
+            # The last cell is in the opening of the exit: the path ends at the exit point itself
+            if len(points) > 1:
+                points[-1] = model.exits[owner[start]].point
+            else:
+                points.append(model.exits[owner[start]].point)
+            plan.paths.append(Path(next_id, level, points[0], points[-1], _segments(points)))
+            plan.origins[next_id] = sid
+            plan.exits[next_id] = owner[start]
+            next_id -= 1
+    return plan
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Occupancy of the spaces from their area and use (pure Python).
+
+The people of a space are its area divided by the occupancy density of its use
+(m2 per person, CTE DB-SI Table 2.1), rounded up per space. The use is read
+from the space parameter 'OCCUPANCY USE' (Text); a space without a use in the
+table keeps the 'Number of People' assigned in Revit:
+
+    densities = occupancy.load_densities(occupancy.default_table_path())
+    people = occupancy.level_occupancy(
+        [(rec.id, area_ft2, use, number_of_people) for rec in space_records], densities)
+    people[space_id]   ->  int
+
+The densities can be changed in a JSON file {"use": m2 per person} (see
+default_table_path): its entries replace or extend the table below, so the
+whole building is sized again on the next run without editing any space.
+"""
+
+import json
+import math
+from collections import OrderedDict
+
+
+USE_PARAM = "OCCUPANCY USE"         # Space parameter (Text): a use of the density table
+TABLE_NAME = "jfs_occupancy_densities"  # pyRevit universal data file (.json)
+
+SQFT_TO_M2 = 0.09290304
+ROUNDING = 1e-9                     # 20.0000000001 people are 20, not 21
+
+# CTE DB-SI Table 2.1 - m2 per person (0: occupancy ignored, e.g. occasional use)
+DEFAULT_DENSITIES = OrderedDict([
+    ("OCCASIONAL USE", 0),                          # Ocupación ocasional / mantenimiento
+    ("TOILETS", 3),                                 # Aseos de planta
+    ("DWELLING", 20),                               # Residencial Vivienda
+    ("ACCOMMODATION", 20),                          # Residencial Público: alojamiento
+    ("MULTIPURPOSE HALL", 1),                       # Salones de uso múltiple
+    ("PARKING", 40),                                # Aparcamiento
+    ("PARKING - LINKED TO ANOTHER USE", 15),        # Aparcamiento vinculado a otro uso
+    ("OFFICES", 10),                                # Administrativo: oficinas
+    ("LOBBY", 2),                                   # Vestíbulos generales y zonas de uso público
+    ("TEACHING - WHOLE FLOOR", 10),                 # Docente: conjunto de la planta
+    ("TEACHING - LABORATORIES AND WORKSHOPS", 5),   # Docente: locales diferentes de aulas
+    ("CLASSROOMS", 1.5),                            # Docente: aulas (excepto infantil)
+    ("CLASSROOMS - NURSERY", 2),                    # Docente: aulas de escuelas infantiles
+    ("HOSPITAL - WAITING ROOMS", 2),                # Hospitalario: salas de espera
+    ("HOSPITAL - WARDS", 15),                       # Hospitalario: hospitalización
+    ("HOSPITAL - OUTPATIENTS AND DIAGNOSIS", 10),   # Hospitalario: ambulatorio y diagnóstico
+    ("HOSPITAL - INPATIENT TREATMENT", 20),         # Hospitalario: tratamiento a internados
+    ("SALES AREA - GROUND AND BASEMENT", 2),        # Comercial: ventas en sótano, baja y entreplanta
+    ("SALES AREA - OTHER FLOORS", 3),               # Comercial: ventas en otras plantas
+    ("STANDING AUDIENCE", 0.25),                    # Pública concurrencia: espectadores de pie
+    ("SEATED AUDIENCE - NO FIXED SEATS", 0.5),      # Espectadores sentados sin asientos definidos
+    ("DISCOTHEQUE", 0.5),                           # Zonas de público en discotecas
+    ("STANDING BAR", 1),                            # Público de pie en bares y cafeterías
+    ("GYM - WITH EQUIPMENT", 5),                    # Gimnasios con aparatos
+    ("GYM - WITHOUT EQUIPMENT", 1.5),               # Gimnasios sin aparatos
+    ("POOL - BATHING AREA", 2),                     # Piscinas: zona de baño
+    ("POOL - STAY AREA", 4),                        # Piscinas: zona de estancia
+    ("FAST FOOD RESTAURANT", 1.2),                  # Restaurantes de comida rápida
+    ("RESTAURANT - SEATED", 1.5),                   # Público sentado en bares y restaurantes
+    ("WAITING ROOMS AND LIBRARIES", 2),             # Salas de espera, lectura, museos, exposiciones
+    ("BAR SERVICE AREA", 10),                       # Zonas de servicio de bares y restaurantes
+    ("STORAGE AND ARCHIVES", 40),                   # Archivos, almacenes
+])
+
+
+def _key(use):
+    return use.strip().upper() if use else ""
+
+
+def load_densities(path=None):
+    """Density table: the defaults, updated with the entries of the JSON file
+    'path' if it exists. Entries that are not a number >= 0 are ignored."""
+    densities = OrderedDict((_key(use), float(d)) for use, d in DEFAULT_DENSITIES.items())
+    if not path:
+        return densities
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (IOError, OSError, ValueError):
+        return densities
+    if isinstance(data, dict):
+        for use, d in data.items():
+            if isinstance(d, (int, float)) and not isinstance(d, bool) and d >= 0:
+                densities[_key(use)] = float(d)
+    return densities
+
+
+def default_table_path():
+    """Density file shared by every document, in the pyRevit data folder."""
+    from pyrevit import script
+    return script.get_universal_data_file(TABLE_NAME, "json")
+
+
+def ceil_people(value):
+    """People rounded up (None or negative values count as 0)."""
+    if not value or value < 0:
+        return 0
+    return int(math.ceil(value - ROUNDING))
+
+
+def people(area_m2, density):
+    """People of an area for a density (m2 per person; 0 ignores the area)."""
+    if not density:
+        return 0
+    return ceil_people(area_m2 / density)
+
+
+def level_occupancy(spaces, densities):
+    """{space id: people} of (id, area in ft2, use, Revit number of people)
+    tuples, in one pass. A space whose use is not in the table keeps its
+    Revit number of people."""
+    result = {}
+    for space_id, area_ft2, use, assigned in spaces:
+        density = densities.get(_key(use))
+        if density is None:
+            result[space_id] = ceil_people(assigned)
+        else:
+            result[space_id] = people((area_ft2 or 0.0) * SQFT_TO_M2, density)
+    return result
+
+
+def unknown_uses(spaces, densities):
+    """Uses given to the spaces that are not in the table (sorted)."""
+    return sorted(set(use.strip() for _, _, use, _ in spaces
+                      if use and use.strip() and _key(use) not in densities))
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Whole-floor overlay of evacuation paths and spaces (pure Python).
+
+Finds, for every path of a level at once, the spaces whose boundary it crosses
+or touches. A sorted-interval plane sweep over the x extents of all the path
+and boundary segments pairs only segments whose bounding boxes overlap, and
+each pair is then tested exactly (jfs.geometry.segments_intersect):
+
+    incidence = overlay.path_space_incidence(
+        [geometry.segments_xy(lines) for lines in path_lines],      # one list per path
+        [geometry.segments_xy(edges) for edges in sp_edges_XYZ01])  # one list per space
+    incidence[path_idx]  ->  set of space indices
+
+Segments are (x0, y0, x1, y1) tuples. Sorting is O(n log n); every segment is
+then compared with the segments of the other kind active at its x position.
+"""
+
+import heapq
+
+from jfs.geometry import segments_intersect
+
+
+def _flatten(groups, kind):
+    """Sweep entries (min x, kind, segment idx) and, per segment, its group and bounds."""
+    entries, owners, bounds, segments = [], [], [], []
+    for group_idx, group in enumerate(groups):
+        for seg in group:
+            x0, y0, x1, y1 = seg
+            entries.append((min(x0, x1), kind, len(segments)))
+            owners.append(group_idx)
+            bounds.append((max(x0, x1), min(y0, y1), max(y0, y1)))
+            segments.append(seg)
+    return entries, owners, bounds, segments
+
+
+def candidate_pairs(a_entries, a_bounds, b_entries, b_bounds):
+    """(a idx, b idx) of the segments of two sets whose bounding boxes overlap
+    (touching included), by a sweep of their x intervals."""
+    bounds = (a_bounds, b_bounds)
+    active = ({}, {})               # Per kind: segment idx -> (max x, min y, max y)
+    expiry = ([], [])               # Per kind: heap of (max x, segment idx)
+    for minx, kind, idx in sorted(a_entries + b_entries):
+        for k in (0, 1):
+            heap = expiry[k]
+            while heap and heap[0][0] < minx:
+                del active[k][heapq.heappop(heap)[1]]
+
+        maxx, miny, maxy = bounds[kind][idx]
+        for other, (_, other_miny, other_maxy) in active[1 - kind].items():
+            if other_miny <= maxy and miny <= other_maxy:
+                yield (idx, other) if kind == 0 else (other, idx)
+
+        active[kind][idx] = (maxx, miny, maxy)
+        heapq.heappush(expiry[kind], (maxx, idx))
+
+
+def path_space_incidence(paths, spaces):
+    """For every path (a list of segments), the set of indices of the spaces
+    (lists of boundary segments) it crosses or touches."""
+    p_entries, p_owner, p_bounds, p_segs = _flatten(paths, 0)
+    s_entries, s_owner, s_bounds, s_segs = _flatten(spaces, 1)
+    incidence = [set() for _ in paths]
+    for p_idx, s_idx in candidate_pairs(p_entries, p_bounds, s_entries, s_bounds):
+        found = incidence[p_owner[p_idx]]
+        space = s_owner[s_idx]
+        if space not in found and segments_intersect(p_segs[p_idx], s_segs[s_idx]):
+            found.add(space)
+    return incidence
+
+
+def spaces_crossed(path_segments, spaces):
+    """Indices of the spaces crossed or touched by any of 'path_segments'."""
+    return path_space_incidence([path_segments], spaces)[0]
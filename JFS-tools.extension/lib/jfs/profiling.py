@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""Stage timings of the JFS buttons (pure Python).
+
+A button is split into named stages (its numbered sections): each stage records
+its duration, the Revit API calls counted in it and any element counts. The
+report goes to the pyRevit output window and is appended as one JSON line per
+run to a log shared by every button:
+
+    prof = profiling.start(__title__, __shiftclick__)   # Shift+Click profiles the button
+    prof.section("1️⃣ DETECT COUNT 'TAGS'")            # Ends the previous stage
+    ...
+    prof.count("text notes", len(txtnts))
+    with prof.stage("CREATE ARROWS"): ...
+    prof.finish()
+
+Profiling is on for a Shift+Click or when the JFS_PROFILE environment variable
+is set. Otherwise start() returns a profiler whose methods do nothing, and
+profiling.count() (called by the jfs modules for their API calls) is a single
+global check.
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+
+ENV_FLAG = "JFS_PROFILE"
+LOG_NAME = "jfs_profile"        # pyRevit universal data file (.jsonl)
+
+clock = getattr(time, "perf_counter", time.time)
+
+_active = None                  # Profiler of the running button, if profiling
+
+
+def enabled(shiftclick=False):
+    return bool(shiftclick or os.environ.get(ENV_FLAG))
+
+
+def count(name, n=1):
+    """Adds 'n' to a counter of the current stage of the running profiler
+    (API calls or elements). Does nothing when not profiling."""
+    if _active is not None:
+        _active.count(name, n)
+
+
+class _Stage(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.counts = OrderedDict()
+
+    def as_dict(self):
+        return OrderedDict([("name", self.name), ("seconds", self.seconds), ("counts", self.counts)])
+
+
+class _StageContext(object):
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.outer = self.profiler._current
+        self.profiler._close()
+        self.profiler._open(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._close()
+        if self.outer is not None:
+            self.profiler._open(self.outer.name)
+        return False
+
+
+class Profiler(object):
+    """Records the stages of one run of a button."""
+
+    def __init__(self, title, log_path=None):
+        self.title = title
+        self.log_path = log_path
+        self.stages = OrderedDict()
+        self._current = None
+        self._started = None
+        self.start = clock()
+        self.finished = False
+
+    # STAGES
+
+    def _open(self, name):
+        self._current = self.stages.get(name) or self.stages.setdefault(name, _Stage(name))
+        self._started = clock()
+
+    def _close(self):
+        if self._current is not None:
+            self._current.seconds += clock() - self._started
+        self._current = None
+
+    def section(self, name):
+        """Ends the current stage and starts 'name' (for the numbered sections
+        of a script, which run one after the other)."""
+        self._close()
+        self._open(name)
+
+    def stage(self, name):
+        """Context manager timing a stage; the enclosing stage resumes after it."""
+        return _StageContext(self, name)
+
+    def timed(self, name):
+        """Decorator timing every call of a function as the stage 'name'."""
+        def decorator(func):
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, n=1):
+        stage = self._current
+        if stage is None:
+            self._open("(no stage)")
+            stage = self._current
+        stage.counts[name] = stage.counts.get(name, 0) + n
+
+    # REPORT
+
+    def results(self):
+        total = clock() - self.start
+        return OrderedDict([
+            ("button", self.title),
+            ("date", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            ("seconds", total),
+            ("stages", [stage.as_dict() for stage in self.stages.values()]),
+        ])
+
+    def finish(self, output=None):
+        """Ends the run: prints the report (see write_report) and appends it to
+        the log. Returns the results."""
+        global _active
+        if self.finished:
+            return None
+        self._close()
+        self.finished = True
+        if _active is self:
+            _active = None
+
+        results = self.results()
+        write_report(results, output)
+        append_log(self.log_path or default_log_path(), results)
+        return results
+
+
+class NullProfiler(object):
+    """Profiler used when profiling is off: every method does nothing."""
+
+    class _NoStage(object):
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    _no_stage = _NoStage()
+
+    def section(self, name):
+        pass
+
+    def stage(self, name):
+        return self._no_stage
+
+    def timed(self, name):
+        return lambda func: func
+
+    def count(self, name, n=1):
+        pass
+
+    def finish(self, output=None):
+        return None
+
+
+NULL = NullProfiler()
+
+
+def start(title, shiftclick=False, log_path=None):
+    """Profiler of a button run: a Profiler if profiling is enabled, else NULL."""
+    global _active
+    if not enabled(shiftclick):
+        return NULL
+    _active = Profiler(title, log_path)
+    return _active
+
+
+# OUTPUT
+
+def format_table(results):
+    """Markdown table of the stages of a run."""
+    lines = ["### {} - {:.3f} s".format(results["button"], results["seconds"]), "",
+             "| Stage | Seconds | % | Counts |", "|---|---:|---:|---|"]
+    total = results["seconds"] or 1.0
+    for stage in results["stages"]:
+        counts = ", ".join("{}: {}".format(k, v) for k, v in stage["counts"].items())
+        lines.append("| {} | {:.3f} | {:.0f} | {} |".format(stage["name"], stage["seconds"],
+                                                           100.0 * stage["seconds"] / total, counts))
+    return "\n".join(lines)
+
+
+def write_report(results, output=None):
+    """Prints the stage table to 'output' (default: the pyRevit output window,
+    or stdout outside pyRevit)."""
+    table = format_table(results)
+    if output is None:
+        try:
+            from pyrevit import script
+            output = script.get_output()
+        except ImportError:
+            print(table)
+            return
+    output.print_md(table)
+
+
+def default_log_path():
+    """Log shared by every button, in the pyRevit data folder (only looked up
+    when profiling)."""
+    from pyrevit import script
+    return script.get_universal_data_file(LOG_NAME, "jsonl")
+
+
+def append_log(path, results):
+    """Appends a run to the JSONL log (one JSON object per line)."""
+    try:
+        with open(path, "a") as f:
+            f.write(json.dumps(results) + "\n")
+    except (IOError, OSError):
+        pass
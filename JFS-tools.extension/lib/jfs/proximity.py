@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Hashed-grid proximity index of plan points (pure Python).
+
+Answers "which points lie within r of this point" without testing every point:
+the points are hashed into square cells of side 'cell' (the join tolerance),
+and a query only looks at the cells its circle overlaps (3 x 3 cells when
+r <= cell):
+
+    starts = proximity.PointIndex(3, [((p.PathStart.X, p.PathStart.Y), p) for p in paths])
+    starts.any_near((x, y))         # True if a path starts less than 3 ft away
+    starts.near((x, y))             # the paths themselves
+
+Distances are strict (d < r), as the former 'distance_2d(a, b) < 3' tests.
+"""
+
+import math
+
+
+class PointIndex(object):
+    """Points (x, y) with an item each, hashed in cells of side 'cell'."""
+
+    def __init__(self, cell, points=()):
+        if cell <= 0:
+            raise ValueError("cell size must be positive")
+        self.cell = float(cell)
+        self.cells = {}
+        self.size = 0
+        for pt, item in points:
+            self.add(pt, item)
+
+    def _key(self, x, y):
+        return int(math.floor(x / self.cell)), int(math.floor(y / self.cell))
+
+    def add(self, pt, item=None):
+        x, y = pt[0], pt[1]
+        self.cells.setdefault(self._key(x, y), []).append((x, y, item))
+        self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def _candidates(self, x, y, r):
+        span = max(1, int(math.ceil(r / self.cell)))
+        i, j = self._key(x, y)
+        cells = self.cells
+        for di in range(-span, span + 1):
+            for dj in range(-span, span + 1):
+                bucket = cells.get((i + di, j + dj))
+                if bucket:
+                    for entry in bucket:
+                        yield entry
+
+    def near(self, pt, r=None):
+        """Items of the points closer than r (default: the cell size) to pt."""
+        r = self.cell if r is None else r
+        x, y = pt[0], pt[1]
+        r2 = r * r
+        return [item for px, py, item in self._candidates(x, y, r)
+                if (px - x) ** 2 + (py - y) ** 2 < r2]
+
+    def any_near(self, pt, r=None):
+        """Whether any point is closer than r (default: the cell size) to pt."""
+        r = self.cell if r is None else r
+        x, y = pt[0], pt[1]
+        r2 = r * r
+        for px, py, _ in self._candidates(x, y, r):
+            if (px - x) ** 2 + (py - y) ** 2 < r2:
+                return True
+        return False
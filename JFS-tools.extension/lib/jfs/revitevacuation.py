@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""Revit reader of jfs.evacuation: the evacuation model of a whole document.
+
+Reads once, through the session snapshot, what the Evacuation Doors / Stairs
+tools read per run: the spaces adding occupancy (people from jfs.occupancy and
+boundary segments of their bottom face), the paths of travel, the doors and the
+stairs (IN / OUT levels and points from their runs and 'UPWARD EVACUATION').
+Levels are identified by their element id value.
+
+    model = revitevacuation.read_model(doc)
+    sim = model.what_if(people={space.Id.Value: 0})
+
+read_route_model only reads what jfs.travel.routes needs: the footprints of the
+spaces (their boundary segments, without solids or people), the start and end
+of the paths (lengths from path_lengths) and the exits.
+
+The lengths of the paths (path_lengths) are kept for the session and only
+measured again for the paths changed since, as recorded in the invalidation
+journal. Candidate paths (jfs.navigation) are created as paths of travel in a
+floor plan of their level with create_paths.
+"""
+
+from Autodesk.Revit.DB import (BuiltInCategory, BuiltInParameter, ElementId, FilteredElementCollector, Level,
+                               PathOfTravel, SpatialElementBoundaryOptions, UV, ViewPlan, ViewType, XYZ)
+
+from jfs import evacuation, journal, occupancy, session, snapshot
+from jfs.geometry import segment_xy
+
+
+SPACE_PARAMS = (BuiltInParameter.ROOM_AREA, occupancy.USE_PARAM, BuiltInParameter.ROOM_NUMBER_OF_PEOPLE_PARAM,
+                "ADDS OCCUPANCY")
+
+
+def _xy(pt):
+    return (pt.X, pt.Y)
+
+
+def _curve_segments(curve):
+    """Plan segments of a curve (arcs as three chords)."""
+    if "Line" in str(curve.GetType()):
+        return [segment_xy(curve.GetEndPoint(0), curve.GetEndPoint(1))]
+    pts = [curve.Evaluate(t, True) for t in (0, 0.33, 0.66, 1)]
+    return [segment_xy(p0, p1) for p0, p1 in zip(pts, pts[1:])]
+
+
+def space_edges(space):
+    """Boundary segments of the bottom face of a space (arcs as three chords)."""
+    solid = list(space.ClosedShell)[0]
+    for face in solid.Faces:
+        bb = face.GetBoundingBox()
+        normal = face.ComputeNormal(UV((bb.Min.U + bb.Max.U) / 2, (bb.Min.V + bb.Max.V) / 2))
+        if normal.Z != -1:
+            continue
+        segments = []
+        for edge in list(face.EdgeLoops)[0]:
+            segments.extend(_curve_segments(edge.AsCurve()))
+        return segments
+    return []
+
+
+def space_footprint(space):
+    """Segments of the outer boundary loop of a space, without its solid (arcs
+    as three chords)."""
+    loops = space.GetBoundarySegments(SpatialElementBoundaryOptions())
+    if not loops:
+        return []
+    return [seg for boundary in loops[0] for seg in _curve_segments(boundary.GetCurve())]
+
+
+def _adds_occupancy(rec):
+    """As in the tools: spaces without the parameter (or without a value) add occupancy."""
+    value = snapshot.value(rec, "ADDS OCCUPANCY")
+    return value is None or value == 1
+
+
+def read_spaces(doc, snap, densities):
+    recs = [rec for rec in snap.records(BuiltInCategory.OST_MEPSpaces, SPACE_PARAMS) if _adds_occupancy(rec)]
+    people = occupancy.level_occupancy(
+        [(rec.id,
+          snapshot.value(rec, BuiltInParameter.ROOM_AREA),
+          snapshot.value(rec, occupancy.USE_PARAM),
+          snapshot.value(rec, BuiltInParameter.ROOM_NUMBER_OF_PEOPLE_PARAM)) for rec in recs], densities)
+    spaces = []
+    for rec in recs:
+        space = doc.GetElement(ElementId(rec.id))
+        spaces.append(evacuation.Space(rec.id, rec.level_id, people[rec.id], space_edges(space)))
+    return spaces
+
+
+def read_paths(doc, snap, level_ids, curves=True):
+    """Paths of travel; their level is given by name ('level_ids': {name: id}).
+    Without 'curves' their segments are not read (lengths from path_lengths)."""
+    paths = []
+    for rec in snap.records(BuiltInCategory.OST_PathOfTravelLines,
+                            params=(BuiltInParameter.PATH_OF_TRAVEL_LEVEL_NAME,)):
+        path = doc.GetElement(ElementId(rec.id))
+        level = level_ids.get(snapshot.value(rec, BuiltInParameter.PATH_OF_TRAVEL_LEVEL_NAME))
+        segments = [segment_xy(c.GetEndPoint(0), c.GetEndPoint(1)) for c in path.GetCurves()] if curves else []
+        paths.append(evacuation.Path(rec.id, level, _xy(path.PathStart), _xy(path.PathEnd), segments))
+    return paths
+
+
+def path_lengths(doc, snap):
+    """{path id: length (ft)} of every path of travel: the sum of the lengths of
+    its curves, cached in the session state of the document."""
+    state = session.document_state(doc)
+    cache = state.setdefault("path_lengths", {})
+    seq, changed, deleted = journal.since(state["journal"], state.get("path_lengths_cursor", 0))
+    state["path_lengths_cursor"] = seq
+    if changed is None:
+        cache.clear()
+    else:
+        for element_id in changed | deleted:
+            cache.pop(element_id, None)
+
+    ids = [rec.id for rec in snap.records(BuiltInCategory.OST_PathOfTravelLines)]
+    for path_id in ids:
+        if path_id not in cache:
+            path = doc.GetElement(ElementId(path_id))
+            cache[path_id] = sum(curve.Length for curve in path.GetCurves())
+    return dict((path_id, cache[path_id]) for path_id in ids)
+
+
+def _people(elem):
+    param = elem.LookupParameter("NUMBER PEOPLE")
+    return param.AsInteger() if param and param.HasValue else 0
+
+
+def read_doors(snap):
+    locs = snap.locations(BuiltInCategory.OST_Doors)
+    return [evacuation.door(d.Id.Value, d.LevelId.Value, locs.centre(d.Id.Value),
+                            (d.FacingOrientation.X, d.FacingOrientation.Y), _people(d))
+            for d in snap.elements(BuiltInCategory.OST_Doors, bbox=True)]
+
+
+def read_stairs(doc, snap):
+    locs = snap.locations(BuiltInCategory.OST_Stairs)
+    stairs = []
+    for st in snap.elements(BuiltInCategory.OST_Stairs, bbox=True):
+        upward = st.LookupParameter("UPWARD EVACUATION")
+        upward = bool(upward and upward.HasValue and upward.AsInteger())
+        base = st.get_Parameter(BuiltInParameter.STAIRS_BASE_LEVEL_PARAM).AsElementId().Value
+        top = st.get_Parameter(BuiltInParameter.STAIRS_TOP_LEVEL_PARAM).AsElementId().Value
+
+        runs = sorted((doc.GetElement(run_id) for run_id in st.GetStairsRuns()), key=lambda r: r.BaseElevation)
+        if not runs:
+            continue
+        base_start = _xy(list(runs[0].GetStairsPath())[0].GetEndPoint(0))
+        top_end = _xy(list(runs[-1].GetStairsPath())[-1].GetEndPoint(1))
+        if upward:
+            stairs.append(evacuation.stair(st.Id.Value, base, base_start, locs.plan_box(st.Id.Value),
+                                           top, top_end, _people(st)))
+        else:
+            stairs.append(evacuation.stair(st.Id.Value, top, top_end, locs.plan_box(st.Id.Value),
+                                           base, base_start, _people(st)))
+    return stairs
+
+
+def _level_ids(doc):
+    return dict((lvl.Name, lvl.Id.Value) for lvl in FilteredElementCollector(doc).OfClass(Level))
+
+
+def read_model(doc, densities=None):
+    """EvacuationModel of the document (densities: see jfs.occupancy.load_densities)."""
+    snap = snapshot.ElementSnapshot(doc)
+    if densities is None:
+        densities = occupancy.load_densities(occupancy.default_table_path())
+    return evacuation.EvacuationModel(read_spaces(doc, snap, densities),
+                                      read_paths(doc, snap, _level_ids(doc)),
+                                      read_doors(snap) + read_stairs(doc, snap))
+
+
+def read_route_model(doc, snap):
+    """EvacuationModel for jfs.travel.routes: footprints of the spaces adding
+    occupancy (no people), paths without segments and the exits."""
+    spaces = [evacuation.Space(rec.id, rec.level_id, 0, space_footprint(doc.GetElement(ElementId(rec.id))))
+              for rec in snap.records(BuiltInCategory.OST_MEPSpaces, ("ADDS OCCUPANCY",)) if _adds_occupancy(rec)]
+    return evacuation.EvacuationModel(spaces, read_paths(doc, snap, _level_ids(doc), curves=False),
+                                      read_doors(snap) + read_stairs(doc, snap))
+
+
+def plan_views(doc):
+    """{level id: floor plan view of the level} (the first one, templates excluded)."""
+    views = {}
+    for view in FilteredElementCollector(doc).OfClass(ViewPlan):
+        if view.IsTemplate or view.ViewType != ViewType.FloorPlan or view.GenLevel is None:
+            continue
+        views.setdefault(view.GenLevel.Id.Value, view)
+    return views
+
+
+def create_paths(doc, paths, views):
+    """Path of travel from the start to the end of every candidate Path, in the
+    view of its level ('views': {level id: ViewPlan}); Revit routes it around
+    the obstacles of the view. Inside an open transaction. Returns the created
+    elements and the candidates that could not be created."""
+    created, failed = [], []
+    for path in paths:
+        view = views.get(path.level)
+        if view is None:
+            failed.append(path)
+            continue
+        z = view.GenLevel.Elevation
+        try:
+            created.append(PathOfTravel.Create(view, XYZ(path.start[0], path.start[1], z),
+                                               XYZ(path.end[0], path.end[1], z)))
+        except Exception:
+            failed.append(path)
+    return created, failed
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Revit model adapter of jfs.bulkedit: the types and type parameters of a document."""
+
+from Autodesk.Revit.DB import BuiltInParameter, ElementId, FilteredElementCollector
+
+from jfs import profiling, typedparams
+
+
+class RevitModel(object):
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.names = typedparams.NameIndex(doc)     # Name lookups for ElementId parameters
+
+    def type_id(self, typ):
+        return typ.Id.Value
+
+    def element(self, type_id):
+        profiling.count("GetElement")
+        return self.doc.GetElement(ElementId(type_id))
+
+    def element_by_unique_id(self, unique_id):
+        return self.doc.GetElement(unique_id)
+
+    def type_names(self):
+        """'Family and Type' of the placed instances first (as shown in schedules),
+        then 'Family: Type' of every type, placed or not."""
+        for fyt, type_id in typedparams.type_ids_by_fyt(self.doc).items():
+            yield fyt, type_id.Value
+        for t in FilteredElementCollector(self.doc).WhereElementIsElementType():
+            p_type = t.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME)
+            p_fam = t.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME)
+            name = p_type.AsString() if p_type else None
+            fam = p_fam.AsString() if p_fam else None
+            if name and fam:
+                yield "{}: {}".format(fam, name), t.Id.Value
+
+    def params(self, typ):
+        """Parameters keyed by Id code and by name (the Id code wins)."""
+        params = {}
+        for p in typ.Parameters:
+            params[str(p.Id.Value)] = p
+        for p in typ.Parameters:
+            params.setdefault(p.Definition.Name, p)
+        return params
+
+    def param_code(self, param):
+        return str(param.Id.Value)
+
+    def is_read_only(self, param):
+        return param.IsReadOnly
+
+    def column(self, param):
+        return typedparams.column_for(param, self.doc, self.names)
+
+    def current(self, param):
+        return typedparams.current_value(param)
+
+    def set(self, param, value):
+        profiling.count("Parameter.Set")
+        param.Set(value)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Schedule helpers for the Excel type-parameter tools."""
+
+from Autodesk.Revit.DB import (BuiltInCategory, BuiltInParameter, ElementId, FilteredElementCollector,
+                               SectionType, TableView)
+
+from jfs import importcode, typedparams
+from jfs.cellvalues import cell_text
+
+
+FYT_ID = ElementId(BuiltInParameter.ELEM_FAMILY_AND_TYPE_PARAM)
+
+SHEET_NAME_MAX = 31             # Excel limits for worksheet names
+SHEET_NAME_INVALID = "[]:*?/\\"
+
+
+class ScheduleInfo(object):
+    """A schedule with a visible 'Family and Type' field and the import codes
+    of its visible fields, from a single scan of its definition."""
+
+    def __init__(self, schedule, codes):
+        self.schedule = schedule
+        self.name = schedule.Name
+        self.codes = codes
+
+
+def scan_fields(definition):
+    """Returns the import codes of the visible fields of a schedule definition
+    and whether 'Family and Type' is one of them."""
+    codes = []
+    has_fyt = False
+    for i in range(definition.GetFieldCount()):
+        field = definition.GetField(i)
+        if field.IsHidden:
+            continue
+        try:                                # Not all fields have .GetSchedulableField() - e.g., calculated parameters
+            param_id = field.GetSchedulableField().ParameterId
+            codes.append(str(param_id.Value))
+            if param_id == FYT_ID:
+                has_fyt = True
+        except Exception:
+            codes.append(str(field.FieldType) + "-noedit")
+    return codes, has_fyt
+
+
+def schedule_stamp(vs):
+    """Version stamp of a schedule: changes whenever the schedule (its definition
+    included) is modified. None if the Revit version doesn't provide it."""
+    try:
+        return str(vs.VersionGuid)
+    except Exception:
+        return None
+
+
+def fyt_schedules(doc, catalog=None):
+    """All schedules with the 'Family and Type' field visible, sorted by name.
+    With a catalog (jfs.catalog.ScheduleCatalog), only the schedules that are new
+    or changed since the catalog was saved have their fields scanned."""
+    infos = []
+    ids = []
+    all_vs = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Schedules).WhereElementIsNotElementType()
+    for vs in all_vs:
+        ids.append(vs.Id.Value)
+        stamp = schedule_stamp(vs) if catalog else None
+        cached = catalog.get(vs.Id.Value, stamp) if catalog else None
+        if cached:
+            codes, has_fyt = cached
+        else:
+            try:
+                codes, has_fyt = scan_fields(vs.Definition)
+            except Exception:               # Schedule-like views without a field definition
+                codes, has_fyt = [], False
+            if catalog:
+                catalog.put(vs.Id.Value, stamp, codes, has_fyt)
+        if has_fyt:
+            infos.append(ScheduleInfo(vs, codes))
+
+    if catalog:
+        catalog.prune(ids)
+    infos.sort(key=lambda info: info.name)
+    return infos
+
+
+def body_rows(vs):
+    """Cell texts of the body section of a schedule, row by row."""
+    table = vs.GetTableData().GetSectionData(SectionType.Body)
+    rows = []
+    for row in range(table.NumberOfRows):
+        rows.append([TableView.GetCellText(vs, SectionType.Body, row, column)
+                     for column in range(table.NumberOfColumns)])
+    return rows
+
+
+def export_sheet(doc, info, sheet):
+    """Body rows of a schedule and its import code (importcode.Metadata) for the
+    worksheet 'sheet': field codes, storage types and the type id of every row."""
+    rows = body_rows(info.schedule)
+    fyt_col = info.codes.index(str(FYT_ID.Value))
+
+    by_fyt = typedparams.type_ids_by_fyt(doc, info.schedule.Id)
+    refs = {}
+    type_ids = {}
+    for row_idx, row in enumerate(rows[1:]):        # Row 0 is the header
+        fyt = cell_text(row[fyt_col]) if fyt_col < len(row) else ""
+        type_id = by_fyt.get(fyt)
+        if type_id:
+            refs[importcode.row_number(row_idx)] = (type_id.Value, fyt)
+            type_ids[type_id.Value] = type_id
+
+    storage = typedparams.storage_by_code((doc.GetElement(i) for i in type_ids.values()), info.codes)
+    return rows, importcode.Metadata(sheet, info.schedule.Id.Value, info.codes, storage, refs)
+
+
+def sheet_name(name, used):
+    """Valid and unique Excel worksheet name for a schedule. 'used' is the set of
+    names already taken (lowercase) and is updated."""
+    clean = "".join("_" if c in SHEET_NAME_INVALID else c for c in name).strip().strip("'") or "Schedule"
+    clean = clean[:SHEET_NAME_MAX]
+    candidate = clean
+    n = 2
+    while candidate.lower() in used:
+        suffix = " ({})".format(n)
+        candidate = clean[:SHEET_NAME_MAX - len(suffix)] + suffix
+        n += 1
+    used.add(candidate.lower())
+    return candidate
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Session store shared by the JFS tools and hooks.
+
+pyRevit runs every button click (and every hook) in a fresh script engine, so
+module globals don't survive between runs. Data that must live for the whole
+Revit session is kept in the AppDomain instead, as plain dicts / sets / lists
+(never instances of classes defined in a script, which belong to the engine that
+created them).
+
+Every document has its own state dict, created by the first tool that caches
+something for it. The doc-changed hook records the ids of the elements changed
+since in its invalidation journal, so every cache can refresh only those.
+"""
+
+from System import AppDomain
+
+from jfs import journal
+
+
+STORE_KEY = "JFS_TOOLS_SESSION"
+
+
+def _store():
+    store = AppDomain.CurrentDomain.GetData(STORE_KEY)
+    if store is None:
+        store = {}
+        AppDomain.CurrentDomain.SetData(STORE_KEY, store)
+    return store
+
+
+def doc_key(doc):
+    """Key of an open document. Includes the object hash, so a document closed and
+    opened again (possibly changed outside this session) starts with no state."""
+    return "{}|{}".format(doc.GetHashCode(), doc.PathName or doc.Title)
+
+
+def document_state(doc, create=True):
+    """State dict of a document, with the invalidation journal of the changes
+    since it was created ('journal', see jfs.journal) and whatever the caches
+    store. None if there is none and 'create' is False."""
+    store = _store()
+    key = doc_key(doc)
+    state = store.get(key)
+    if state is None and create:
+        state = store[key] = {"journal": journal.new_journal()}
+    return state
+
+
+def record_changes(doc, added, modified, deleted):
+    """Called by the doc-changed hook with the ElementIds of a DocumentChanged
+    event. Costs O(changed ids), and nothing for documents without state."""
+    state = document_state(doc, create=False)
+    if state is None:
+        return
+    changed = [element_id.Value for element_id in added]
+    changed += [element_id.Value for element_id in modified]
+    journal.record(state["journal"], changed, [element_id.Value for element_id in deleted])
+
+
+def forget(doc):
+    """Drops the state of a document (e.g. when it is closed)."""
+    _store().pop(doc_key(doc), None)
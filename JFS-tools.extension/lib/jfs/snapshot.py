@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""Per-document element snapshot shared by the JFS tools.
+
+Lightweight records of the model elements (ElementRecord: id, category, type id,
+level id, bounding box and the parameters a tool asked for), built lazily per
+category the first time a tool needs them and kept for the whole session in the
+session store (jfs.session). Elements changed since, as recorded by the
+doc-changed hook in the invalidation journal, are read again on the next query
+instead of walking the model:
+
+    snap = snapshot.ElementSnapshot(doc)
+    for rec in snap.records(BuiltInCategory.OST_Doors, params=("NUMBER PEOPLE",)):
+        if rec.level_id == level_id.Value and snapshot.value(rec, "NUMBER PEOPLE"): ...
+
+The bounding boxes are the model-space ones, so locations() gives the plan
+position of doors and stairs whatever the active view (see jfs.locations).
+
+Some parameters hold the name of a level (PATH_OF_TRAVEL_LEVEL_NAME): renaming
+a level only changes the Level element, so the records that read one of them
+are read again whenever a level changes.
+
+The session store only holds plain data, so records are kept as plain tuples
+and returned as ElementRecords (of the module of the running engine).
+"""
+
+from collections import namedtuple
+
+from Autodesk.Revit.DB import BuiltInParameter, ElementId, ElementType, FilteredElementCollector, Level, StorageType
+
+from jfs import journal, locations, profiling, session
+
+
+ALL = "*"               # Bucket of every non-type element, whatever its category
+
+ElementRecord = namedtuple("ElementRecord", "id category type_id level_id bbox params")
+BBOX, PARAMS = 4, 5         # Positions in a stored record
+
+# Parameters holding the name of a level (keys as in param_key)
+LEVEL_NAME_PARAMS = set([str(BuiltInParameter.PATH_OF_TRAVEL_LEVEL_NAME)])
+
+
+def _param_value(param):
+    """Plain value of a parameter (ElementIds as their integer value)."""
+    if param is None or not param.HasValue:
+        return None
+    storage = param.StorageType
+    if storage == StorageType.String:
+        return param.AsString()
+    if storage == StorageType.Double:
+        return param.AsDouble()
+    if storage == StorageType.Integer:
+        return param.AsInteger()
+    if storage == StorageType.ElementId:
+        return param.AsElementId().Value
+    return None
+
+
+def param_key(param):
+    """Key of a parameter in ElementRecord.params: its name, or the
+    BuiltInParameter name."""
+    return param if isinstance(param, str) else str(param)
+
+
+def read_param(elem, param):
+    """Value of a parameter given by name or by BuiltInParameter."""
+    if isinstance(param, str):
+        return _param_value(elem.LookupParameter(param))
+    return _param_value(elem.get_Parameter(param))
+
+
+def value(rec, param):
+    """Value of a parameter (name or BuiltInParameter) in a record."""
+    return rec.params.get(param_key(param))
+
+
+def _bbox(elem):
+    """View-independent bounding box as (min x, min y, min z, max x, max y, max z).
+    An instance without geometry gets the point of its transform; otherwise None."""
+    bb = elem.get_BoundingBox(None)
+    if bb is None:
+        transform = getattr(elem, "GetTransform", None)
+        if transform is None:
+            return None
+        origin = transform().Origin
+        return (origin.X, origin.Y, origin.Z, origin.X, origin.Y, origin.Z)
+    return (bb.Min.X, bb.Min.Y, bb.Min.Z, bb.Max.X, bb.Max.Y, bb.Max.Z)
+
+
+def _category_key(category):
+    return ALL if category is None else int(category)
+
+
+class ElementSnapshot(object):
+    """Element records of a document, cached for the session. Each category is a
+    bucket {"records": {id: record tuple}, "params": [params read], "bbox": bool}."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.state = session.document_state(doc)
+        self.buckets = self.state.setdefault("snapshot", {})
+
+    # RECORDS
+
+    def _record(self, elem, params, bbox):
+        """Stored record of an element: a plain tuple of the ElementRecord fields."""
+        category = elem.Category.Id.Value if elem.Category else None
+        return (elem.Id.Value, category, elem.GetTypeId().Value, elem.LevelId.Value,
+                _bbox(elem) if bbox else None,
+                dict((param_key(p), read_param(elem, p)) for p in params))
+
+    def _collect(self, key):
+        collector = FilteredElementCollector(self.doc)
+        if key != ALL:
+            collector = collector.OfCategoryId(ElementId(key))
+        return collector.WhereElementIsNotElementType()
+
+    def _belongs(self, key, elem):
+        """Whether an element goes in the bucket of 'key' (as _collect would find it)."""
+        if isinstance(elem, ElementType):
+            return False
+        return key == ALL or (elem.Category is not None and elem.Category.Id.Value == key)
+
+    def refresh(self):
+        """Applies the changes recorded in the invalidation journal since the last
+        refresh to every bucket (all of them are dropped if the journal overflowed)."""
+        seq, changed, deleted = journal.since(self.state["journal"], self.state.get("snapshot_cursor", 0))
+        self.state["snapshot_cursor"] = seq
+        if changed is None:
+            self.buckets.clear()
+            return
+        if not changed and not deleted:
+            return
+
+        for bucket in self.buckets.values():
+            for element_id in deleted:
+                bucket["records"].pop(element_id, None)
+
+        profiling.count("GetElement", len(changed))
+        level_changed = False
+        for element_id in changed:
+            elem = self.doc.GetElement(ElementId(element_id))
+            level_changed = level_changed or isinstance(elem, Level)
+            for key, bucket in self.buckets.items():
+                if elem is not None and elem.IsValidObject and self._belongs(key, elem):
+                    bucket["records"][element_id] = self._record(elem, bucket["params"], bucket["bbox"])
+                else:
+                    bucket["records"].pop(element_id, None)
+
+        # A renamed level only changes the Level: records holding level names are read again
+        if level_changed:
+            for bucket in self.buckets.values():
+                if not LEVEL_NAME_PARAMS.intersection(param_key(p) for p in bucket["params"]):
+                    continue
+                profiling.count("GetElement", len(bucket["records"]))
+                for element_id in list(bucket["records"]):
+                    if element_id in changed:
+                        continue
+                    elem = self.doc.GetElement(ElementId(element_id))
+                    bucket["records"][element_id] = self._record(elem, bucket["params"], bucket["bbox"])
+
+    def records(self, category=None, params=(), bbox=False):
+        """Records of the elements of a category (BuiltInCategory, or None for every
+        non-type element), with the given parameters (names or BuiltInParameters)
+        and, if 'bbox', their view-independent bounding boxes."""
+        self.refresh()
+        key = _category_key(category)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = {"records": {}, "params": list(params), "bbox": bbox}
+            for elem in self._collect(key):
+                bucket["records"][elem.Id.Value] = self._record(elem, bucket["params"], bbox)
+            self.buckets[key] = bucket
+            profiling.count("elements read", len(bucket["records"]))
+            return [ElementRecord._make(rec) for rec in bucket["records"].values()]
+
+        # Parameters or boxes not read yet when the bucket was built
+        known = set(param_key(p) for p in bucket["params"])
+        missing = [p for p in params if param_key(p) not in known]
+        if missing or (bbox and not bucket["bbox"]):
+            bucket["params"] += missing
+            bucket["bbox"] = bucket["bbox"] or bbox
+            for element_id, rec in list(bucket["records"].items()):
+                elem = self.doc.GetElement(ElementId(element_id))
+                values = dict(rec[PARAMS])
+                values.update((param_key(p), read_param(elem, p)) for p in missing)
+                box = _bbox(elem) if bucket["bbox"] and rec[BBOX] is None else rec[BBOX]
+                bucket["records"][element_id] = tuple(rec[:BBOX]) + (box, values)
+        return [ElementRecord._make(rec) for rec in bucket["records"].values()]
+
+    def elements(self, category, where=None, params=(), bbox=False):
+        """Elements of a category whose record passes 'where' (a function of the
+        ElementRecord): only those are fetched from the document."""
+        elements = [self.doc.GetElement(ElementId(rec.id)) for rec in self.records(category, params, bbox)
+                    if where is None or where(rec)]
+        profiling.count("GetElement", len(elements))
+        return elements
+
+    def locations(self, category):
+        """Plan boxes and centres of the elements of a category, from their
+        view-independent bounding boxes (jfs.locations.Locations)."""
+        return locations.Locations(dict((rec.id, rec.bbox) for rec in self.records(category, bbox=True)))
+
+    def type_counts(self):
+        """{type id: number of instances} of every non-type element of the model."""
+        counts = {}
+        for rec in self.records():
+            counts[rec.type_id] = counts.get(rec.type_id, 0) + 1
+        return counts
+
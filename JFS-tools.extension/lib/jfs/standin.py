@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Stand-in document for jfs.bulkedit (pure Python): types and parameters held in
+memory, with the same model interface as jfs.revitmodel.RevitModel. Used to try
+and measure the bulk edit engine outside Revit.
+"""
+
+from jfs import cellvalues
+
+
+class StandInParam(object):
+    """A type parameter: 'kind' is one of the cellvalues kinds, 'scale' converts
+    display units to internal units for doubles."""
+
+    def __init__(self, code, name, kind, value, read_only=False, scale=1.0):
+        self.code = str(code)
+        self.name = name
+        self.kind = kind
+        self.value = value
+        self.read_only = read_only
+        self.scale = scale
+
+
+class StandInType(object):
+
+    def __init__(self, type_id, unique_id, family, name, params):
+        self.type_id = type_id
+        self.unique_id = unique_id
+        self.family = family
+        self.name = name
+        self.params = list(params)
+
+
+class StandInModel(object):
+    """Model of jfs.bulkedit over StandInType objects. 'names' maps element names to
+    ids for ElementId parameters. 'set_calls' counts the values written."""
+
+    NONE_ID = -1
+
+    def __init__(self, types, names=None):
+        self.types = dict((t.type_id, t) for t in types)
+        self.by_unique_id = dict((t.unique_id, t) for t in types)
+        self.names = names or {}
+        self.set_calls = 0
+
+    def type_id(self, typ):
+        return typ.type_id
+
+    def element(self, type_id):
+        return self.types.get(type_id)
+
+    def element_by_unique_id(self, unique_id):
+        return self.by_unique_id.get(unique_id)
+
+    def type_names(self):
+        for t in self.types.values():
+            yield "{}: {}".format(t.family, t.name), t.type_id
+
+    def params(self, typ):
+        params = dict((p.code, p) for p in typ.params)
+        for p in typ.params:
+            params.setdefault(p.name, p)
+        return params
+
+    def param_code(self, param):
+        return param.code
+
+    def is_read_only(self, param):
+        return param.read_only
+
+    def column(self, param):
+        if param.kind == cellvalues.STRING:
+            return cellvalues.Column(cellvalues.STRING, cellvalues.to_text())
+        if param.kind == cellvalues.DOUBLE:
+            return cellvalues.Column(cellvalues.DOUBLE, cellvalues.to_double(param.scale), 1e-9)
+        if param.kind == cellvalues.INTEGER:
+            return cellvalues.Column(cellvalues.INTEGER, cellvalues.to_integer())
+        if param.kind == cellvalues.YESNO:
+            return cellvalues.Column(cellvalues.YESNO, cellvalues.to_yesno())
+        if param.kind == cellvalues.ELEMENTID:
+            return cellvalues.Column(cellvalues.ELEMENTID, cellvalues.to_elementid(self.names, self.NONE_ID))
+        return None
+
+    def current(self, param):
+        return param.value
+
+    def set(self, param, value):
+        param.value = value
+        self.set_calls += 1
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""Evacuation route lengths (pure Python).
+
+Every path of travel of the evacuation model (jfs.evacuation) is a route from
+an origin space (the space containing its start, or the one whose boundary is
+closest within the path tolerance: paths usually start at a room door) to a
+destination exit (the door or stair its end is at). Routes are measured, grouped
+by origin and by exit, and flagged when longer than the limit:
+
+    routes = travel.routes(model, lengths, limit_m=50.0)    # all levels, one pass
+    travel.longest_by_origin(routes)   ->  {(level, space id): Route}
+    [r for r in routes if r.over]
+
+'lengths' {path id: ft} are the lengths of the Revit curves of the paths (arcs
+included, see jfs.revitevacuation.path_lengths); without them the path
+segments are measured.
+"""
+
+import math
+from collections import namedtuple
+
+from jfs.evacuation import PATH_TOLERANCE
+from jfs.proximity import PointIndex
+
+
+FT_TO_M = 0.3048
+LIMIT_M = 50.0          # CTE DB-SI Section 3: route length from an origin of a floor with more than one exit
+
+# origin: space id or None; exit_id: exit id or None; length in metres
+Route = namedtuple("Route", "path_id level origin exit_id length over")
+
+
+def polyline_length(segments):
+    return sum(math.hypot(x1 - x0, y1 - y0) for x0, y0, x1, y1 in segments)
+
+
+def point_segment_distance(pt, seg):
+    px, py = pt
+    x0, y0, x1, y1 = seg
+    dx, dy = x1 - x0, y1 - y0
+    length2 = dx * dx + dy * dy
+    t = 0.0 if not length2 else max(0.0, min(1.0, ((px - x0) * dx + (py - y0) * dy) / length2))
+    return math.hypot(px - (x0 + t * dx), py - (y0 + t * dy))
+
+
+def contains(edges, pt):
+    """Whether pt is inside the boundary segments of a space (even-odd rule)."""
+    px, py = pt
+    inside = False
+    for x0, y0, x1, y1 in edges:
+        if (y0 > py) != (y1 > py):
+            if px < x0 + (py - y0) * (x1 - x0) / (y1 - y0):
+                inside = not inside
+    return inside
+
+
+class _SpaceGrid(object):
+    """Spaces of a level hashed by their bounding boxes (grown by the tolerance)."""
+
+    def __init__(self, spaces, cell):
+        self.cell = cell
+        self.cells = {}
+        for space in spaces:
+            xs = [c for seg in space.edges for c in (seg[0], seg[2])]
+            ys = [c for seg in space.edges for c in (seg[1], seg[3])]
+            if not xs:
+                continue
+            i0, j0 = self._key(min(xs) - PATH_TOLERANCE, min(ys) - PATH_TOLERANCE)
+            i1, j1 = self._key(max(xs) + PATH_TOLERANCE, max(ys) + PATH_TOLERANCE)
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    self.cells.setdefault((i, j), []).append(space)
+
+    def _key(self, x, y):
+        return int(math.floor(x / self.cell)), int(math.floor(y / self.cell))
+
+    def origin(self, pt):
+        """Space containing pt, else the one with the closest boundary within the tolerance."""
+        candidates = self.cells.get(self._key(pt[0], pt[1]), ())
+        for space in candidates:
+            if contains(space.edges, pt):
+                return space.id
+        best, best_d = None, PATH_TOLERANCE
+        for space in candidates:
+            d = min(point_segment_distance(pt, seg) for seg in space.edges)
+            if d < best_d:
+                best, best_d = space.id, d
+        return best
+
+
+def _cell_size(spaces):
+    """Median space side: a few spaces per cell."""
+    sides = sorted(max(max(s[0], s[2]) for s in sp.edges) - min(min(s[0], s[2]) for s in sp.edges)
+                   for sp in spaces if sp.edges)
+    return max(sides[len(sides) // 2], PATH_TOLERANCE) if sides else 10.0
+
+
+def routes(model, lengths=None, limit_m=LIMIT_M):
+    """Route of every path of the model, level by level."""
+    lengths = lengths or {}
+    result = []
+    for level, path_ids in model.level_paths.items():
+        level_spaces = [model.spaces[sid] for sid in model.level_spaces.get(level, ())]
+        grid = _SpaceGrid(level_spaces, _cell_size(level_spaces))
+        exits = PointIndex(PATH_TOLERANCE, [(model.exits[eid].point, eid)
+                                            for eid in model.level_exits.get(level, ())])
+        for pid in path_ids:
+            path = model.paths[pid]
+            length = lengths.get(pid)
+            if length is None:
+                length = polyline_length(path.segments)
+            length_m = length * FT_TO_M
+
+            near = exits.near(path.end)
+            exit_id = min(near, key=lambda eid: math.hypot(model.exits[eid].point[0] - path.end[0],
+                                                           model.exits[eid].point[1] - path.end[1])) if near else None
+            result.append(Route(pid, level, grid.origin(path.start), exit_id, length_m, length_m > limit_m))
+    return result
+
+
+def longest_by_origin(routes):
+    """{(level, origin space id): longest Route} (paths without origin space excluded)."""
+    longest = {}
+    for r in routes:
+        if r.origin is None:
+            continue
+        key = (r.level, r.origin)
+        if key not in longest or r.length > longest[key].length:
+            longest[key] = r
+    return longest
+
+
+def longest_by_exit(routes):
+    """{exit id: longest Route ending at it}."""
+    longest = {}
+    for r in routes:
+        if r.exit_id is None:
+            continue
+        if r.exit_id not in longest or r.length > longest[r.exit_id].length:
+            longest[r.exit_id] = r
+    return longest
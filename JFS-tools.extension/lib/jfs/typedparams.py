@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""Revit side of the typed import: builds one cellvalues.Column per parameter
+and reads parameter values by storage type."""
+
+from Autodesk.Revit.DB import (BuiltInParameter, ElementId, FilteredElementCollector, LabelUtils,
+                               Material, SpecTypeId, StorageType, UnitUtils)
+
+from jfs import cellvalues
+
+
+class NameIndex(object):
+    """Name -> ElementId lookups for ElementId parameters, built lazily once
+    per import and shared by all columns."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._materials = None
+        self._types = None
+
+    def materials(self):
+        if self._materials is None:
+            self._materials = {}
+            for m in FilteredElementCollector(self.doc).OfClass(Material):
+                self._materials.setdefault(m.Name, m.Id)
+        return self._materials
+
+    def types(self):
+        if self._types is None:
+            self._types = {}
+            for t in FilteredElementCollector(self.doc).WhereElementIsElementType():
+                p_type = t.get_Parameter(BuiltInParameter.ALL_MODEL_TYPE_NAME)
+                p_fam = t.get_Parameter(BuiltInParameter.ALL_MODEL_FAMILY_NAME)
+                name = p_type.AsString() if p_type else None
+                if not name:
+                    continue
+                fam = p_fam.AsString() if p_fam else None
+                if fam:
+                    self._types.setdefault("{}: {}".format(fam, name), t.Id)
+                self._types.setdefault(name, t.Id)
+        return self._types
+
+    def for_spec(self, spec):
+        if spec is not None and spec == SpecTypeId.Reference.Material:
+            return self.materials()
+        return self.types()
+
+
+def params_by_code(element):
+    """Parameters of an element keyed by their Id code (as exported)."""
+    return dict((str(p.Id.Value), p) for p in element.Parameters)
+
+
+def type_ids_by_fyt(doc, view_id=None):
+    """'Family and Type' value -> type id of the model instances (only those
+    visible in 'view_id', e.g. a schedule, if given)."""
+    collector = FilteredElementCollector(doc, view_id) if view_id else FilteredElementCollector(doc)
+    type_ids = {}
+    for e in collector.WhereElementIsNotElementType():
+        p = e.get_Parameter(BuiltInParameter.ELEM_FAMILY_AND_TYPE_PARAM)
+        if not p:
+            continue
+        fyt = p.AsValueString()
+        if fyt and fyt not in type_ids:
+            type_ids[fyt] = e.GetTypeId()
+    return type_ids
+
+
+def storage_by_code(types, codes):
+    """Storage type name of each code as a type parameter of any of 'types'
+    ("" if none of them has it)."""
+    storage = dict((code, "") for code in codes)
+    missing = set(codes)
+    for typ in types:
+        if not missing:
+            break
+        for code, p in params_by_code(typ).items():
+            if code in missing:
+                storage[code] = str(p.StorageType)
+                missing.discard(code)
+    return [storage[code] for code in codes]
+
+
+class TypeIndex(object):
+    """'Family and Type' value -> type, built once from the model instances and
+    shared by all imported sheets."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._type_ids = type_ids_by_fyt(doc)
+
+    def __len__(self):
+        return len(self._type_ids)
+
+    def get(self, fyt):
+        """Type element of a 'Family and Type' value, or None."""
+        type_id = self._type_ids.get(fyt)
+        return self.doc.GetElement(type_id) if type_id else None
+
+
+def _spec(param):
+    try:
+        return param.Definition.GetDataType()
+    except Exception:
+        return None
+
+
+def _symbols(options):
+    try:
+        symbol = options.GetSymbolTypeId()
+        if symbol.Empty():
+            return ()
+        return (LabelUtils.GetLabelForSymbol(symbol),)
+    except Exception:
+        return ()
+
+
+def column_for(param, doc, names):
+    """Builds the Column (converter + tolerance) of a parameter, or None if its
+    storage type can't be imported."""
+    storage = param.StorageType
+
+    if storage == StorageType.String:
+        return cellvalues.Column(cellvalues.STRING, cellvalues.to_text())
+
+    spec = _spec(param)
+
+    if storage == StorageType.Integer:
+        if spec is not None and spec == SpecTypeId.Boolean.YesNo:
+            return cellvalues.Column(cellvalues.YESNO, cellvalues.to_yesno())
+        return cellvalues.Column(cellvalues.INTEGER, cellvalues.to_integer())
+
+    if storage == StorageType.Double:
+        if spec is None or not UnitUtils.IsMeasurableSpec(spec):
+            return cellvalues.Column(cellvalues.DOUBLE, cellvalues.to_double(), 1e-9)
+
+        # Display units of the document -> internal units (affine: scale + offset)
+        options = doc.GetUnits().GetFormatOptions(spec)
+        unit = options.GetUnitTypeId()
+        offset = UnitUtils.ConvertToInternalUnits(0.0, unit)
+        scale = UnitUtils.ConvertToInternalUnits(1.0, unit) - offset
+        # Values shown rounded to the display accuracy are not a change
+        tolerance = abs(options.Accuracy * scale) / 2.0 + 1e-9
+        return cellvalues.Column(cellvalues.DOUBLE,
+                                 cellvalues.to_double(scale, offset, _symbols(options)), tolerance)
+
+    if storage == StorageType.ElementId:
+        return cellvalues.Column(cellvalues.ELEMENTID,
+                                 cellvalues.to_elementid(names.for_spec(spec), ElementId.InvalidElementId))
+
+    return None
+
+
+def current_value(param):
+    """Value of a parameter in the same form a Column converter returns it."""
+    storage = param.StorageType
+    if storage == StorageType.String:
+        return param.AsString() or ""
+    if storage == StorageType.Double:
+        return param.AsDouble()
+    if storage == StorageType.Integer:
+        return param.AsInteger()
+    if storage == StorageType.ElementId:
+        return param.AsElementId()
+    return None
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""Evacuation width rules (pure Python).
+
+A declarative table maps (code, element kind, protection, direction) to a
+formula of the minimum width in metres. Formulas are expressions of:
+
+    P   people evacuated through the element
+    H   evacuation height (m), for upward evacuation
+    S   area of the protected stair over all its floors (m2)
+
+and max / min. The table is compiled once into callables; sizing is then a
+lookup and a call per element, so a rule change only needs the stored
+'NUMBER PEOPLE' of the elements, not the path and space geometry:
+
+    rules = widths.WidthRules()
+    rule = rules.rule(widths.STAIR, protected=False, upward=True)
+    rule.width(P=100, H=4.5)  ->  1.0
+    rules.apply([(widths.DOOR, 350, False, False, {}), ...])   # batch
+
+More rules (other codes, special cases) can be given as rows of the same
+form, e.g. in a JSON file (see load_rows / default_rules_path); their rows
+take precedence. codes(rows) lists the codes a table can size with, for
+WidthRules(rows, code=...). The Compliance Report re-sizes every sized
+element of the building in one batch with the chosen code.
+"""
+
+import json
+from collections import namedtuple
+
+
+DOOR = "door"
+CORRIDOR = "corridor"
+STAIR = "stair"
+
+ANY = "*"
+PROTECTED = "protected"
+UNPROTECTED = "unprotected"
+UP = "up"
+DOWN = "down"
+
+DEFAULT_CODE = "CTE DB-SI"
+RULES_NAME = "jfs_width_rules"              # pyRevit universal data file (.json)
+NAMES = ("P", "H", "S", "max", "min")       # The only names a formula may use
+M_TO_FT = 3.28084                           # Widths (m) to Revit lengths (ft), as the sizing tools store them
+
+# code, kind, protection, direction, formula (m), description
+CTE_DB_SI = [
+    # Table 4.1 - Dimensioning of the evacuation elements
+    (DEFAULT_CODE, DOOR, ANY, ANY, "max(P / 200.0, 0.80)", "doors and passages"),
+    (DEFAULT_CODE, CORRIDOR, ANY, ANY, "max(P / 200.0, 1.00)", "corridors and ramps"),
+    (DEFAULT_CODE, STAIR, UNPROTECTED, DOWN, "max(P / 160.0, 1.00)", "unprotected downward stairs"),
+    (DEFAULT_CODE, STAIR, UNPROTECTED, UP, "max(P / (160.0 - 10.0 * H), 1.00)", "unprotected upward stairs"),
+    (DEFAULT_CODE, STAIR, PROTECTED, ANY, "max((P - 3.0 * S) / 160.0, 1.00)", "protected stairs"),
+]
+
+Rule = namedtuple("Rule", "code kind protection direction formula description width")
+
+
+def compile_formula(formula):
+    """Callable width(P=0, H=0, S=0) of a formula. ValueError if the formula is
+    not a valid expression of the allowed names."""
+    try:
+        code = compile(formula, "<width rule>", "eval")
+    except SyntaxError as e:
+        raise ValueError("Invalid width formula '{}': {}".format(formula, e))
+    unknown = [name for name in code.co_names if name not in NAMES]
+    if unknown:
+        raise ValueError("Invalid width formula '{}': unknown names {}".format(formula, ", ".join(unknown)))
+
+    def width(P=0, H=0.0, S=0.0):
+        return float(eval(code, {"__builtins__": {}, "max": max, "min": min}, {"P": P, "H": H, "S": S}))
+    return width
+
+
+def compile_rules(rows):
+    """{(code, kind, protection, direction): Rule} of table rows; the first row
+    of a key wins."""
+    rules = {}
+    for row in rows:
+        code, kind, protection, direction, formula = row[:5]
+        description = row[5] if len(row) > 5 else kind
+        key = (code, kind, protection, direction)
+        if key not in rules:
+            rules[key] = Rule(code, kind, protection, direction, formula, description,
+                              compile_formula(formula))
+    return rules
+
+
+def load_rows(path):
+    """Rule rows of a JSON file (a list of [code, kind, protection, direction,
+    formula, description]); [] if the file is missing or not valid."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (IOError, OSError, ValueError):
+        return []
+    return [row for row in data if isinstance(row, list) and len(row) >= 5] if isinstance(data, list) else []
+
+
+def codes(rows=()):
+    """Codes of a rule table: the default one first, then the others of 'rows' in order."""
+    result = [DEFAULT_CODE]
+    for row in rows:
+        if row[0] not in result:
+            result.append(row[0])
+    return result
+
+
+def default_rules_path():
+    """Rule file shared by every document, in the pyRevit data folder."""
+    from pyrevit import script
+    return script.get_universal_data_file(RULES_NAME, "json")
+
+
+class WidthRules(object):
+    """Compiled rule table: 'rows' (e.g. from load_rows) before the CTE DB-SI ones."""
+
+    def __init__(self, rows=(), code=DEFAULT_CODE):
+        self.code = code
+        self.rules = compile_rules(list(rows) + CTE_DB_SI)
+        self._lookup = {}
+
+    def rule(self, kind, protected=False, upward=False):
+        """Rule of an element: the most specific one of the code (exact
+        protection / direction before ANY). KeyError if there is none."""
+        key = (kind, bool(protected), bool(upward))
+        found = self._lookup.get(key)
+        if found is None:
+            protection = PROTECTED if protected else UNPROTECTED
+            direction = UP if upward else DOWN
+            for p in (protection, ANY):
+                for d in (direction, ANY):
+                    found = self.rules.get((self.code, kind, p, d))
+                    if found is not None:
+                        break
+                if found is not None:
+                    break
+            if found is None:
+                raise KeyError("No {} width rule for {} ({}, {})".format(self.code, kind, protection, direction))
+            self._lookup[key] = found
+        return found
+
+    def apply(self, items):
+        """Minimum widths (m) of (kind, people, protected, upward, {H, S}) items.
+        KeyError if the code has no rule for one of them."""
+        return [self.rule(kind, protected, upward).width(P=people, **values)
+                for kind, people, protected, upward, values in items]
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Small worker thread pool for the pure-data stages of the tools (pure Python).
+
+Only code that doesn't touch the Revit API may run here: the API can only be
+used from Revit's main thread. IronPython threads run truly in parallel (there is
+no GIL), so parsing and converting large workbooks scales with the cores.
+"""
+
+import sys
+import threading
+
+try:
+    from queue import Empty, Queue
+except ImportError:                 # IronPython 2.7
+    from Queue import Empty, Queue
+
+
+def cpu_count():
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except (ImportError, NotImplementedError):
+        return 2
+
+
+MAX_WORKERS = 4
+
+
+def default_workers():
+    return max(1, min(MAX_WORKERS, cpu_count()))
+
+
+def parallel_map(func, items, workers=None):
+    """[func(item) for item in items] computed on worker threads, in input order.
+    The first exception raised by a task is raised again in the calling thread
+    (the remaining tasks are not started)."""
+    items = list(items)
+    workers = default_workers() if workers is None else workers
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    tasks = Queue()
+    for idx, item in enumerate(items):
+        tasks.put((idx, item))
+    results = [None] * len(items)
+    failures = []
+
+    def work():
+        while not failures:
+            try:
+                idx, item = tasks.get_nowait()
+            except Empty:
+                return
+            try:
+                results[idx] = func(item)
+            except Exception:
+                failures.append(sys.exc_info()[1])
+
+    threads = [threading.Thread(target=work) for _ in range(min(workers, len(items)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if failures:
+        raise failures[0]
+    return results
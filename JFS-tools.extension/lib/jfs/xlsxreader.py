@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""Streaming reader for .xlsx workbooks (pure Python: zipfile + iterparse).
+
+Rows are parsed one at a time from the worksheet XML and discarded once yielded,
+so a sheet is never held in memory as a whole. Cell values follow xlrd: numbers
+as float, text as string, booleans as int and empty cells as "".
+"""
+
+import posixpath
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+WORKBOOK = "xl/workbook.xml"
+WORKBOOK_RELS = "xl/_rels/workbook.xml.rels"
+
+
+class XlsxError(Exception):
+    """Raised when a file is not a readable .xlsx workbook."""
+    pass
+
+
+def col_index(ref):
+    """0-based column of a cell reference ('C7' -> 2)."""
+    idx = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        idx = idx * 26 + (ord(ch.upper()) - 64)
+    return idx - 1
+
+
+def _row_number(ref):
+    digits = "".join(ch for ch in ref if ch.isdigit())
+    return int(digits) if digits else None
+
+
+def _text(elem):
+    """Text of a string item (<si> or <is>): plain <t> or rich text runs, without phonetic runs."""
+    parts = []
+    for child in elem:
+        if child.tag == MAIN_NS + "t":
+            parts.append(child.text or "")
+        elif child.tag == MAIN_NS + "r":
+            for t in child.iter(MAIN_NS + "t"):
+                parts.append(t.text or "")
+    return "".join(parts)
+
+
+class XlsxReader(object):
+    """Worksheets of a workbook, read on demand. Use as a context manager."""
+
+    def __init__(self, path, shared_strings=None):
+        """'shared_strings' (from another reader of the same workbook, see
+        shared_strings()) saves parsing them again, e.g. on each worker thread."""
+        try:
+            self._zip = zipfile.ZipFile(path)
+            self.sheets = self._read_sheets()       # [(name, state, part path)]
+        except (zipfile.BadZipfile, KeyError) as ex:
+            raise XlsxError("Not a valid .xlsx file: {}".format(ex))
+        self._strings = shared_strings
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._zip.close()
+
+    # WORKBOOK STRUCTURE
+
+    def _rels(self):
+        targets = {}
+        with self._zip.open(WORKBOOK_RELS) as f:
+            for _, elem in iterparse(f):
+                if elem.tag == PKG_REL_NS + "Relationship":
+                    target = elem.get("Target")
+                    if target.startswith("/"):
+                        part = target[1:]
+                    else:
+                        part = posixpath.normpath(posixpath.join("xl", target))
+                    targets[elem.get("Id")] = (elem.get("Type", ""), part)
+        return targets
+
+    def _read_sheets(self):
+        rels = self._rels()
+        self._strings_part = next((part for typ, part in rels.values() if typ.endswith("/sharedStrings")), None)
+        sheets = []
+        with self._zip.open(WORKBOOK) as f:
+            for _, elem in iterparse(f):
+                if elem.tag == MAIN_NS + "sheet":
+                    _, part = rels[elem.get(REL_NS + "id")]
+                    sheets.append((elem.get("name"), elem.get("state", "visible"), part))
+        return sheets
+
+    def sheet_names(self, hidden=False):
+        """Names of the worksheets, in workbook order ('hidden' includes hidden ones)."""
+        return [name for name, state, _ in self.sheets if hidden or state == "visible"]
+
+    def shared_strings(self):
+        if self._strings is None:
+            self._strings = []
+            if self._strings_part and self._strings_part in self._zip.namelist():
+                with self._zip.open(self._strings_part) as f:
+                    for _, elem in iterparse(f):
+                        if elem.tag == MAIN_NS + "si":
+                            self._strings.append(_text(elem))
+                            elem.clear()
+        return self._strings
+
+    # ROWS
+
+    def _value(self, cell, strings):
+        typ = cell.get("t", "n")
+        if typ == "inlineStr":
+            inline = cell.find(MAIN_NS + "is")
+            return _text(inline) if inline is not None else ""
+        v = cell.find(MAIN_NS + "v")
+        if v is None or v.text is None:
+            return ""
+        if typ == "s":
+            return strings[int(v.text)]
+        if typ == "b":
+            return int(v.text)
+        if typ in ("str", "e"):
+            return v.text
+        try:
+            return float(v.text)
+        except ValueError:
+            return v.text
+
+    def iter_rows(self, name):
+        """Yields the rows of a worksheet as lists of values, from the first row.
+        Rows missing in the file (empty) are yielded as []."""
+        part = next((p for n, _, p in self.sheets if n == name), None)
+        if part is None:
+            raise XlsxError("No worksheet named '{}'".format(name))
+        strings = self.shared_strings()
+
+        next_row = 1
+        sheet_data = None
+        with self._zip.open(part) as f:
+            for event, elem in iterparse(f, events=("start", "end")):
+                if event == "start":
+                    if elem.tag == MAIN_NS + "sheetData":
+                        sheet_data = elem
+                    continue
+                if elem.tag != MAIN_NS + "row":
+                    continue
+
+                number = _row_number(elem.get("r", "")) or next_row
+                while next_row < number:            # Empty rows are not stored
+                    yield []
+                    next_row += 1
+
+                values = []
+                for pos, cell in enumerate(elem.iter(MAIN_NS + "c")):
+                    ref = cell.get("r")
+                    col = col_index(ref) if ref else pos
+                    if col >= len(values):
+                        values.extend([""] * (col + 1 - len(values)))
+                    values[col] = self._value(cell, strings)
+
+                yield values
+                next_row = number + 1
+
+                # Release the parsed rows
+                if sheet_data is not None:
+                    sheet_data.clear()
+                else:
+                    elem.clear()
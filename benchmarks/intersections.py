@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Path / space intersection benchmark of the evacuation tools (outside Revit).
+
+Builds a floor of N x N rectangular spaces and evacuation paths made of
+segments, some of them drawn exactly along the space boundaries (the
+degenerate case of a path running along a wall), and finds the spaces crossed
+by a path:
+
+    float   the former per-pair test (strict float comparisons)
+    exact   jfs.geometry.any_intersection (robust predicate, batched per space)
+
+Reports the time of each and the spaces each finds; the float test misses the
+spaces only touched by a path, the exact one never does.
+
+Usage:
+    python benchmarks/intersections.py --grid 30 --paths 40 --repeat 3 --out intersections.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections import OrderedDict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "JFS-tools.extension", "lib"))
+
+from jfs import geometry        # noqa: E402
+
+
+clock = getattr(time, "perf_counter", time.time)
+
+ROOM = 4.1                      # Space side (ft): not a power of two, so coordinates round
+
+
+# SYNTHETIC FLOOR
+
+def build_floor(grid, n_paths, seed):
+    """Boundary segments of every space and the path segments (x0, y0, x1, y1)."""
+    rnd = random.Random(seed)
+    spaces = []
+    for i in range(grid):
+        for j in range(grid):
+            x0, y0, x1, y1 = i * ROOM, j * ROOM, (i + 1) * ROOM, (j + 1) * ROOM
+            spaces.append([(x0, y0, x1, y0), (x1, y0, x1, y1), (x1, y1, x0, y1), (x0, y1, x0, y0)])
+
+    size = grid * ROOM
+    paths = []
+    for k in range(n_paths):
+        if k % 2:
+            # Along a wall: starts at a grid node and runs over the boundary lines
+            i, j = rnd.randrange(grid), rnd.randrange(grid)
+            x, y = i * ROOM, j * ROOM
+            for _ in range(3):
+                nx, ny = (x + ROOM, y) if rnd.random() < 0.5 else (x, y + ROOM)
+                paths.append((x, y, nx, ny))
+                x, y = nx, ny
+        else:
+            # Free polyline through the floor
+            x, y = rnd.uniform(0, size), rnd.uniform(0, size)
+            for _ in range(3):
+                nx, ny = x + rnd.uniform(-2, 2) * ROOM, y + rnd.uniform(-2, 2) * ROOM
+                paths.append((x, y, nx, ny))
+                x, y = nx, ny
+    return spaces, paths
+
+
+# FORMER TEST
+
+def _ccw(ax, ay, bx, by, cx, cy):
+    return (cy - ay) * (bx - ax) > (by - ay) * (cx - ax)
+
+
+def _intersect_float(s, t):
+    ax, ay, bx, by = s
+    cx, cy, dx, dy = t
+    return (_ccw(ax, ay, cx, cy, dx, dy) != _ccw(bx, by, cx, cy, dx, dy) and
+            _ccw(ax, ay, bx, by, cx, cy) != _ccw(ax, ay, bx, by, dx, dy))
+
+
+def crossed_float(spaces, paths):
+    found = []
+    for idx, edges in enumerate(spaces):
+        if any(_intersect_float(e, p) for e in edges for p in paths):
+            found.append(idx)
+    return found
+
+
+def crossed_exact(spaces, paths):
+    return [idx for idx, edges in enumerate(spaces) if geometry.any_intersection(edges, paths)]
+
+
+def best_time(func, args, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        start = clock()
+        result = func(*args)
+        times.append(clock() - start)
+    return min(times), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--grid", type=int, default=30, help="spaces per side (grid x grid spaces)")
+    parser.add_argument("--paths", type=int, default=40, help="number of paths (3 segments each)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=None, help="JSON results file (default: stdout only)")
+    args = parser.parse_args(argv)
+
+    spaces, paths = build_floor(args.grid, args.paths, args.seed)
+    float_time, float_found = best_time(crossed_float, (spaces, paths), args.repeat)
+    exact_time, exact_found = best_time(crossed_exact, (spaces, paths), args.repeat)
+
+    results = OrderedDict([
+        ("benchmark", "intersections"),
+        ("python", "{} {}".format(platform.python_implementation(), platform.python_version())),
+        ("spaces", len(spaces)),
+        ("path_segments", len(paths)),
+        ("float", OrderedDict([("seconds", float_time), ("spaces_found", len(float_found))])),
+        ("exact", OrderedDict([("seconds", exact_time), ("spaces_found", len(exact_found))])),
+        ("missed_by_float", len(set(exact_found) - set(float_found))),
+        ("ok", set(float_found) <= set(exact_found)),
+    ])
+
+    print("float  {:8.3f} s   {} spaces".format(float_time, len(float_found)))
+    print("exact  {:8.3f} s   {} spaces".format(exact_time, len(exact_found)))
+    print("spaces only touched by a path, missed by the float test: {}".format(results["missed_by_float"]))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if results["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
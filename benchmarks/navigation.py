@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Path of travel generation benchmark (outside Revit).
+
+Builds a synthetic building without paths of travel (jfs.evacuation stand-in
+data): per level, two rows of rooms on both sides of a corridor, walls of
+WALL ft between spaces (as MEP space boundaries leave them), a door per room
+into the corridor and an exit door at each end of the corridor. Times the
+navigation grid of every level, the multi-source Dijkstra from the exits and
+the candidate paths of jfs.navigation, and checks that:
+
+    - every room gets a path, ending at one of the exits of its level;
+    - no path goes through a wall (every segment is visible on the grid);
+    - sized with the candidate paths (EvacuationModel.what_if), the exits of
+      every level evacuate all its people.
+
+Usage:
+    python benchmarks/navigation.py --levels 4 --rooms 20 --cell 1.0 --repeat 3 --out navigation.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from collections import OrderedDict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "JFS-tools.extension", "lib"))
+
+from jfs import evacuation, navigation          # noqa: E402
+
+from intersections import best_time             # noqa: E402
+
+
+ROOM = 15.0                     # Room side (ft)
+CORRIDOR = 6.0                  # Corridor width (ft)
+WALL = 0.5                      # Wall thickness (ft)
+
+
+def box_edges(x0, y0, x1, y1):
+    return [(x0, y0, x1, y0), (x1, y0, x1, y1), (x1, y1, x0, y1), (x0, y1, x0, y0)]
+
+
+def build_building(levels, rooms):
+    """Spaces and exits of the synthetic building ('rooms' per side of the corridor)."""
+    spaces, exits = [], []
+    ids = iter(range(1, 10 ** 9))
+    step = ROOM + WALL
+    length = rooms * step - WALL
+    for level in range(levels):
+        # Corridor between y = 0 and CORRIDOR; exits at both ends, in the end walls
+        spaces.append(evacuation.Space(next(ids), level, 0, box_edges(0.0, 0.0, length, CORRIDOR)))
+        exits.append(evacuation.door(next(ids), level, (-WALL / 2, CORRIDOR / 2), (1.0, 0.0)))
+        exits.append(evacuation.door(next(ids), level, (length + WALL / 2, CORRIDOR / 2), (1.0, 0.0)))
+        for i in range(rooms):
+            x0 = i * step
+            for side in (-1, 1):
+                if side > 0:
+                    y0, y1, wall_y = CORRIDOR + WALL, CORRIDOR + WALL + ROOM, CORRIDOR + WALL / 2
+                else:
+                    y0, y1, wall_y = -WALL - ROOM, -WALL, -WALL / 2
+                spaces.append(evacuation.Space(next(ids), level, 3 + (i % 5), box_edges(x0, y0, x0 + ROOM, y1)))
+                exits.append(evacuation.door(next(ids), level, (x0 + ROOM / 2, wall_y), (0.0, 1.0)))
+    return spaces, exits
+
+
+def generate(model, cell):
+    return navigation.candidate_paths(model, cell)
+
+
+def check(model, plan, cell):
+    """Number of failed checks (see the module docstring)."""
+    paths = plan.paths
+    failures = len(plan.unreachable)
+    rooms = [s for s in model.spaces.values() if s.people]
+    failures += abs(len(paths) - len(rooms))
+
+    grids = {}
+    for level, sids in model.level_spaces.items():
+        grids[level] = navigation.NavigationGrid([model.spaces[sid] for sid in sids],
+                                                 [model.exits[eid] for eid in model.level_doors.get(level, ())],
+                                                 cell)
+    floor_exits = dict((level, set(e.id for e in navigation.floor_exits(model, level, grid)))
+                       for level, grid in grids.items())
+    for p in paths:
+        grid = grids[p.level]
+        if plan.exits[p.id] not in floor_exits[p.level] or p.end != model.exits[plan.exits[p.id]].point:
+            failures += 1
+        if not all(grid.visible(seg[:2], seg[2:]) for seg in p.segments):
+            failures += 1
+
+    loads = model.what_if(extra_paths=paths).model.loads()
+    for level, exit_ids in floor_exits.items():
+        people = sum(model.spaces[sid].people for sid in model.level_spaces[level])
+        if sum(loads[eid] for eid in exit_ids) != people:
+            failures += 1
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, default=4)
+    parser.add_argument("--rooms", type=int, default=20, help="rooms per side of the corridor")
+    parser.add_argument("--cell", type=float, default=navigation.CELL, help="grid cell side (ft)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=None, help="JSON results file (default: stdout only)")
+    args = parser.parse_args(argv)
+
+    spaces, exits = build_building(args.levels, args.rooms)
+    model = evacuation.EvacuationModel(spaces, [], exits)
+    seconds, plan = best_time(generate, (model, args.cell), args.repeat)
+    failures = check(model, plan, args.cell)
+
+    results = OrderedDict([
+        ("benchmark", "navigation"),
+        ("python", "{} {}".format(platform.python_implementation(), platform.python_version())),
+        ("spaces", len(spaces)),
+        ("exits", len(exits)),
+        ("cell_ft", args.cell),
+        ("seconds", seconds),
+        ("paths", len(plan.paths)),
+        ("unreachable", len(plan.unreachable)),
+        ("failures", failures),
+        ("ok", not failures),
+    ])
+    print("paths   {:8.3f} s   {} paths for {} spaces, {} unreachable, {}".format(
+        seconds, len(plan.paths), len(spaces), len(plan.unreachable), "checked" if not failures else
+        "{} FAILURES".format(failures)))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Whole-floor path / space overlay benchmark (outside Revit).
+
+On the synthetic floor of intersections.py (N x N spaces, paths partly drawn
+along the walls), computes the complete path -> spaces incidence:
+
+    pairs   every path against every space (jfs.geometry.any_intersection)
+    sweep   jfs.overlay.path_space_incidence (one plane sweep over all segments)
+
+and checks that both give exactly the same incidence.
+
+Usage:
+    python benchmarks/overlay.py --grid 40 --paths 200 --repeat 3 --out overlay.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from collections import OrderedDict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "JFS-tools.extension", "lib"))
+
+from jfs import geometry, overlay                       # noqa: E402
+
+from intersections import best_time, build_floor       # noqa: E402
+
+
+SEGMENTS_PER_PATH = 3           # As built by intersections.build_floor
+
+
+def incidence_pairs(paths, spaces):
+    return [set(idx for idx, edges in enumerate(spaces) if geometry.any_intersection(edges, path))
+            for path in paths]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--grid", type=int, default=40, help="spaces per side (grid x grid spaces)")
+    parser.add_argument("--paths", type=int, default=200, help="number of paths (3 segments each)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=None, help="JSON results file (default: stdout only)")
+    args = parser.parse_args(argv)
+
+    spaces, segments = build_floor(args.grid, args.paths, args.seed)
+    paths = [segments[i:i + SEGMENTS_PER_PATH] for i in range(0, len(segments), SEGMENTS_PER_PATH)]
+
+    pairs_time, pairs = best_time(incidence_pairs, (paths, spaces), args.repeat)
+    sweep_time, sweep = best_time(overlay.path_space_incidence, (paths, spaces), args.repeat)
+
+    results = OrderedDict([
+        ("benchmark", "overlay"),
+        ("python", "{} {}".format(platform.python_implementation(), platform.python_version())),
+        ("spaces", len(spaces)),
+        ("boundary_segments", sum(len(edges) for edges in spaces)),
+        ("paths", len(paths)),
+        ("path_segments", len(segments)),
+        ("incidences", sum(len(found) for found in sweep)),
+        ("pairs_seconds", pairs_time),
+        ("sweep_seconds", sweep_time),
+        ("ok", pairs == sweep),
+    ])
+
+    print("pairs  {:8.3f} s".format(pairs_time))
+    print("sweep  {:8.3f} s".format(sweep_time))
+    print("{} path -> space incidences, {}".format(results["incidences"], "identical" if results["ok"] else "DIFFERENT"))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if results["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
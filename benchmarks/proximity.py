@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Endpoint proximity join benchmark of the evacuation tools (outside Revit).
+
+Scatters thousands of path starts over a floor, with doors and stair
+discharge points (some exactly at the tolerance from a path start), and finds
+the doors / stairs with a path starting less than 3 ft away:
+
+    loops   the former nested loops (distance_2d for every pair)
+    index   jfs.proximity.PointIndex (hashed grid of the path starts)
+
+and checks that both find exactly the same doors / stairs.
+
+Usage:
+    python benchmarks/proximity.py --paths 5000 --doors 2000 --repeat 3 --out proximity.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+from collections import OrderedDict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "JFS-tools.extension", "lib"))
+
+from jfs import proximity                               # noqa: E402
+from jfs.geometry import distance_2d                    # noqa: E402
+
+from intersections import best_time                     # noqa: E402
+
+
+TOLERANCE = 3.0                 # ft, as in the scripts
+SPACING = 8.0                   # ft per path start: the floor side grows with sqrt(paths)
+
+
+def build_level(n_paths, n_points, seed):
+    """Path starts and door / stair points (x, y); a third of the points are
+    placed at or around the tolerance from a path start."""
+    rnd = random.Random(seed)
+    side = SPACING * n_paths ** 0.5
+    starts = [(rnd.uniform(0, side), rnd.uniform(0, side)) for _ in range(n_paths)]
+    points = []
+    for k in range(n_points):
+        if k % 3 == 0:
+            x, y = rnd.choice(starts)
+            d = rnd.choice((TOLERANCE, TOLERANCE * 0.99, TOLERANCE * 1.01))
+            points.append((x + d, y) if k % 2 else (x, y - d))
+        else:
+            points.append((rnd.uniform(0, side), rnd.uniform(0, side)))
+    return starts, points
+
+
+def join_loops(starts, points):
+    found = []
+    for idx, pt in enumerate(points):
+        for start in starts:
+            if distance_2d(pt, start) < TOLERANCE:
+                found.append(idx)
+                break
+    return found
+
+
+def join_index(starts, points):
+    index = proximity.PointIndex(TOLERANCE, [(start, None) for start in starts])
+    return [idx for idx, pt in enumerate(points) if index.any_near(pt)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=int, default=5000, help="path starts on the level")
+    parser.add_argument("--doors", type=int, default=2000, help="door / stair points to match")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=None, help="JSON results file (default: stdout only)")
+    args = parser.parse_args(argv)
+
+    starts, points = build_level(args.paths, args.doors, args.seed)
+    loops_time, loops = best_time(join_loops, (starts, points), args.repeat)
+    index_time, index = best_time(join_index, (starts, points), args.repeat)
+
+    results = OrderedDict([
+        ("benchmark", "proximity"),
+        ("python", "{} {}".format(platform.python_implementation(), platform.python_version())),
+        ("path_starts", len(starts)),
+        ("points", len(points)),
+        ("matched", len(index)),
+        ("loops_seconds", loops_time),
+        ("index_seconds", index_time),
+        ("ok", loops == index),
+    ])
+
+    print("loops  {:8.3f} s".format(loops_time))
+    print("index  {:8.3f} s".format(index_time))
+    print("{} of {} points matched, {}".format(len(index), len(points), "identical" if results["ok"] else "DIFFERENT"))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if results["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
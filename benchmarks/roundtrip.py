@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""Round-trip benchmark of the Excel type-parameter pipeline (outside Revit).
+
+Builds a stand-in model (jfs.standin) of N types x M fields, exports it the way
+'Export schedule' does and imports an edited copy the way 'Import text data'
+does, timing every stage separately:
+
+    export: schedule read, import code, xlsx write, csv write
+    import: xlsx read, csv read, element matching (snapshot), plan (convert + diff), set
+
+It also checks the round-trip fidelity: an unedited export must plan no change,
+an edited one must set exactly the edited cells to the expected values, a
+type given in two rows must end with the value of the last one, and an import
+resumed from a checkpoint must only plan the rows left and end as a full one
+(its checkpoint rejected by a model that doesn't hold its rows).
+
+Usage:
+    python benchmarks/roundtrip.py --types 5000 --fields 10 --repeat 3 --out roundtrip.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "JFS-tools.extension", "lib"))
+
+from jfs import bulkedit, cellvalues, checkpoint, delimited, importcode, importplan, standin     # noqa: E402
+
+import xlsxbuilder                                                                   # noqa: E402
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+
+clock = getattr(time, "perf_counter", time.time)
+
+FYT_CODE = "-1"                 # Stand-in Id code of 'Family and Type'
+SHEET = "Types"
+KINDS = (cellvalues.DOUBLE, cellvalues.INTEGER, cellvalues.STRING, cellvalues.YESNO)
+STORAGE = {cellvalues.DOUBLE: "Double", cellvalues.INTEGER: "Integer",
+           cellvalues.STRING: "String", cellvalues.YESNO: "Integer"}
+MM = 1 / 304.8                  # Display unit (mm) -> internal unit (ft)
+
+
+# SYNTHETIC MODEL AND SCHEDULE
+
+def build_model(n_types, n_fields):
+    types = []
+    for i in range(n_types):
+        params = []
+        for f in range(n_fields):
+            kind = KINDS[f % len(KINDS)]
+            if kind == cellvalues.DOUBLE:
+                value = ((i + f) % 1000 + 1) * MM
+            elif kind == cellvalues.INTEGER:
+                value = (i + f) % 50
+            elif kind == cellvalues.STRING:
+                value = "T{}-{}".format(i, f)
+            else:
+                value = (i + f) % 2
+            params.append(standin.StandInParam(100 + f, "Field {}".format(f), kind, value,
+                                               scale=MM if kind == cellvalues.DOUBLE else 1.0))
+        types.append(standin.StandInType(1000 + i, "uid-{}".format(i), "Family {}".format(i % 20),
+                                         "Type {}".format(i), params))
+    return standin.StandInModel(types)
+
+
+def display(param):
+    """Cell text of a parameter, as a schedule shows it."""
+    if param.kind == cellvalues.DOUBLE:
+        return str(int(round(param.value / param.scale)))
+    return str(param.value)
+
+
+def schedule_rows(model, n_fields):
+    """Header and body rows of a schedule of every type (one row per type)."""
+    rows = [["Family and Type"] + ["Field {}".format(f) for f in range(n_fields)]]
+    for t in model.types.values():
+        rows.append(["{}: {}".format(t.family, t.name)] + [display(p) for p in t.params])
+    return rows
+
+
+def export_meta(model, rows, n_fields):
+    codes = [FYT_CODE] + [str(100 + f) for f in range(n_fields)]
+    storage = [""] + [STORAGE[KINDS[f % len(KINDS)]] for f in range(n_fields)]
+    fyt_ids = dict(("{}: {}".format(t.family, t.name), t.type_id) for t in model.types.values())
+    refs = {}
+    for row_idx, row in enumerate(rows[1:]):
+        refs[importcode.row_number(row_idx)] = (fyt_ids[row[0]], row[0])
+    meta = importcode.Metadata(SHEET, 1, codes, storage, refs)
+    return meta, importcode.encode([meta])
+
+
+def edit_rows(rows, every):
+    """Adds 1 mm to the first field (a Double) of every 'every'-th row. Returns
+    the edited rows and {(type row idx): expected display value}."""
+    edited = [list(row) for row in rows]
+    expected = {}
+    for row_idx in range(0, len(edited) - 1, every):
+        row = edited[row_idx + 1]
+        row[1] = str(int(row[1]) + 1)
+        expected[row_idx] = int(row[1])
+    return edited, expected
+
+
+# WRITERS
+
+def write_xlsx(path, rows, meta_rows):
+    if xlsxwriter is None:
+        xlsxbuilder.write_workbook(path, [(SHEET, rows, False), (importcode.META_SHEET, meta_rows, True)])
+        return
+    wb = xlsxwriter.Workbook(path)
+    ws = wb.add_worksheet(SHEET)
+    for idx, row in enumerate(rows):
+        ws.write_row(idx, 0, row)
+    ws = wb.add_worksheet(importcode.META_SHEET)
+    for idx, row in enumerate(meta_rows):
+        ws.write_row(idx, 0, row)
+    ws.hide()
+    wb.close()
+
+
+# STAGES
+
+class Stages(object):
+    """Seconds of every stage, one list per stage (one value per repeat)."""
+
+    def __init__(self):
+        self.times = OrderedDict()
+
+    def run(self, name, func, *args):
+        start = clock()
+        result = func(*args)
+        self.times.setdefault(name, []).append(clock() - start)
+        return result
+
+    def summary(self):
+        return OrderedDict((name, {"best": min(t), "mean": sum(t) / len(t)}) for name, t in self.times.items())
+
+
+def apply_plans(editor, plans):
+    sets = 0
+    for rows in plans.values():
+        for row_idx in sorted(rows):
+            sets += editor.apply_entries(rows[row_idx])
+    return sets
+
+
+def roundtrip(stages, n_types, n_fields, every, folder, threads):
+    """One export / edit / import cycle. Returns the fidelity check results."""
+    model = build_model(n_types, n_fields)
+    xlsx_path = os.path.join(folder, "roundtrip.xlsx")
+    csv_path = os.path.join(folder, "roundtrip.csv")
+
+    # Export
+    rows = stages.run("export: schedule read", schedule_rows, model, n_fields)
+    meta, meta_rows = stages.run("export: import code", export_meta, model, rows, n_fields)
+    edited, expected = edit_rows(rows, every)
+    stages.run("export: xlsx write", write_xlsx, xlsx_path, edited, meta_rows)
+    stages.run("export: csv write", delimited.write_sheet, csv_path, edited, meta)
+
+    # Import
+    sheets, skipped = stages.run("import: xlsx read", importplan.read_file, xlsx_path, FYT_CODE, threads)
+    csv_sheets, _ = stages.run("import: csv read", importplan.read_file, csv_path, FYT_CODE, threads)
+    editor = bulkedit.BulkEditor(model)
+    snapshot = stages.run("import: element matching", editor.snapshot, importplan.wanted_keys(sheets))
+    plans, errors = stages.run("import: plan", importplan.plan_sheets, snapshot, sheets, threads)
+    csv_plans, _ = importplan.plan_sheets(snapshot, csv_sheets, threads)
+    sets = stages.run("import: set", apply_plans, editor, plans)
+
+    types = list(model.types.values())
+    values_ok = all(abs(types[row_idx].params[0].value - value * MM) < 1e-9 for row_idx, value in expected.items())
+    return {"skipped_sheets": len(skipped), "conversion_errors": len(errors),
+            "edited_cells": len(expected), "sets": sets, "values_ok": values_ok,
+            "csv_planned": sum(len(e) for r in csv_plans.values() for e in r.values())}
+
+
+def unchanged_roundtrip(n_types, n_fields, folder, threads):
+    """Number of changes planned for an unedited export (must be 0)."""
+    model = build_model(n_types, n_fields)
+    path = os.path.join(folder, "unchanged.xlsx")
+    rows = schedule_rows(model, n_fields)
+    _, meta_rows = export_meta(model, rows, n_fields)
+    write_xlsx(path, rows, meta_rows)
+    sheets, _ = importplan.read_file(path, FYT_CODE, threads)
+    snapshot = bulkedit.BulkEditor(model).snapshot(importplan.wanted_keys(sheets))
+    plans, _ = importplan.plan_sheets(snapshot, sheets, threads)
+    return sum(len(e) for r in plans.values() for e in r.values())
+
+
+def duplicated_roundtrip(n_types, n_fields, folder, threads):
+    """Whether a type given in two rows (by type id, then by 'Family: Type')
+    ends with the value of the last row, both when the last row holds the
+    current value and when it holds a new one."""
+    ok = True
+    for last_edited in (False, True):
+        model = build_model(n_types, n_fields)
+        path = os.path.join(folder, "duplicated.xlsx")
+        rows = schedule_rows(model, n_fields)
+        _, meta_rows = export_meta(model, rows, n_fields)
+        current = int(rows[1][1])
+        duplicate = list(rows[1])
+        if last_edited:
+            duplicate[1] = str(current + 1)
+        else:
+            rows[1][1] = str(current + 1)
+        write_xlsx(path, rows + [duplicate], meta_rows)
+
+        sheets, _ = importplan.read_file(path, FYT_CODE, threads)
+        editor = bulkedit.BulkEditor(model)
+        plans, _ = importplan.plan_sheets(editor.snapshot(importplan.wanted_keys(sheets)), sheets, threads)
+        apply_plans(editor, plans)
+        expected = int(duplicate[1])
+        ok = ok and abs(list(model.types.values())[0].params[0].value - expected * MM) < 1e-9
+    return ok
+
+
+def resumed_roundtrip(n_types, n_fields, every, folder, threads):
+    """Whether an import stopped half way and resumed from its checkpoint only
+    plans the rows left and ends with the expected values, and whether the
+    checkpoint is rejected by a model without its rows."""
+    path = os.path.join(folder, "resumed.xlsx")
+    model = build_model(n_types, n_fields)
+    rows = schedule_rows(model, n_fields)
+    _, meta_rows = export_meta(model, rows, n_fields)
+    edited, expected = edit_rows(rows, every)
+    write_xlsx(path, edited, meta_rows)
+    sheets, _ = importplan.read_file(path, FYT_CODE, threads)
+
+    # First run: stops after half the rows, saving the checkpoint as 'Import text data' does
+    ckpt = checkpoint.Checkpoint(os.path.join(folder, "checkpoint.json"), checkpoint.file_hash(path), "model")
+    editor = bulkedit.BulkEditor(model)
+    plans, _ = importplan.plan_sheets(editor.snapshot(importplan.wanted_keys(sheets)), sheets, threads)
+    half = n_types // 2
+    last_set = None
+    for row_idx in range(half):
+        entries = plans[SHEET].get(row_idx, ())
+        editor.apply_entries(entries)
+        if entries:
+            last_set = (SHEET, row_idx, entries[-1][0], entries[-1][1])
+    ckpt.save(SHEET, half, last_set)
+
+    # Second run: confirms the sample, plans from the checkpoint
+    ckpt = checkpoint.Checkpoint(ckpt.path, checkpoint.file_hash(path), "model")
+    editor = bulkedit.BulkEditor(model)
+    held = importplan.holds(editor.snapshot(importplan.sample_keys(sheets, ckpt.sample)), sheets, ckpt.sample)
+    starts = ckpt.starts()
+    plans, _ = importplan.plan_sheets(editor.snapshot(importplan.wanted_keys(sheets, starts)), sheets, threads,
+                                      starts=starts)
+    planned_before = any(row_idx < half for row_idx in plans[SHEET])
+    apply_plans(editor, plans)
+    types = list(model.types.values())
+    values_ok = all(abs(types[row_idx].params[0].value - value * MM) < 1e-9 for row_idx, value in expected.items())
+
+    # A model that doesn't hold the committed rows rejects the checkpoint
+    fresh = bulkedit.BulkEditor(build_model(n_types, n_fields))
+    rejected = not importplan.holds(fresh.snapshot(importplan.sample_keys(sheets, ckpt.sample)), sheets, ckpt.sample)
+    return bool(ckpt.sample) and held and not planned_before and values_ok and rejected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--types", type=int, default=5000, help="number of types (rows)")
+    parser.add_argument("--fields", type=int, default=10, help="number of fields (columns)")
+    parser.add_argument("--edit-every", type=int, default=10, help="edit one row in every N")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None, help="worker threads (default: jfs.workers)")
+    parser.add_argument("--out", default=None, help="JSON results file (default: stdout only)")
+    args = parser.parse_args(argv)
+
+    folder = tempfile.mkdtemp(prefix="jfs-bench-")
+    try:
+        stages = Stages()
+        checks = [roundtrip(stages, args.types, args.fields, args.edit_every, folder, args.threads)
+                  for _ in range(args.repeat)]
+        unchanged = unchanged_roundtrip(args.types, args.fields, folder, args.threads)
+        duplicated = duplicated_roundtrip(args.types, args.fields, folder, args.threads)
+        resumed = resumed_roundtrip(args.types, args.fields, args.edit_every, folder, args.threads)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    check = checks[-1]
+    results = OrderedDict([
+        ("benchmark", "roundtrip"),
+        ("python", "{} {}".format(platform.python_implementation(), platform.python_version())),
+        ("xlsx_writer", "xlsxwriter" if xlsxwriter else "xlsxbuilder"),
+        ("types", args.types),
+        ("fields", args.fields),
+        ("cells", args.types * args.fields),
+        ("repeat", args.repeat),
+        ("stages", stages.summary()),
+        ("fidelity", OrderedDict([
+            ("unchanged_planned", unchanged),
+            ("duplicated_type_ok", duplicated),
+            ("resumed_ok", resumed),
+            ("edited_cells", check["edited_cells"]),
+            ("sets", check["sets"]),
+            ("csv_planned", check["csv_planned"]),
+            ("values_ok", check["values_ok"]),
+            ("conversion_errors", check["conversion_errors"]),
+            ("ok", unchanged == 0 and duplicated and resumed and check["values_ok"] and not check["conversion_errors"]
+                   and check["sets"] == check["edited_cells"] == check["csv_planned"]),
+        ])),
+    ])
+
+    for name, t in results["stages"].items():
+        print("{:<28} best {:8.3f} s   mean {:8.3f} s".format(name, t["best"], t["mean"]))
+    print("fidelity: {}".format("ok" if results["fidelity"]["ok"] else "FAILED " + json.dumps(results["fidelity"])))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if results["fidelity"]["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Click-to-first-dialog startup benchmark of every button (outside Revit).
+
+pyRevit compiles a button script on every click and runs it up to its first
+dialog (an alert, a list to pick from, a file or element selection). This
+benchmark measures, per button, what happens before that dialog and does not
+need Revit:
+
+    compile   compiling script.py
+    imports   importing the jfs modules imported before the first dialog
+
+Both are timed in a fresh interpreter, cold (no bytecode cache) and warm (with
+the bytecode written by a previous run), as the best of --repeat runs. Modules
+of the host (Revit API, pyRevit, .NET) and jfs modules bound to the Revit API
+can't be imported here: they are listed, not timed. Heavy optional dependencies
+(rpw, xlsxwriter, xlrd) imported before the first dialog are reported, and make
+the benchmark fail: they must only be imported on the paths that need them.
+
+Usage:
+    python benchmarks/startup.py --repeat 5 --out startup.json
+"""
+
+import argparse
+import ast
+import glob
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EXTENSION = os.path.join(os.path.dirname(HERE), "JFS-tools.extension")
+LIB = os.path.join(EXTENSION, "lib")
+
+clock = getattr(time, "perf_counter", time.time)
+
+HEAVY = ("rpw", "xlsxwriter", "xlrd")
+DIALOG_CALLS = ("alert", "show", "pick_file", "save_file", "select_file", "ask_for_string",
+                "PickObject", "PickObjects", "PickElementsByRectangle")
+
+
+# SCRIPT ANALYSIS
+
+def button_name(path):
+    return os.path.basename(os.path.dirname(path)).replace(".pushbutton", "")
+
+
+def _shows_dialog(stmt):
+    for node in ast.walk(stmt):
+        if isinstance(node, ast.Call):
+            func = node.func
+            name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+            if name in DIALOG_CALLS:
+                return True
+    return False
+
+
+def prelude_imports(source):
+    """Modules imported by the top-level statements before the first dialog."""
+    modules = []
+    for stmt in ast.parse(source).body:
+        if _shows_dialog(stmt):
+            break
+        for node in ast.walk(stmt):
+            if isinstance(node, ast.Import):
+                modules += [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                if node.module == "jfs":
+                    modules += ["jfs." + alias.name for alias in node.names]
+                else:
+                    modules.append(node.module)
+    return list(OrderedDict.fromkeys(modules))
+
+
+# CHILD PROCESS (one fresh interpreter per measure)
+
+def child(script):
+    """Compiles 'script' and imports its jfs prelude modules; prints the timings."""
+    sys.path.insert(0, LIB)
+    with io.open(script, encoding="utf-8") as f:
+        source = f.read()
+
+    start = clock()
+    compile(source, script, "exec")
+    compile_time = clock() - start
+
+    imports, host = OrderedDict(), []
+    for module in prelude_imports(source):
+        if not module.startswith("jfs"):
+            continue
+        start = clock()
+        try:
+            __import__(module)
+        except ImportError:
+            host.append(module)         # Bound to the Revit API
+            continue
+        imports[module] = clock() - start
+
+    print(json.dumps({"compile": compile_time, "imports": imports, "host": host}))
+
+
+def measure(script, cache_dir):
+    """Timings of a fresh interpreter with its bytecode cache in 'cache_dir'."""
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=cache_dir)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    out = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--child", script], env=env)
+    return json.loads(out.decode("utf-8").strip().splitlines()[-1])
+
+
+def bench_button(script, repeat):
+    cold, warm = [], []
+    for _ in range(repeat):
+        cache_dir = tempfile.mkdtemp(prefix="jfs-startup-")
+        try:
+            cold.append(measure(script, cache_dir))     # Empty cache: everything compiled
+            warm.append(measure(script, cache_dir))     # Bytecode written by the cold run
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def total(run):
+        return run["compile"] + sum(run["imports"].values())
+
+    with io.open(script, encoding="utf-8") as f:
+        modules = prelude_imports(f.read())
+    jfs_modules = [m for m in modules if m.startswith("jfs")]
+    last = warm[-1]
+    return OrderedDict([
+        ("script", os.path.relpath(script, EXTENSION)),
+        ("cold_ms", 1000 * min(total(run) for run in cold)),
+        ("warm_ms", 1000 * min(total(run) for run in warm)),
+        ("compile_ms", 1000 * min(run["compile"] for run in warm)),
+        ("jfs_modules", [m for m in jfs_modules if m not in last["host"]]),
+        ("revit_bound_modules", last["host"]),
+        ("host_modules", [m for m in modules if not m.startswith("jfs")]),
+        ("heavy_before_dialog", [m for m in modules if m.split(".")[0] in HEAVY]),
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--button", default=None, help="only buttons whose name contains this text")
+    parser.add_argument("--out", default=None, help="JSON results file (default: stdout only)")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.child)
+        return 0
+
+    scripts = sorted(glob.glob(os.path.join(EXTENSION, "*.tab", "*.panel", "*.pushbutton", "script.py")))
+    if args.button:
+        scripts = [s for s in scripts if args.button.lower() in button_name(s).lower()]
+
+    buttons = OrderedDict((button_name(script), bench_button(script, args.repeat)) for script in scripts)
+    heavy = dict((name, b["heavy_before_dialog"]) for name, b in buttons.items() if b["heavy_before_dialog"])
+
+    results = OrderedDict([
+        ("benchmark", "startup"),
+        ("python", "{} {}".format(platform.python_implementation(), platform.python_version())),
+        ("repeat", args.repeat),
+        ("buttons", buttons),
+        ("heavy_before_dialog", heavy),
+        ("ok", not heavy),
+    ])
+
+    for name, b in buttons.items():
+        print("{:<22} cold {:7.2f} ms   warm {:7.2f} ms   jfs {:>2}   revit-bound {:>2}{}".format(
+            name, b["cold_ms"], b["warm_ms"], len(b["jfs_modules"]), len(b["revit_bound_modules"]),
+            "   HEAVY: " + ", ".join(b["heavy_before_dialog"]) if b["heavy_before_dialog"] else ""))
+    print("heavy imports before the first dialog: {}".format(json.dumps(heavy) if heavy else "none"))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if results["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Evacuation route length benchmark (outside Revit).
+
+On the synthetic building of whatif.py, measures every path of travel and finds
+its origin space and destination exit:
+
+    naive   every path start tested against every space of its level, every
+            path end against every exit
+    routes  jfs.travel.routes (spaces hashed by bounding box, exits in a
+            jfs.proximity grid)
+
+and checks that both give the same origin, exit and length for every path.
+
+Usage:
+    python benchmarks/travel.py --levels 6 --grid 20 --repeat 3 --out travel.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+from collections import OrderedDict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "JFS-tools.extension", "lib"))
+
+from jfs import evacuation, travel              # noqa: E402
+
+from intersections import best_time             # noqa: E402
+from whatif import build_building               # noqa: E402
+
+
+def naive(model, limit_m):
+    """Origin, exit and length of every path, testing all spaces and exits of its level."""
+    result = {}
+    for path in model.paths.values():
+        spaces = [s for s in model.spaces.values() if s.level == path.level]
+        origin = next((s.id for s in spaces if travel.contains(s.edges, path.start)), None)
+        if origin is None:
+            best = evacuation.PATH_TOLERANCE
+            for s in spaces:
+                d = min(travel.point_segment_distance(path.start, seg) for seg in s.edges)
+                if d < best:
+                    origin, best = s.id, d
+        exit_id, best = None, evacuation.PATH_TOLERANCE
+        for e in model.exits.values():
+            if e.level != path.level:
+                continue
+            d = math.hypot(e.point[0] - path.end[0], e.point[1] - path.end[1])
+            if d < best:
+                exit_id, best = e.id, d
+        length_m = travel.polyline_length(path.segments) * travel.FT_TO_M
+        result[path.id] = (origin, exit_id, round(length_m, 9), length_m > limit_m)
+    return result
+
+
+def indexed(model, limit_m):
+    return dict((r.path_id, (r.origin, r.exit_id, round(r.length, 9), r.over))
+                for r in travel.routes(model, limit_m=limit_m))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, default=6)
+    parser.add_argument("--grid", type=int, default=20, help="rooms per side of each level")
+    parser.add_argument("--limit", type=float, default=travel.LIMIT_M, help="route length limit (m)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=None, help="JSON results file (default: stdout only)")
+    args = parser.parse_args(argv)
+
+    model = evacuation.EvacuationModel(*build_building(args.levels, args.grid))
+    naive_time, expected = best_time(naive, (model, args.limit), args.repeat)
+    routes_time, found = best_time(indexed, (model, args.limit), args.repeat)
+    ok = found == expected
+    over = sum(1 for v in found.values() if v[3])
+
+    results = OrderedDict([
+        ("benchmark", "travel"),
+        ("python", "{} {}".format(platform.python_implementation(), platform.python_version())),
+        ("spaces", len(model.spaces)),
+        ("paths", len(model.paths)),
+        ("exits", len(model.exits)),
+        ("naive_seconds", naive_time),
+        ("routes_seconds", routes_time),
+        ("over_limit", over),
+        ("ok", ok),
+    ])
+    print("naive   {:8.3f} s".format(naive_time))
+    print("routes  {:8.3f} s   {} paths, {} over {:g} m, {}".format(
+        routes_time, len(found), over, args.limit, "identical" if ok else "DIFFERENT"))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
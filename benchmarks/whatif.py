@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""What-if simulation benchmark of the evacuation model (outside Revit).
+
+Builds a synthetic building (jfs.evacuation stand-in data): per level, a grid
+of rooms with a door each, paths from every door to an exit door of the level,
+and a stair per level discharging at a path origin of the level below, so the
+loads propagate down the whole building. Times:
+
+    full    computing the loads of every exit from scratch
+    whatif  each edit as a what-if on the computed model (a space's people,
+            a removed room door, an extra path, a moved partition)
+
+and checks, for every edit, that the loads of the simulated model are those of
+a model built from scratch with the edit applied.
+
+Usage:
+    python benchmarks/whatif.py --levels 6 --grid 12 --repeat 3 --out whatif.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from collections import OrderedDict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "JFS-tools.extension", "lib"))
+
+from jfs import evacuation                      # noqa: E402
+
+from intersections import best_time, clock      # noqa: E402
+
+
+ROOM = 20.0                     # Room side (ft)
+CORRIDOR_Y = -10.0              # Corridor below the rooms, where the paths run
+
+
+def room_edges(i, j):
+    x0, y0, x1, y1 = i * ROOM, j * ROOM, (i + 1) * ROOM, (j + 1) * ROOM
+    return [(x0, y0, x1, y0), (x1, y0, x1, y1), (x1, y1, x0, y1), (x0, y1, x0, y0)]
+
+
+def build_building(levels, grid):
+    """Spaces, paths and exits of the synthetic building."""
+    spaces, paths, exits = [], [], []
+    ids = iter(range(1, 10 ** 9))
+    for level in range(levels):
+        exit_door = next(ids)
+        exit_pt = (grid * ROOM / 2, CORRIDOR_Y - 5)
+        exits.append(evacuation.door(exit_door, level, exit_pt, (0.0, 1.0)))
+        for i in range(grid):
+            for j in range(grid):
+                spaces.append(evacuation.Space(next(ids), level, 5 + (i * j) % 7, room_edges(i, j)))
+                # Door in the middle of the lower wall of the room; the path goes down to the corridor
+                door_pt = ((i + 0.5) * ROOM, j * ROOM)
+                exits.append(evacuation.door(next(ids), level, door_pt, (0.0, 1.0)))
+                if j == 0:
+                    start = (door_pt[0], door_pt[1] - 1)
+                    corridor = (door_pt[0], CORRIDOR_Y)
+                    paths.append(evacuation.Path(next(ids), level, start, exit_pt,
+                                                 [start + corridor, corridor + (exit_pt[0], CORRIDOR_Y),
+                                                  (exit_pt[0], CORRIDOR_Y) + exit_pt]))
+                else:
+                    # Rooms behind the first row: path through the rooms below to the row-0 door
+                    start = (door_pt[0], door_pt[1] - 1)
+                    end = ((i + 0.5) * ROOM, 1.0)
+                    paths.append(evacuation.Path(next(ids), level, start, end, [start + end]))
+        if level:
+            # Stair from this level down to the previous one, discharging at a path origin
+            stair_in = (grid * ROOM + 10, 10.0)
+            stair_out = (0.5 * ROOM, -1.0)
+            box = (grid * ROOM + 5, 5.0, grid * ROOM + 15, 25.0)
+            stair_id = next(ids)
+            exits.append(evacuation.stair(stair_id, level, stair_in, box, level - 1, stair_out))
+            start = (grid * ROOM / 2, 0.5 * ROOM * grid)
+            paths.append(evacuation.Path(next(ids), level, start, stair_in, [start + stair_in]))
+    return spaces, paths, exits
+
+
+def edits(spaces, paths, exits, grid):
+    """(name, what_if keyword arguments, function applying the edit to the data)."""
+    top = max(s.level for s in spaces)
+    space = [s for s in spaces if s.level == top][grid + 1]
+    room_door = [e for e in exits if e.level == 0 and e.kind == evacuation.DOOR][2]
+    new_path = evacuation.Path(-1, top, (5.0, 5.0), (grid * ROOM + 10, 10.0),
+                               [(5.0, 5.0, grid * ROOM + 10, 10.0)])
+    moved = [s for s in spaces if s.level == top][0]
+    moved_edges = [(x0 + 3, y0, x1 + 3, y1) for x0, y0, x1, y1 in moved.edges]
+
+    def set_people(data):
+        s, p, e = data
+        return [x._replace(people=99) if x.id == space.id else x for x in s], p, e
+
+    def remove_door(data):
+        s, p, e = data
+        return s, p, [x for x in e if x.id != room_door.id]
+
+    def add_path(data):
+        s, p, e = data
+        return s, p + [new_path], e
+
+    def move_partition(data):
+        s, p, e = data
+        return [x._replace(edges=moved_edges) if x.id == moved.id else x for x in s], p, e
+
+    return [
+        ("space people", {"people": {space.id: 99}}, set_people),
+        ("removed door", {"removed": [room_door.id]}, remove_door),
+        ("extra path", {"extra_paths": [new_path]}, add_path),
+        ("moved partition", {"edges": {moved.id: moved_edges}}, move_partition),
+    ]
+
+
+def full(spaces, paths, exits):
+    model = evacuation.EvacuationModel(spaces, paths, exits)
+    return model, model.loads()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, default=6)
+    parser.add_argument("--grid", type=int, default=12, help="rooms per side of each level")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=None, help="JSON results file (default: stdout only)")
+    args = parser.parse_args(argv)
+
+    data = build_building(args.levels, args.grid)
+    full_time, (model, loads) = best_time(full, data, args.repeat)
+
+    results = OrderedDict([
+        ("benchmark", "whatif"),
+        ("python", "{} {}".format(platform.python_implementation(), platform.python_version())),
+        ("spaces", len(data[0])),
+        ("paths", len(data[1])),
+        ("exits", len(data[2])),
+        ("full_seconds", full_time),
+        ("edits", []),
+        ("ok", True),
+    ])
+    print("full            {:8.3f} s   {} exits".format(full_time, len(loads)))
+
+    for name, kwargs, apply in edits(data[0], data[1], data[2], args.grid):
+        times = []
+        for _ in range(args.repeat):
+            start = clock()
+            sim = model.what_if(**kwargs)
+            times.append(clock() - start)
+        expected = full(*apply(data))[1]
+        ok = sim.model.loads() == expected
+        results["ok"] = results["ok"] and ok
+        results["edits"].append(OrderedDict([("edit", name), ("seconds", min(times)),
+                                             ("recomputed", len(sim.recomputed)),
+                                             ("changed", len(sim.deltas)), ("ok", ok)]))
+        print("{:<15} {:8.3f} s   {} exits recomputed, {} changed, {}".format(
+            name, min(times), len(sim.recomputed), len(sim.deltas), "identical" if ok else "DIFFERENT"))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if results["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
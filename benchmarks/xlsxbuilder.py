@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Minimal .xlsx writer (zipfile only) used by the benchmarks when xlsxwriter is
+not installed. Text is written as inline strings, numbers as numbers; worksheets
+can be hidden. Enough for jfs.xlsxreader, not a general purpose writer."""
+
+import zipfile
+from xml.sax.saxutils import escape
+
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '{}</Types>')
+SHEET_TYPE = ('<Override PartName="/xl/worksheets/sheet{}.xml" '
+              'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>')
+ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="xl/workbook.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>')
+WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>{}</sheets></workbook>')
+WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{}</Relationships>')
+SHEET_REL = ('<Relationship Id="rId{0}" Target="worksheets/sheet{0}.xml" '
+             'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>')
+SHEET_HEAD = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+              '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+SHEET_TAIL = '</sheetData></worksheet>'
+
+
+def col_letters(idx):
+    letters = ""
+    idx += 1
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _cell(ref, value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return '<c r="{}"><v>{!r}</v></c>'.format(ref, value)
+    return '<c r="{}" t="inlineStr"><is><t xml:space="preserve">{}</t></is></c>'.format(ref, escape(value))
+
+
+def _sheet_xml(rows):
+    parts = [SHEET_HEAD]
+    for r, row in enumerate(rows):
+        number = r + 1
+        cells = "".join(_cell(col_letters(c) + str(number), v) for c, v in enumerate(row) if v != "")
+        parts.append('<row r="{}">{}</row>'.format(number, cells))
+    parts.append(SHEET_TAIL)
+    return "".join(parts)
+
+
+def write_workbook(path, sheets):
+    """Writes [(name, rows, hidden)] to 'path'."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml",
+                   CONTENT_TYPES.format("".join(SHEET_TYPE.format(i + 1) for i in range(len(sheets)))))
+        z.writestr("_rels/.rels", ROOT_RELS)
+        entries = []
+        for i, (name, _, hidden) in enumerate(sheets):
+            state = ' state="hidden"' if hidden else ""
+            entries.append('<sheet name="{}" sheetId="{}"{} r:id="rId{}"/>'.format(
+                escape(name, {'"': "&quot;"}), i + 1, state, i + 1))
+        z.writestr("xl/workbook.xml", WORKBOOK.format("".join(entries)))
+        z.writestr("xl/_rels/workbook.xml.rels",
+                   WORKBOOK_RELS.format("".join(SHEET_REL.format(i + 1) for i in range(len(sheets)))))
+        for i, (_, rows, _) in enumerate(sheets):
+            z.writestr("xl/worksheets/sheet{}.xml".format(i + 1), _sheet_xml(rows).encode("utf-8"))